@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Hermetic end-to-end extraction benchmark (no network)
+Usage: python3 benchmarks/bench_extract.py [--modes copy,smart,exact] [--lengths 10,60,300]
+
+Generates a synthetic source video with ffmpeg's lavfi test sources, puts
+the stub yt-dlp from benchmarks/stubs first on PATH (it serves the file for
+--dump-json and --download-sections) and runs `python3 -m clip_extractor
+extract` once per cut mode and clip length, each with an empty cache.
+
+Every run is a separate process reaped with wait4(), so wall time, CPU time
+(user + system), peak RSS and block writes cover the whole process tree
+(python, yt-dlp stub, ffmpeg). Results are written as JSON; pass
+--compare OLD.json to flag runs that got slower.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STUBS = Path(__file__).resolve().parent / "stubs"
+
+VIDEO_ID = "BENCHvideo1"
+URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+# Frame rate of the synthetic source
+FPS = 30
+
+# Clips start at the first whole second from here that falls between
+# keyframes, so smart/exact cuts land mid-GOP (timeframes are whole seconds)
+CLIP_START_AFTER = 61
+
+
+def generate_source(path, seconds, gop, size):
+    """H.264/AAC test pattern with a keyframe every gop frames"""
+    subprocess.run([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={FPS}:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", str(gop), "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "128k", "-shortest", str(path)
+    ], check=True)
+
+
+def clip_start(gop):
+    """First whole second >= CLIP_START_AFTER that is not on a keyframe,
+    or None if every whole second is one (gop divides FPS)"""
+    for second in range(CLIP_START_AFTER, CLIP_START_AFTER + gop + 1):
+        if second * FPS % gop:
+            return second
+    return None
+
+
+def timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def run_once(mode, start, length, media_dir, work_dir):
+    """One cold-cache extraction in a child process; returns its measurements"""
+    cache_dir = work_dir / "cache"
+    output = work_dir / f"clip_{mode}_{length}.mp4"
+    env = dict(
+        os.environ,
+        PATH=f"{STUBS}{os.pathsep}{os.environ.get('PATH', '')}",
+        PYTHONPATH=str(ROOT),
+        FAKE_YT_DLP_MEDIA_DIR=str(media_dir),
+        CLIP_EXTRACTOR_CACHE_DIR=str(cache_dir),
+    )
+    timeframe = f"{timestamp(start)}-{timestamp(start + length)}"
+
+    stderr_path = work_dir / "stderr.log"
+    with open(stderr_path, 'wb') as stderr:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "clip_extractor", "extract", URL, timeframe, str(output),
+             "--mode", mode],
+            env=env, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss_scale = 1 if platform.system() == 'Darwin' else 1024
+    result = {
+        'mode': mode,
+        'clip_seconds': length,
+        'ok': proc.returncode == 0,
+        'wall_s': round(wall, 4),
+        'cpu_s': round(usage.ru_utime + usage.ru_stime, 4),
+        'peak_rss_bytes': usage.ru_maxrss * rss_scale,
+        'block_write_bytes': usage.ru_oublock * 512,
+        'output_bytes': output.stat().st_size if output.exists() else 0,
+        'cache_bytes': sum(p.stat().st_size for p in cache_dir.rglob('*') if p.is_file()),
+    }
+    if proc.returncode != 0:
+        result['error'] = stderr_path.read_text(errors='replace').strip()
+    return result
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-run changes against an earlier results file"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    old = {(r['mode'], r['clip_seconds']): r for r in baseline['runs']}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (threshold {threshold:.0%}):", file=sys.stderr)
+    for run in results['runs']:
+        before = old.get((run['mode'], run['clip_seconds']))
+        if before is None or not before['ok'] or not run['ok']:
+            continue
+        for key in ('wall_s', 'cpu_s', 'peak_rss_bytes'):
+            if before[key] <= 0:
+                continue
+            change = run[key] / before[key] - 1
+            flag = ''
+            if change > threshold:
+                flag = '  <-- regression'
+                regressions += 1
+            print(f"  {run['mode']:<6} {run['clip_seconds']:>5}s {key:<15} {change:+7.1%}{flag}",
+                  file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--modes', default='copy,smart,exact')
+    parser.add_argument('--lengths', default='10,60,300', help="Clip lengths in seconds")
+    parser.add_argument('--source-seconds', type=int, default=600)
+    parser.add_argument('--source-size', default='1280x720')
+    parser.add_argument('--gop', type=int, default=60, help="Source keyframe interval (frames)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per mode/length")
+    parser.add_argument('--output', type=Path, help="Write JSON results here (default: stdout)")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        sys.exit("ffmpeg/ffprobe are required to generate synthetic media")
+
+    modes = args.modes.split(',')
+    lengths = [int(x) for x in args.lengths.split(',')]
+    start = clip_start(args.gop)
+    if start is None:
+        sys.exit(f"--gop {args.gop} puts a keyframe on every second; pick one that doesn't divide {FPS}")
+    if start + max(lengths) > args.source_seconds:
+        sys.exit(f"--source-seconds must be at least {start + max(lengths)}")
+
+    with tempfile.TemporaryDirectory(prefix="clip-bench-") as tmp:
+        tmp = Path(tmp)
+        media_dir = tmp / "media"
+        media_dir.mkdir()
+        print(f"Generating {args.source_seconds}s {args.source_size} source...", file=sys.stderr)
+        generate_source(media_dir / f"{VIDEO_ID}.mp4", args.source_seconds, args.gop, args.source_size)
+
+        runs = []
+        for mode in modes:
+            for length in lengths:
+                for i in range(args.repeat):
+                    work_dir = tmp / f"run_{mode}_{length}_{i}"
+                    work_dir.mkdir()
+                    run = run_once(mode, start, length, media_dir, work_dir)
+                    runs.append(run)
+                    status = "ok" if run['ok'] else "FAILED"
+                    print(f"{mode:<6} {length:>5}s  wall {run['wall_s']:7.3f}s  cpu {run['cpu_s']:7.3f}s  "
+                          f"rss {run['peak_rss_bytes'] / 2**20:6.1f}M  {status}", file=sys.stderr)
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'benchmark': 'extract',
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'host': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'source': {
+            'seconds': args.source_seconds,
+            'size': args.source_size,
+            'gop': args.gop,
+            'clip_start': start,
+        },
+        'runs': runs,
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    failed = sum(1 for run in runs if not run['ok'])
+    regressions = compare(results, args.compare, args.threshold) if args.compare else 0
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Per-request parsing/validation overhead: shell fork chain vs in-process
+Usage: python3 benchmarks/bench_request_overhead.py [--iterations N] [--scripts-dir DIR]
+
+The "fork chain" replays the subprocesses a single web request used to
+spawn before any media work started: parse_video_id.sh and
+validate_timeframe.sh from web_gui.py, then parse_video_id.sh,
+validate_timeframe.sh and parse_time.sh (x2) from inside extract_clip.sh.
+
+To compare against the original pure-bash scripts, check out an older
+revision and point --scripts-dir at it, e.g.
+
+    git worktree add /tmp/yce-baseline <old-commit>
+    python3 benchmarks/bench_request_overhead.py --scripts-dir /tmp/yce-baseline/scripts
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from clip_extractor import parse_time, parse_timeframe, parse_video_id  # noqa: E402
+
+URL = "https://www.youtube.com/watch?v=AqEN8qOcAcA"
+START = "06:13"
+END = "06:30"
+
+
+def fork_chain(scripts_dir):
+    """One request's worth of script invocations"""
+    timeframe = f"{START}-{END}"
+    calls = [
+        ["parse_video_id.sh", URL],
+        ["validate_timeframe.sh", timeframe],
+        ["parse_video_id.sh", URL],
+        ["validate_timeframe.sh", timeframe],
+        ["parse_time.sh", START],
+        ["parse_time.sh", END],
+    ]
+    for script, arg in calls:
+        subprocess.run([str(scripts_dir / script), arg], capture_output=True, check=True)
+
+
+def in_process(_scripts_dir):
+    """The same work done through the clip_extractor library"""
+    parse_video_id(URL)
+    parse_timeframe(f"{START}-{END}")
+    parse_time(START)
+    parse_time(END)
+
+
+def cpu_seconds():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (self_usage.ru_utime + self_usage.ru_stime
+            + child_usage.ru_utime + child_usage.ru_stime)
+
+
+def measure(func, scripts_dir, iterations):
+    wall = []
+    cpu_start = cpu_seconds()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func(scripts_dir)
+        wall.append(time.perf_counter() - t0)
+    cpu = cpu_seconds() - cpu_start
+
+    wall.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.mean(wall) * 1000,
+        'p50_ms': wall[len(wall) // 2] * 1000,
+        'p95_ms': wall[int(len(wall) * 0.95) - 1] * 1000,
+        'cpu_ms_per_request': cpu / iterations * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--scripts-dir', type=Path, default=ROOT / "scripts")
+    parser.add_argument('--json', action='store_true', help="Print raw JSON results")
+    args = parser.parse_args()
+
+    results = {
+        'fork_chain': measure(fork_chain, args.scripts_dir, args.iterations),
+        'in_process': measure(in_process, args.scripts_dir, args.iterations * 100),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Scripts: {args.scripts_dir}")
+    print(f"{'mode':<12} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'cpu ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['mean_ms']:>10.3f} {r['p50_ms']:>10.3f} "
+              f"{r['p95_ms']:>10.3f} {r['cpu_ms_per_request']:>10.3f}")
+    speedup = results['fork_chain']['mean_ms'] / results['in_process']['mean_ms']
+    print(f"\nIn-process is {speedup:,.0f}x faster per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+web_gui.py wired to local stand-ins for YouTube, for load testing
+Usage: python3 benchmarks/load_server.py --media-dir DIR --work-dir DIR [--port 5099]
+
+yt-dlp resolves to benchmarks/stubs/yt-dlp (serving DIR/<video_id>.mp4),
+transcripts come from a fake provider instead of youtube-transcript-api,
+and caches, scratch space and extracted clips all live under --work-dir.
+Started by load_test.py; can also be run by hand to poke at the app.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STUBS = Path(__file__).resolve().parent / "stubs"
+
+# Cue spacing of the fake transcripts
+CUE_SECONDS = 4.0
+
+
+def fake_transcript_fetch(duration, latency):
+    """Stand-in for transcript.fetch_transcript: one cue every few seconds"""
+    from clip_extractor import Transcript
+
+    def fetch(video_id, languages=None):
+        if latency:
+            time.sleep(latency)
+        count = int(duration // CUE_SECONDS)
+        cues = (
+            (i * CUE_SECONDS, CUE_SECONDS, f"{video_id} synthetic caption line {i}")
+            for i in range(count)
+        )
+        track = {'language': 'English', 'language_code': 'en', 'is_generated': True}
+        return Transcript.from_entries(
+            cues, dict(track, video_id=video_id, available=[track], fetched_at=time.time())
+        )
+    return fetch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--media-dir', type=Path, required=True)
+    parser.add_argument('--work-dir', type=Path, required=True)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--duration', type=float, default=600, help="Fake transcript length (s)")
+    parser.add_argument('--transcript-latency', type=float, default=0.0,
+                        help="Seconds each fake transcript fetch takes")
+    args = parser.parse_args()
+
+    # Configuration is read at import time, so set it up first
+    os.environ['PATH'] = f"{STUBS}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ['FAKE_YT_DLP_MEDIA_DIR'] = str(args.media_dir)
+    os.environ['FAKE_YT_DLP_DURATION'] = str(args.duration)
+    os.environ['CLIP_EXTRACTOR_CACHE_DIR'] = str(args.work_dir / "cache")
+    # web_gui creates ~/Downloads/youtube_clips on import; keep that under
+    # --work-dir too (hosts without ~/Downloads would fail the import)
+    os.environ['HOME'] = str(args.work_dir / "home")
+    (args.work_dir / "home" / "Downloads").mkdir(parents=True, exist_ok=True)
+    sys.path.insert(0, str(ROOT))
+
+    from clip_extractor.transcript import get_transcript_cache
+    import web_gui
+
+    get_transcript_cache().fetch = fake_transcript_fetch(args.duration, args.transcript_latency)
+    web_gui.DOWNLOAD_DIR = args.work_dir / "clips"
+    web_gui.DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+    web_gui.app.run(debug=False, host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
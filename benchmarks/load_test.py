@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the web GUI's API endpoints
+Usage: python3 benchmarks/load_test.py [--levels 10,50,100,200] [--duration 20]
+
+Starts benchmarks/load_server.py (web_gui.py with the stub yt-dlp and a
+fake transcript provider) unless --url points at a running server, then
+ramps through the concurrency levels. At each level that many virtual
+users send back-to-back requests for the step's duration, picking
+/api/load_video, /api/get_transcript or /api/extract_clip by --mix weight.
+
+Per level and endpoint it reports throughput, p50/p95/p99 latency and the
+error rate (transport errors, non-2xx and success=false responses; 503
+"queue full" rejections are counted separately). Results are written as
+JSON. extract_clip is timed to its 202 response; without ffmpeg it is
+skipped, since the queued jobs could only fail.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from bench_extract import generate_source  # noqa: E402
+
+ENDPOINTS = ('load_video', 'get_transcript', 'extract_clip')
+
+
+def video_ids(count):
+    return [f"LOADvid{i:04d}" for i in range(count)]
+
+
+def prepare_media(media_dir, ids, seconds, with_ffmpeg):
+    """One source file hardlinked under every video ID"""
+    source = media_dir / "source.mp4"
+    if with_ffmpeg:
+        generate_source(source, seconds, 60, "640x360")
+    else:
+        source.write_bytes(b"\0" * 1024)
+    for video_id in ids:
+        os.link(source, media_dir / f"{video_id}.mp4")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host, port, server=None, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not start")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+class Client:
+    """One keep-alive HTTP connection per virtual user"""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+
+    def post(self, path, payload):
+        body = json.dumps(payload).encode()
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request('POST', path, body, {'Content-Type': 'application/json'})
+                response = self.conn.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def request_for(endpoint, video_id, rng):
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    start = rng.randrange(0, 500)
+    length = rng.choice((5, 10, 20))
+    start_time = f"{start // 60:02d}:{start % 60:02d}"
+    end_time = f"{(start + length) // 60:02d}:{(start + length) % 60:02d}"
+    if endpoint == 'load_video':
+        return {'url': url}
+    if endpoint == 'get_transcript':
+        return {'videoId': video_id, 'startTime': start_time, 'endTime': end_time}
+    return {'url': url, 'startTime': start_time, 'endTime': end_time,
+            'filename': f"load_{uuid.uuid4().hex}.mp4", 'mode': 'copy'}
+
+
+def virtual_user(client, mix, ids, stop, samples, seed):
+    rng = random.Random(seed)
+    endpoints, weights = zip(*mix.items())
+    while not stop.is_set():
+        endpoint = rng.choices(endpoints, weights)[0]
+        payload = request_for(endpoint, rng.choice(ids), rng)
+        started = time.perf_counter()
+        try:
+            status, body = client.post(f"/api/{endpoint}", payload)
+            outcome = 'ok'
+            if status == 503:
+                outcome = 'rejected'
+            elif status >= 300 or not json.loads(body).get('success'):
+                outcome = 'error'
+        except (OSError, http.client.HTTPException, ValueError):
+            outcome = 'error'
+        samples.append((endpoint, time.perf_counter() - started, outcome))
+
+
+def run_level(host, port, users, duration, mix, ids, timeout):
+    stop = threading.Event()
+    samples = []
+    clients = [Client(host, port, timeout) for _ in range(users)]
+    threads = [
+        threading.Thread(target=virtual_user, args=(client, mix, ids, stop, samples, i), daemon=True)
+        for i, client in enumerate(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout + 5)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.close()
+    return summarize(samples, elapsed, users)
+
+
+def summarize(samples, elapsed, users):
+    level = {'concurrency': users, 'seconds': round(elapsed, 2), 'endpoints': {}}
+    for endpoint in ENDPOINTS:
+        mine = [s for s in samples if s[0] == endpoint]
+        if not mine:
+            continue
+        latencies = sorted(s[1] for s in mine if s[2] == 'ok')
+        errors = sum(1 for s in mine if s[2] == 'error')
+        rejected = sum(1 for s in mine if s[2] == 'rejected')
+        ms = (lambda v: None if v is None else round(v * 1000, 2))
+        level['endpoints'][endpoint] = {
+            'requests': len(mine),
+            'throughput_rps': round(len(mine) / elapsed, 2),
+            'p50_ms': ms(percentile(latencies, 0.50)),
+            'p95_ms': ms(percentile(latencies, 0.95)),
+            'p99_ms': ms(percentile(latencies, 0.99)),
+            'error_rate': round(errors / len(mine), 4),
+            'rejected_rate': round(rejected / len(mine), 4),
+        }
+    level['throughput_rps'] = round(len(samples) / elapsed, 2)
+    return level
+
+
+def parse_mix(text, with_extract):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    if not with_extract and mix.pop('extract_clip', None):
+        print("ffmpeg not found: skipping extract_clip", file=sys.stderr)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--levels', default='10,50,100,200', help="Concurrent users per step")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds per step")
+    parser.add_argument('--mix', default='load_video=5,get_transcript=4,extract_clip=1')
+    parser.add_argument('--videos', type=int, default=50, help="Distinct video IDs")
+    parser.add_argument('--source-seconds', type=int, default=600)
+    parser.add_argument('--transcript-latency', type=float, default=0.2,
+                        help="Seconds each (uncached) fake transcript fetch takes")
+    parser.add_argument('--yt-dlp-latency', type=float, default=0.5,
+                        help="Seconds each stub yt-dlp call takes")
+    parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout")
+    parser.add_argument('--url', help="Target an already running server instead")
+    parser.add_argument('--output', type=Path, help="Write JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    with_ffmpeg = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+    mix = parse_mix(args.mix, with_ffmpeg or args.url)
+    ids = video_ids(args.videos)
+    levels = [int(x) for x in args.levels.split(',')]
+
+    with tempfile.TemporaryDirectory(prefix="clip-load-") as tmp:
+        tmp = Path(tmp)
+        server = None
+        if args.url:
+            target = urlparse(args.url)
+            host, port = target.hostname, target.port or 80
+        else:
+            media_dir = tmp / "media"
+            media_dir.mkdir()
+            prepare_media(media_dir, ids, args.source_seconds, with_ffmpeg)
+            host, port = '127.0.0.1', free_port()
+            env = dict(os.environ, FAKE_YT_DLP_LATENCY=str(args.yt_dlp_latency))
+            server = subprocess.Popen([
+                sys.executable, str(HERE / "load_server.py"),
+                "--media-dir", str(media_dir), "--work-dir", str(tmp / "work"),
+                "--port", str(port), "--duration", str(args.source_seconds),
+                "--transcript-latency", str(args.transcript_latency),
+            ], env=env, stdout=subprocess.DEVNULL, stderr=open(tmp / "server.log", 'w'))
+        try:
+            wait_for_server(host, port, server)
+            results = {
+                'benchmark': 'load',
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'mix': mix,
+                'videos': args.videos,
+                'levels': [],
+            }
+            for users in levels:
+                level = run_level(host, port, users, args.duration, mix, ids, args.timeout)
+                results['levels'].append(level)
+                print(f"{users:>4} users  {level['throughput_rps']:8.1f} req/s", file=sys.stderr)
+                for endpoint, stats in level['endpoints'].items():
+                    print(f"      {endpoint:<15} {stats['throughput_rps']:8.1f} req/s  "
+                          f"p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  "
+                          f"p99 {stats['p99_ms']} ms  errors {stats['error_rate']:.1%}  "
+                          f"rejected {stats['rejected_rate']:.1%}", file=sys.stderr)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+YouTube Clip Extractor core library
+
+Importable, in-process versions of the scripts in scripts/. The Flask and
+Tk GUIs call these directly; the shell scripts are thin wrappers around
+``python3 -m clip_extractor``.
+"""
+
+from .batch import extract_batch
+from .captions import Cue, parse_cues
+from .cutting import CUT_MODES, check_mode, cut
+from .errors import (
+    ClipExtractorError,
+    DownloadError,
+    ExtractionError,
+    InvalidQualityError,
+    InvalidRenditionError,
+    InvalidTimeframeError,
+    InvalidURLError,
+    QueueFullError,
+    TranscriptError,
+)
+from .extract import extract_clip
+from .formats import parse_quality, resolve_format, select_format
+from .jobs import Job, JobQueue
+from .media import probe
+from .metadata import MetadataCache, get_metadata
+from .reel import extract_reel
+from .renditions import parse_renditions
+from .search import SearchIndex, search_transcripts
+from .thumbnails import ThumbnailCache, get_thumbnail
+from .timeframe import (
+    merge_ranges,
+    parse_time,
+    parse_timeframe,
+    seconds_to_time,
+    time_to_seconds,
+    validate_timeframe,
+)
+from .transcript import (
+    Transcript,
+    TranscriptCache,
+    choose_track,
+    get_transcript,
+    get_transcript_segment,
+)
+from .video_id import parse_video_id
+
+__all__ = [
+    'CUT_MODES',
+    'ClipExtractorError',
+    'Cue',
+    'DownloadError',
+    'ExtractionError',
+    'InvalidQualityError',
+    'InvalidRenditionError',
+    'InvalidTimeframeError',
+    'InvalidURLError',
+    'Job',
+    'JobQueue',
+    'MetadataCache',
+    'QueueFullError',
+    'SearchIndex',
+    'ThumbnailCache',
+    'Transcript',
+    'TranscriptCache',
+    'TranscriptError',
+    'check_mode',
+    'choose_track',
+    'cut',
+    'extract_batch',
+    'extract_clip',
+    'extract_reel',
+    'get_metadata',
+    'get_thumbnail',
+    'get_transcript',
+    'get_transcript_segment',
+    'parse_time',
+    'parse_timeframe',
+    'merge_ranges',
+    'parse_cues',
+    'parse_quality',
+    'parse_renditions',
+    'parse_video_id',
+    'probe',
+    'resolve_format',
+    'search_transcripts',
+    'seconds_to_time',
+    'select_format',
+    'time_to_seconds',
+    'validate_timeframe',
+]
@@ -0,0 +1,54 @@
+"""
+Audio-only clips
+
+An output path ending in .m4a, .mp3 or .opus asks for just the audio of the
+range: an audio-only stream is downloaded (typically 10-30x fewer bytes than
+muxed video) and cut with a stream copy when its codec fits the container,
+or a light transcode when it doesn't (always for mp3).
+"""
+
+from .errors import ExtractionError
+from .media import audio_stream, probe, run_ffmpeg
+
+# Output extension -> (preferred source codec for format selection,
+#                      source codecs that can be stream copied, encoder args)
+AUDIO_FORMATS = {
+    'm4a': ('aac', ('aac',), ["-c:a", "aac", "-b:a", "160k"]),
+    'opus': ('opus', ('opus',), ["-c:a", "libopus", "-b:a", "128k"]),
+    'mp3': ('aac', ('mp3',), ["-c:a", "libmp3lame", "-q:a", "2"]),
+}
+
+
+def audio_format(output_path):
+    """Audio format key ('m4a', 'mp3', 'opus') for an output path, or None"""
+    ext = str(output_path).rsplit('.', 1)[-1].lower()
+    return ext if ext in AUDIO_FORMATS else None
+
+
+def source_codec(fmt):
+    """Codec to prefer when picking an audio-only stream for fmt"""
+    return AUDIO_FORMATS[fmt][0]
+
+
+def cut_audio(source, output_path, start_sec, duration, log=None):
+    """Cut [start_sec, start_sec + duration] of source's audio to output_path"""
+    log = log or (lambda message: None)
+    fmt = audio_format(output_path)
+    _, copyable, encode = AUDIO_FORMATS[fmt]
+    stream = audio_stream(probe(source))
+    if stream is None:
+        raise ExtractionError("Source has no audio stream")
+
+    if stream.get('codec_name') in copyable:
+        log(f"Copying {stream['codec_name']} audio")
+        codec = ["-c:a", "copy"]
+    else:
+        log(f"Transcoding {stream.get('codec_name')} audio to {fmt}")
+        codec = encode
+    run_ffmpeg([
+        "-ss", start_sec,
+        "-i", source,
+        "-t", duration,
+        "-map", "0:a:0",
+        "-vn",
+    ] + codec + [output_path])
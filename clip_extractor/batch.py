@@ -0,0 +1,145 @@
+"""
+Batch extraction of many timeframes from one video
+
+Overlapping or nearly adjacent timeframes are merged, the covering sections
+(minus anything already in the source cache) are fetched in a single yt-dlp
+run, and every clip is cut from those local
+copies by a single ffmpeg invocation (one input + one output per clip).
+"""
+
+import os
+from pathlib import Path
+
+from . import config, metrics, progress
+from .cutting import check_mode, cut
+from .diskutil import scratch_dir
+from .errors import ExtractionError, InvalidTimeframeError
+from .formats import check_quality, resolve_format
+from .media import FFMPEG_TIMEOUT, run_ffmpeg
+from .sources import fetch_sources
+from .timeframe import merge_ranges, parse_timeframe
+from .video_id import parse_video_id
+
+TOTAL_STAGES = 4
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+def batch_output_name(prefix, timeframe):
+    """clip_00-30-01-00.mp4 style name for a timeframe"""
+    return f"{prefix}_{timeframe.replace(':', '-')}.mp4"
+
+
+def extract_batch(url, timeframes, opts=None):
+    """Extract several timeframes of one video with a single download
+
+    timeframes is a list of START-END strings.
+
+    opts (all optional):
+        output_dir -- directory for the clips (default '.')
+        prefix     -- output file name prefix (default 'clip')
+        merge_gap  -- merge ranges closer than this many seconds
+        mode       -- cut mode ('copy', 'smart', 'exact' or 'parallel'); copy
+                      and exact cut every clip in one ffmpeg run, smart and
+                      parallel cut per clip
+        on_stage   -- callable(step, total, message)
+        on_progress -- callable(event) for live yt-dlp/ffmpeg progress
+        log        -- callable(message)
+        quality    -- quality policy spec (default from CLIP_EXTRACTOR_QUALITY)
+        cache      -- consult/populate the local source cache (default True)
+
+    Returns a dict with video_id, output_path (the directory), sections
+    and a 'clips' list (timeframe, output_path, start, end, duration, size)
+    in input order.
+    """
+    opts = opts or {}
+    output_dir = Path(opts.get('output_dir') or '.')
+    prefix = opts.get('prefix') or 'clip'
+    gap = opts.get('merge_gap', config.BATCH_MERGE_GAP)
+    mode = check_mode(opts.get('mode') or config.CUT_MODE)
+    quality = check_quality(opts.get('quality'))
+    on_stage = opts.get('on_stage') or _noop
+    log = opts.get('log') or _noop
+
+    if not timeframes:
+        raise InvalidTimeframeError("No timeframes given")
+
+    on_stage(1, TOTAL_STAGES, "Parsing video URL and timeframes...")
+    with metrics.timed('parse'):
+        video_id = parse_video_id(url)
+        clips = []
+        for timeframe in timeframes:
+            start_sec, end_sec = parse_timeframe(timeframe)
+            clips.append({
+                'timeframe': timeframe,
+                'start': start_sec,
+                'end': end_sec,
+                'duration': end_sec - start_sec,
+                'output_path': str(output_dir / batch_output_name(prefix, timeframe)),
+            })
+
+        sections = merge_ranges([(c['start'], c['end']) for c in clips], gap=gap)
+    log(f"{len(clips)} clips merged into {len(sections)} download sections")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = opts.get('on_progress')
+    if report is not None:
+        # Clips are cut side by side, so the longest one bounds out_time
+        report = progress.with_fraction(report, max(c['duration'] for c in clips))
+    with progress.reporting(report), scratch_dir(f"batch_{video_id}_", config.SCRATCH_DIR) as scratch:
+        on_stage(2, TOTAL_STAGES, "Downloading video sections...")
+        fmt = resolve_format(video_id, quality)
+        log(f"Format: {fmt}")
+        downloaded = fetch_sources(video_id, sections, scratch, opts.get('cache', True), log, fmt)
+
+        on_stage(3, TOTAL_STAGES, "Cutting clips...")
+        if mode in ('smart', 'parallel'):
+            for clip in clips:
+                section_start, path = _source_for(clip, downloaded)
+                cut(path, clip['output_path'], clip['start'] - section_start,
+                    clip['duration'], mode, log)
+        else:
+            run_ffmpeg(_cut_args(clips, downloaded, mode),
+                       timeout=FFMPEG_TIMEOUT * len(clips))
+
+    on_stage(4, TOTAL_STAGES, "Verifying output...")
+    for clip in clips:
+        if not os.path.exists(clip['output_path']):
+            raise ExtractionError(f"Failed to create clip {clip['output_path']}")
+        clip['size'] = os.path.getsize(clip['output_path'])
+
+    return {
+        'video_id': video_id,
+        'output_path': str(output_dir),
+        'sections': sections,
+        'clips': clips,
+        'mode': mode,
+    }
+
+
+def _source_for(clip, downloaded):
+    """Find the downloaded (start, end, path) section containing a clip"""
+    for start_sec, end_sec, path in downloaded:
+        if clip['start'] >= start_sec and (end_sec is None or clip['end'] <= end_sec):
+            return start_sec, path
+    raise ExtractionError(f"No downloaded section covers {clip['timeframe']}")
+
+
+def _cut_args(clips, downloaded, mode):
+    """ffmpeg arguments cutting every clip in one invocation"""
+    if mode == 'copy':
+        codecs = ["-c", "copy"]
+    else:
+        codecs = ["-c:v", "libx264", "-c:a", "aac"]
+
+    inputs = []
+    outputs = []
+    for index, clip in enumerate(clips):
+        section_start, path = _source_for(clip, downloaded)
+        inputs += ["-ss", clip['start'] - section_start, "-t", clip['duration'], "-i", path]
+        outputs += ["-map", f"{index}:v:0?", "-map", f"{index}:a:0?"]
+        outputs += codecs
+        outputs += ["-avoid_negative_ts", "make_zero", clip['output_path']]
+    return inputs + outputs
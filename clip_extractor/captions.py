@@ -0,0 +1,107 @@
+"""
+Streaming WebVTT/SRT caption parser
+
+parse_cues() is a generator over (start, end, text) cues read line by line,
+so a multi-megabyte livestream caption file is never held in memory and
+window() can stop reading as soon as it passes the requested end time.
+Timestamps keep millisecond precision. YouTube's rolling auto-captions,
+where each cue repeats the previous cue's line and 10 ms "transition" cues
+repeat whole cues, are collapsed so every spoken line is emitted once.
+"""
+
+import re
+from collections import namedtuple
+
+TIMING_RE = re.compile(
+    r'^\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})'
+)
+TAG_RE = re.compile(r'<[^>]*>')
+SPACE_RE = re.compile(r'\s+')
+
+Cue = namedtuple('Cue', ['start', 'end', 'text'])
+
+
+def timestamp_to_ms(stamp):
+    """'01:02:03.456', '02:03.456' or '01:02:03,456' -> milliseconds"""
+    clock, _, frac = stamp.replace(',', '.').partition('.')
+    parts = [int(p) for p in clock.split(':')]
+    if len(parts) == 2:
+        parts.insert(0, 0)
+    h, m, s = parts
+    return ((h * 60 + m) * 60 + s) * 1000 + int(frac.ljust(3, '0')[:3])
+
+
+def format_timestamp(seconds):
+    """Seconds -> 'HH:MM:SS.mmm'"""
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def _clean(line):
+    return SPACE_RE.sub(' ', TAG_RE.sub('', line)).strip()
+
+
+def parse_raw(lines):
+    """Yield (start_ms, end_ms, [text lines]) for every cue block
+
+    A block ends at an empty line or at the next timing line. Lines holding
+    only whitespace (YouTube uses ' ' as a placeholder) belong to the cue.
+    """
+    timing = None
+    text = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        match = TIMING_RE.match(line)
+        if match:
+            if timing is not None:
+                yield timing[0], timing[1], text
+            timing = (timestamp_to_ms(match.group(1)), timestamp_to_ms(match.group(2)))
+            text = []
+        elif timing is None:
+            continue
+        elif line:
+            text.append(line)
+        else:
+            yield timing[0], timing[1], text
+            timing = None
+            text = []
+    if timing is not None:
+        yield timing[0], timing[1], text
+
+
+def parse_cues(lines, dedupe=True):
+    """Yield Cue(start, end, text) with start/end in seconds
+
+    lines is any iterable of caption file lines (an open file works). With
+    dedupe, lines already emitted by the previous cue are dropped and cues
+    with nothing new are skipped.
+    """
+    previous = []
+    for start_ms, end_ms, raw in parse_raw(lines):
+        text_lines = [t for t in (_clean(line) for line in raw) if t]
+        if dedupe:
+            new_lines = [t for t in text_lines if t not in previous]
+            if text_lines:
+                previous = text_lines
+            text_lines = new_lines
+        if text_lines:
+            yield Cue(start_ms / 1000, end_ms / 1000, ' '.join(text_lines))
+
+
+def window(cues, start_sec, end_sec):
+    """Cues overlapping [start_sec, end_sec]; stops reading past end_sec"""
+    for cue in cues:
+        if cue.start > end_sec:
+            break
+        if cue.end < start_sec:
+            continue
+        yield cue
+
+
+def read_window(path, start_sec, end_sec, dedupe=True):
+    """List of cues of a caption file overlapping [start_sec, end_sec]"""
+    with open(path, encoding='utf-8') as f:
+        return list(window(parse_cues(f, dedupe), start_sec, end_sec))
@@ -0,0 +1,246 @@
+"""
+Command line interface used by the scripts/*.sh wrappers
+Usage: python3 -m clip_extractor <command> [args...]
+"""
+
+import argparse
+import sys
+
+from .batch import extract_batch
+from .captions import format_timestamp, read_window
+from .cutting import CUT_MODES
+from .errors import ClipExtractorError, InvalidTimeframeError
+from .extract import extract_clip
+from .reel import extract_reel
+from .search import get_search_index
+from .timeframe import parse_time, to_seconds, validate_timeframe
+from .video_id import parse_video_id
+
+RED = '\033[0;31m'
+GREEN = '\033[0;32m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+NC = '\033[0m'  # No Color
+
+RULE = f"{BLUE}════════════════════════════════════════{NC}"
+
+
+def cmd_video_id(args):
+    print(parse_video_id(args.url))
+
+
+def cmd_parse_time(args):
+    print(parse_time(args.time))
+
+
+def cmd_validate(args):
+    validate_timeframe(args.timeframe)
+    print(f"Valid timeframe: {args.timeframe}")
+
+
+def cmd_extract(args):
+    print(RULE)
+    print(f"{BLUE}  YouTube Clip Extractor{NC}")
+    print(RULE)
+
+    def on_stage(step, total, message):
+        print(f"\n{YELLOW}[{step}/{total}]{NC} {message}")
+
+    def log(message):
+        print(f"{GREEN}✓{NC} {message}")
+
+    start, end = validate_timeframe(args.timeframe)
+    result = extract_clip(args.url, start, end, {
+        'output': args.output,
+        'mode': args.mode,
+        'stream': args.stream,
+        'quality': args.quality,
+        'renditions': args.renditions,
+        'on_stage': on_stage,
+        'log': log,
+    })
+
+    size_mb = result['size'] / (1024 * 1024)
+    print()
+    print(RULE)
+    print(f"{GREEN}✅ Complete!{NC}")
+    print(RULE)
+    print()
+    print(f"Output file: {GREEN}{result['output_path']}{NC}")
+    print(f"File size: {size_mb:.1f}M")
+    for rendition in result.get('renditions', [])[1:]:
+        print(f"Also: {GREEN}{rendition['output_path']}{NC}  {rendition['size'] / (1024 * 1024):.1f}M")
+    print(f"Duration: {result['duration']}s")
+    print()
+
+
+def cmd_batch(args):
+    print(RULE)
+    print(f"{BLUE}  YouTube Clip Extractor - Batch{NC}")
+    print(RULE)
+
+    def on_stage(step, total, message):
+        print(f"\n{YELLOW}[{step}/{total}]{NC} {message}")
+
+    def log(message):
+        print(f"{GREEN}✓{NC} {message}")
+
+    result = extract_batch(args.url, args.timeframes, {
+        'output_dir': args.output_dir,
+        'prefix': args.prefix,
+        'mode': args.mode,
+        'quality': args.quality,
+        'on_stage': on_stage,
+        'log': log,
+    })
+
+    print()
+    print(RULE)
+    print(f"{GREEN}✅ Complete!{NC} {len(result['clips'])} clips")
+    print(RULE)
+    print()
+    for clip in result['clips']:
+        size_mb = clip['size'] / (1024 * 1024)
+        print(f"{GREEN}{clip['output_path']}{NC}  {size_mb:.1f}M  {clip['duration']}s")
+    print()
+
+
+def cmd_reel(args):
+    print(RULE)
+    print(f"{BLUE}  YouTube Clip Extractor - Reel{NC}")
+    print(RULE)
+
+    def on_stage(step, total, message):
+        print(f"\n{YELLOW}[{step}/{total}]{NC} {message}")
+
+    def log(message):
+        print(f"{GREEN}✓{NC} {message}")
+
+    if len(args.clips) % 2:
+        raise InvalidTimeframeError("Clips must be given as URL TIMEFRAME pairs")
+    result = extract_reel(list(zip(args.clips[::2], args.clips[1::2])), {
+        'output': args.output,
+        'mode': args.mode,
+        'quality': args.quality,
+        'on_stage': on_stage,
+        'log': log,
+    })
+
+    size_mb = result['size'] / (1024 * 1024)
+    print()
+    print(RULE)
+    print(f"{GREEN}✅ Complete!{NC} {len(result['clips'])} clips")
+    print(RULE)
+    print()
+    for clip in result['clips']:
+        note = "  (re-encoded)" if clip['reencoded'] else ""
+        print(f"{clip['video_id']}  {clip['timeframe']}{note}")
+    print(f"\nOutput file: {GREEN}{result['output_path']}{NC}")
+    print(f"File size: {size_mb:.1f}M")
+    print(f"Duration: {result['duration']}s")
+    print()
+
+
+def cmd_captions(args):
+    cues = read_window(args.file, to_seconds(args.start), to_seconds(args.end),
+                       dedupe=not args.no_dedupe)
+    if not cues:
+        print("No transcript found in this timeframe")
+    for cue in cues:
+        print(f"[{format_timestamp(cue.start)}] {cue.text}")
+
+
+def cmd_search(args):
+    index = get_search_index()
+    if args.reindex:
+        index.index_directory()
+    results = index.search(args.phrase, limit=args.limit)
+    if not results:
+        print("No matches")
+    for hit in results:
+        print(f"{hit['video_id']}  {hit['timeframe']}  [{hit['language']}] {hit['text']}")
+
+
+def cmd_index(args):
+    index = get_search_index()
+    count = index.index_directory(args.directory)
+    stats = index.stats()
+    print(f"Indexed {count} new transcript(s); "
+          f"{stats['transcripts']} transcript(s) from {stats['videos']} video(s) searchable")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="clip_extractor",
+        description="YouTube Clip Extractor"
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('video-id', help="Extract video ID from URL")
+    p.add_argument('url')
+    p.set_defaults(func=cmd_video_id)
+
+    p = sub.add_parser('parse-time', help="Convert time to HH:MM:SS")
+    p.add_argument('time')
+    p.set_defaults(func=cmd_parse_time)
+
+    p = sub.add_parser('validate', help="Validate timeframe format")
+    p.add_argument('timeframe')
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser('extract', help="Extract a clip")
+    p.add_argument('url')
+    p.add_argument('timeframe', help="START-END, e.g. 06:13-06:30")
+    p.add_argument('output', nargs='?', default='clip.mp4')
+    p.add_argument('--mode', choices=CUT_MODES, help="Cut mode (default: exact)")
+    p.add_argument('--quality', help="Quality policy, e.g. 720p, audio or height=720,bitrate=2500")
+    p.add_argument('--renditions', help="Write several renditions from one decode, e.g. 1080p,720p,gif")
+    p.add_argument('--stream', action='store_true', default=None,
+                   help="Pipe the download straight into ffmpeg (no source file on disk)")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser('batch', help="Extract several clips from one video with one download")
+    p.add_argument('url')
+    p.add_argument('timeframes', nargs='+', help="START-END timeframes")
+    p.add_argument('--output-dir', default='.')
+    p.add_argument('--prefix', default='clip')
+    p.add_argument('--mode', choices=CUT_MODES, help="Cut mode (default: exact)")
+    p.add_argument('--quality', help="Quality policy, e.g. 720p, audio or height=720,bitrate=2500")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('reel', help="Join clips from one or more videos into a highlight reel")
+    p.add_argument('output', help="Reel file, e.g. reel.mp4")
+    p.add_argument('clips', nargs='+', help="URL TIMEFRAME pairs, in reel order")
+    p.add_argument('--mode', choices=CUT_MODES, help="Cut mode for the clips (default: exact)")
+    p.add_argument('--quality', help="Quality policy, e.g. 720p")
+    p.set_defaults(func=cmd_reel)
+
+    p = sub.add_parser('captions', help="Print the cues of a VTT/SRT file within a timeframe")
+    p.add_argument('file')
+    p.add_argument('start', help="MM:SS or HH:MM:SS")
+    p.add_argument('end', help="MM:SS or HH:MM:SS")
+    p.add_argument('--no-dedupe', action='store_true', help="Keep repeated rolling-caption lines")
+    p.set_defaults(func=cmd_captions)
+
+    p = sub.add_parser('search', help="Find timeframes where a phrase is spoken in cached transcripts")
+    p.add_argument('phrase')
+    p.add_argument('--limit', type=int, default=20)
+    p.add_argument('--reindex', action='store_true', help="Index new cached transcripts first")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('index', help="Add cached transcripts to the search index")
+    p.add_argument('directory', nargs='?', help="Transcript cache directory")
+    p.set_defaults(func=cmd_index)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except ClipExtractorError as e:
+        prefix = f"{RED}✗{NC} " if args.command in ('extract', 'batch', 'reel') else ''
+        print(f"{prefix}{e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,78 @@
+"""
+Deployment settings, overridable through environment variables
+"""
+
+import os
+from pathlib import Path
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# Root directory for all persistent caches
+CACHE_DIR = Path(os.environ.get(
+    'CLIP_EXTRACTOR_CACHE_DIR',
+    Path.home() / ".cache" / "youtube_clip_extractor"
+))
+
+# yt-dlp --dump-json metadata cache
+METADATA_TTL = _env_int('CLIP_EXTRACTOR_METADATA_TTL', 6 * 3600)
+METADATA_MAX_BYTES = _env_int('CLIP_EXTRACTOR_METADATA_MAX_BYTES', 200 * 1024 * 1024)
+
+# Background job queue
+JOB_WORKERS = _env_int('CLIP_EXTRACTOR_JOB_WORKERS', 4)
+JOB_MAX_QUEUED = _env_int('CLIP_EXTRACTOR_JOB_MAX_QUEUED', 100)
+JOB_RETENTION = _env_int('CLIP_EXTRACTOR_JOB_RETENTION', 3600)
+
+# Batch extraction: ranges closer than this (seconds) share one download section
+BATCH_MERGE_GAP = _env_int('CLIP_EXTRACTOR_BATCH_MERGE_GAP', 5)
+
+# Default cut mode when a downloaded source must be trimmed: copy | smart | exact
+CUT_MODE = os.environ.get('CLIP_EXTRACTOR_CUT_MODE', 'exact')
+
+# Pipe yt-dlp's download straight into ffmpeg instead of writing a source file
+# first (for hosts with slow shared disks or a small scratch filesystem)
+STREAM = os.environ.get('CLIP_EXTRACTOR_STREAM', '').lower() in ('1', 'true', 'yes')
+
+# Default quality policy (see clip_extractor.formats), e.g. '720p' or
+# 'height=720,bitrate=2500'; empty downloads the best MP4 as before
+QUALITY = os.environ.get('CLIP_EXTRACTOR_QUALITY', '')
+
+# Downloaded source media cache
+SOURCE_CACHE_MAX_BYTES = _env_int('CLIP_EXTRACTOR_SOURCE_CACHE_MAX_BYTES', 5 * 1024 ** 3)
+
+# Per-job scratch space; keep it on the same filesystem as CACHE_DIR so cache
+# entries can be hardlinked in rather than copied
+SCRATCH_DIR = Path(os.environ.get('CLIP_EXTRACTOR_SCRATCH_DIR', CACHE_DIR / "scratch"))
+
+# Assemble a range from cached sections (fetching only the gaps) when at
+# least this fraction of it is already cached; otherwise download it whole
+INTERVAL_MIN_COVERAGE = float(os.environ.get('CLIP_EXTRACTOR_INTERVAL_MIN_COVERAGE', '0.5'))
+
+# Fetched transcripts
+TRANSCRIPT_TTL = _env_int('CLIP_EXTRACTOR_TRANSCRIPT_TTL', 7 * 24 * 3600)
+TRANSCRIPT_LANGUAGES = os.environ.get(
+    'CLIP_EXTRACTOR_TRANSCRIPT_LANGUAGES', 'en,ko,ja,zh-Hans,es,fr,de'
+).split(',')
+
+# Transcript phrase search
+SEARCH_DB = Path(os.environ.get('CLIP_EXTRACTOR_SEARCH_DB', CACHE_DIR / "search.sqlite3"))
+SEARCH_PADDING = _env_int('CLIP_EXTRACTOR_SEARCH_PADDING', 2)
+
+# Resized thumbnail cache and the pooled HTTP session that fills it
+THUMBNAIL_MAX_BYTES = _env_int('CLIP_EXTRACTOR_THUMBNAIL_MAX_BYTES', 100 * 1024 * 1024)
+HTTP_POOL_SIZE = _env_int('CLIP_EXTRACTOR_HTTP_POOL_SIZE', 16)
+
+# Parallel encoding: concurrent chunk encodes (default: one per core) and the
+# shortest chunk worth a separate ffmpeg process
+ENCODE_WORKERS = _env_int('CLIP_EXTRACTOR_ENCODE_WORKERS', os.cpu_count() or 1)
+PARALLEL_MIN_CHUNK = _env_int('CLIP_EXTRACTOR_PARALLEL_MIN_CHUNK', 20)
+
+# Multi-process serving (serve.py): job status, shared values and
+# cross-process leases live in one SQLite database when SHARED_STATE is on
+SHARED_STATE = os.environ.get('CLIP_EXTRACTOR_SHARED_STATE', '').lower() in ('1', 'true', 'yes')
+STATE_DB = Path(os.environ.get('CLIP_EXTRACTOR_STATE_DB', CACHE_DIR / "state.sqlite3"))
+SERVER_WORKERS = _env_int('CLIP_EXTRACTOR_SERVER_WORKERS', os.cpu_count() or 1)
+SERVER_THREADS = _env_int('CLIP_EXTRACTOR_SERVER_THREADS', 16)
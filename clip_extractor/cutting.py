@@ -0,0 +1,257 @@
+"""
+Cutting a time range out of a local source file
+
+Modes:
+    copy  -- keyframe-aligned stream copy; near-instant, may start slightly
+             before the requested time (at the preceding keyframe)
+    smart -- re-encode only the partial GOPs before the first and after the
+             last keyframe inside the range, stream-copy everything between;
+             frame accurate at a fraction of the encode cost
+    exact -- re-encode the whole range with libx264 (original behaviour)
+    parallel -- like exact, but the range is split at keyframes into one
+             chunk per core, the chunks are encoded concurrently and joined
+             with the concat demuxer; for long clips on many-core hosts
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config, metrics, progress
+from .diskutil import scratch_dir
+from .errors import InvalidTimeframeError
+from .media import _run_ffmpeg, audio_stream, keyframes, probe, run_ffmpeg, video_stream
+
+CUT_MODES = ('copy', 'smart', 'exact', 'parallel')
+
+# Per chunk/audio ffmpeg timeout in parallel mode
+FFMPEG_CHUNK_TIMEOUT = 3600
+
+# Codecs whose bitstreams libx264 can produce compatible head/tail pieces for
+SMART_CODECS = ('h264',)
+
+# x264 profile names for ffprobe's profile strings
+X264_PROFILES = {
+    'Baseline': 'baseline',
+    'Constrained Baseline': 'baseline',
+    'Main': 'main',
+    'High': 'high',
+}
+
+
+def check_mode(mode):
+    if mode not in CUT_MODES:
+        raise InvalidTimeframeError(
+            f"Invalid cut mode: {mode} (expected one of {', '.join(CUT_MODES)})"
+        )
+    return mode
+
+
+def cut(source, output_path, start_sec, duration, mode='exact', log=None):
+    """Write [start_sec, start_sec + duration] of source to output_path"""
+    check_mode(mode)
+    log = log or (lambda message: None)
+
+    if mode == 'copy':
+        cut_copy(source, output_path, start_sec, duration)
+    elif mode == 'smart':
+        if not cut_smart(source, output_path, start_sec, duration, log):
+            cut_exact(source, output_path, start_sec, duration)
+    elif mode == 'parallel':
+        cut_parallel(source, output_path, start_sec, duration, log)
+    else:
+        cut_exact(source, output_path, start_sec, duration)
+
+
+def cut_exact(source, output_path, start_sec, duration):
+    """Frame accurate cut, re-encoding the whole range"""
+    run_ffmpeg([
+        "-i", source,
+        "-ss", start_sec,
+        "-t", duration,
+        "-c:v", "libx264",
+        "-c:a", "copy",
+        "-avoid_negative_ts", "make_zero",
+        "-fflags", "+genpts",
+        output_path
+    ])
+
+
+def cut_copy(source, output_path, start_sec, duration):
+    """Keyframe-aligned stream copy (no re-encode)"""
+    run_ffmpeg([
+        "-ss", start_sec,
+        "-i", source,
+        "-t", duration,
+        "-map", "0:v:0?",
+        "-map", "0:a:0?",
+        "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        output_path
+    ])
+
+
+def _encode_args(stream):
+    """libx264 options that keep re-encoded pieces concat-compatible"""
+    args = ["-c:v", "libx264"]
+    if stream.get('pix_fmt'):
+        args += ["-pix_fmt", stream['pix_fmt']]
+    profile = X264_PROFILES.get(stream.get('profile'))
+    if profile:
+        args += ["-profile:v", profile]
+    if stream.get('time_base', '').startswith('1/'):
+        args += ["-video_track_timescale", stream['time_base'][2:]]
+    return args
+
+
+def cut_smart(source, output_path, start_sec, duration, log):
+    """Smart cut; returns False if the source can't be smart-cut"""
+    end_sec = start_sec + duration
+    stream = video_stream(probe(source))
+    if stream is None or stream.get('codec_name') not in SMART_CODECS:
+        log("Smart cut needs an H.264 source, re-encoding instead")
+        return False
+
+    inside = [t for t in keyframes(source, start_sec, end_sec) if start_sec <= t <= end_sec]
+    if len(inside) < 2:
+        log("Range spans fewer than two keyframes, re-encoding instead")
+        return False
+    first_key, last_key = inside[0], inside[-1]
+
+    encode = _encode_args(stream)
+    with scratch_dir("smartcut_", config.SCRATCH_DIR) as scratch:
+        pieces = []
+        if first_key > start_sec:
+            head = scratch / "head.mp4"
+            run_ffmpeg(["-ss", start_sec, "-i", source, "-t", first_key - start_sec,
+                        "-an"] + encode + [head])
+            pieces.append(head)
+
+        middle = scratch / "middle.mp4"
+        run_ffmpeg(["-ss", first_key, "-i", source, "-t", last_key - first_key,
+                    "-an", "-c:v", "copy", "-avoid_negative_ts", "make_zero", middle])
+        pieces.append(middle)
+
+        if end_sec > last_key:
+            tail = scratch / "tail.mp4"
+            run_ffmpeg(["-ss", last_key, "-i", source, "-t", end_sec - last_key,
+                        "-an"] + encode + [tail])
+            pieces.append(tail)
+
+        concat_list = scratch / "pieces.txt"
+        concat_list.write_text("".join(f"file '{p}'\n" for p in pieces))
+        video = scratch / "video.mp4"
+        run_ffmpeg(["-f", "concat", "-safe", "0", "-i", concat_list, "-c", "copy", video])
+
+        # Audio is cheap: cut it sample-accurately and mux with the video
+        run_ffmpeg([
+            "-i", video,
+            "-ss", start_sec, "-t", duration, "-i", source,
+            "-map", "0:v:0", "-map", "1:a:0?",
+            "-c:v", "copy", "-c:a", "aac",
+            "-shortest",
+            output_path
+        ])
+
+    log(f"Smart cut: re-encoded {first_key - start_sec + end_sec - last_key:.1f}s "
+        f"of {duration}s")
+    return True
+
+
+def chunk_bounds(start_sec, end_sec, chunks, keys=()):
+    """Split [start_sec, end_sec] into chunks pieces of about equal length
+
+    Each inner boundary snaps to the nearest keyframe in keys (when one is
+    closer than half a chunk), so no chunk has to decode frames that
+    belong to its neighbour. Returns [(start, end), ...].
+    """
+    length = (end_sec - start_sec) / chunks
+    bounds = [start_sec]
+    for i in range(1, chunks):
+        target = start_sec + i * length
+        nearest = min(keys, key=lambda t: abs(t - target), default=None)
+        if nearest is not None and abs(nearest - target) < length / 2:
+            target = nearest
+        if bounds[-1] < target < end_sec:
+            bounds.append(target)
+    bounds.append(end_sec)
+    return list(zip(bounds, bounds[1:]))
+
+
+def chunk_progress(report, count):
+    """Per-chunk progress reporters folding count concurrent ffmpeg runs
+    into one stream of events for report
+
+    out_time, bytes, fps and speed are summed over the chunks, so
+    out_time / clip duration is the fraction of the whole clip encoded.
+    Returns reporter(index) giving the callback for chunk index.
+    """
+    latest = [None] * count
+    lock = threading.Lock()
+
+    def reporter(index):
+        def on_event(event):
+            with lock:
+                latest[index] = event
+                combined = {'source': 'encode'}
+                for key in ('out_time', 'fps', 'speed', 'bytes'):
+                    values = [e[key] for e in latest if e is not None and e[key] is not None]
+                    combined[key] = sum(values) if values else None
+                combined['done'] = all(e is not None and e.get('done') for e in latest)
+                report(combined)
+        return on_event
+    return reporter
+
+
+def cut_parallel(source, output_path, start_sec, duration, log, workers=None):
+    """Frame accurate cut encoded as concurrent keyframe-aligned chunks"""
+    workers = workers or config.ENCODE_WORKERS
+    chunks = min(workers, int(duration // config.PARALLEL_MIN_CHUNK))
+    info = probe(source)
+    stream = video_stream(info)
+    if chunks < 2 or stream is None:
+        log("Clip too short to split (or no video), encoding in one piece")
+        cut_exact(source, output_path, start_sec, duration)
+        return
+
+    end_sec = start_sec + duration
+    bounds = chunk_bounds(start_sec, end_sec, chunks, keyframes(source, start_sec, end_sec))
+    # Share the cores out instead of letting every x264 claim all of them
+    threads = str(max(1, (os.cpu_count() or 1) // len(bounds)))
+    encode = _encode_args(stream) + ["-threads", threads]
+
+    # Pool threads don't see this thread's reporter: hand each chunk one
+    # that adds its progress into a single event stream
+    report = progress.current()
+    chunk_reporter = chunk_progress(report, len(bounds)) if report is not None else None
+
+    with scratch_dir("parallel_", config.SCRATCH_DIR) as scratch:
+        jobs = []
+        for i, (chunk_start, chunk_end) in enumerate(bounds):
+            chunk = scratch / f"chunk_{i:03d}.mp4"
+            jobs.append((["-ss", chunk_start, "-i", source, "-t", chunk_end - chunk_start,
+                          "-an"] + encode + [chunk], chunk, chunk_reporter and chunk_reporter(i)))
+        pieces = [chunk for _, chunk, _ in jobs]
+        # Without an audio stream ffmpeg would fail the audio job
+        audio = scratch / "audio.m4a" if audio_stream(info) is not None else None
+        if audio is not None:
+            jobs.append((["-ss", start_sec, "-t", duration, "-i", source,
+                          "-vn", "-c:a", "aac", audio], audio, None))
+
+        def run(job):
+            args, _, reporter = job
+            with progress.reporting(reporter):
+                _run_ffmpeg(args, FFMPEG_CHUNK_TIMEOUT)
+
+        # Each job is its own ffmpeg process; the threads only wait on them
+        with metrics.timed('encode'), ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            list(pool.map(run, jobs))
+
+        concat_list = scratch / "chunks.txt"
+        concat_list.write_text("".join(f"file '{chunk}'\n" for chunk in pieces))
+        args = ["-f", "concat", "-safe", "0", "-i", concat_list]
+        if audio is not None:
+            args += ["-i", audio, "-map", "0:v:0", "-map", "1:a:0", "-shortest"]
+        run_ffmpeg(args + ["-c", "copy", output_path])
+
+    log(f"Parallel encode: {len(bounds)} chunks on {workers} worker(s)")
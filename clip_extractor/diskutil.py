@@ -0,0 +1,92 @@
+"""
+Shared helpers for the on-disk caches
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def touch(path):
+    """Mark a cache entry as recently used (LRU is ordered by mtime)"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def evict_lru(directory, pattern, max_bytes):
+    """Delete the least recently used files matching pattern until the
+    directory's matching files total at most max_bytes
+
+    Returns the number of bytes freed.
+    """
+    entries = []
+    total = 0
+    for path in directory.glob(pattern):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    freed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        freed += size
+    return freed
+
+
+def atomic_move(src, dest):
+    """Move src to dest so readers never see a partially written dest"""
+    try:
+        os.replace(src, dest)
+        return
+    except OSError:
+        pass
+
+    # Different filesystem: copy next to dest, then rename into place
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    os.unlink(src)
+
+
+def link_or_copy(src, dest):
+    """Hardlink src to dest (so later eviction can't pull it from under a
+    reader), copying if the filesystem doesn't allow it"""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+@contextmanager
+def scratch_dir(prefix, parent):
+    """Private working directory for one job, removed afterwards
+
+    Concurrent jobs on the same video never share intermediate files.
+    """
+    parent.mkdir(parents=True, exist_ok=True)
+    path = Path(tempfile.mkdtemp(prefix=prefix, dir=parent))
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
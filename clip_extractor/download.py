@@ -0,0 +1,84 @@
+"""
+yt-dlp wrappers
+"""
+
+import subprocess
+
+from . import metrics, progress
+from .errors import DownloadError
+from .timeframe import seconds_to_time
+from .video_id import watch_url
+
+DEFAULT_FORMAT = "best[ext=mp4]/best"
+DOWNLOAD_TIMEOUT = 300
+
+# A video+audio pair (e.g. VP9 + Opus) would otherwise be merged into WebM
+# or MKV, and later copied unchanged into a .mp4 clip
+MERGE_ARGS = ["--merge-output-format", "mp4"]
+
+
+def _run_yt_dlp(args, timeout=DOWNLOAD_TIMEOUT):
+    cmd = ["yt-dlp", "--quiet", "--no-warnings"]
+    report = progress.current()
+    try:
+        if report is None:
+            return subprocess.run(
+                cmd + [str(a) for a in args],
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+
+        def on_line(line):
+            event = progress.parse_yt_dlp_line(line)
+            if event is not None:
+                report(event)
+
+        cmd += progress.YT_DLP_ARGS + [str(a) for a in args]
+        returncode, stderr = progress.run_streaming(cmd, on_line, timeout)
+        return subprocess.CompletedProcess(cmd, returncode, '', stderr)
+    except FileNotFoundError:
+        raise DownloadError("yt-dlp not found")
+    except subprocess.TimeoutExpired:
+        raise DownloadError("Download timed out")
+
+
+def download_sections(video_id, ranges, directory, fmt=DEFAULT_FORMAT):
+    """Download several (start, end) ranges with a single yt-dlp invocation
+
+    Returns a list of (start, end, path) tuples, one per range. If the
+    section download fails, the full video is downloaded once instead and a
+    single (0, None, path) entry covering everything is returned.
+    """
+    with metrics.timed('download'):
+        return _download_sections(video_id, ranges, directory, fmt)
+
+
+def _download_sections(video_id, ranges, directory, fmt):
+    args = ["--format", fmt, *MERGE_ARGS, "--output", str(directory / "section_%(section_start)s.%(ext)s")]
+    for start_sec, end_sec in ranges:
+        args += ["--download-sections", f"*{seconds_to_time(start_sec)}-{seconds_to_time(end_sec)}"]
+    _run_yt_dlp(args + [watch_url(video_id)])
+
+    # Map files back to ranges by the section start encoded in the name
+    by_start = {}
+    for path in directory.glob("section_*"):
+        try:
+            by_start[float(path.stem[len("section_"):])] = path
+        except ValueError:
+            continue
+
+    sections = []
+    for start_sec, end_sec in ranges:
+        path = by_start.get(float(start_sec))
+        if path is None:
+            break
+        sections.append((start_sec, end_sec, path))
+    if len(sections) == len(ranges):
+        return sections
+
+    full_path = directory / "full.mp4"
+    result = _run_yt_dlp(["--format", fmt, *MERGE_ARGS, "--output", full_path, watch_url(video_id)])
+    if not full_path.exists():
+        raise DownloadError(f"Failed to download video: {result.stderr.strip()}")
+    return [(0, None, full_path)]
@@ -0,0 +1,39 @@
+"""
+Exceptions raised by the clip extractor core library
+"""
+
+
+class ClipExtractorError(Exception):
+    """Base class for all clip extractor errors"""
+
+
+class InvalidURLError(ClipExtractorError, ValueError):
+    """Raised when a video ID cannot be extracted from a URL"""
+
+
+class InvalidTimeframeError(ClipExtractorError, ValueError):
+    """Raised when a time or timeframe string is malformed"""
+
+
+class InvalidQualityError(ClipExtractorError, ValueError):
+    """Raised when a quality policy spec is malformed"""
+
+
+class InvalidRenditionError(ClipExtractorError, ValueError):
+    """Raised when an output rendition spec is malformed"""
+
+
+class DownloadError(ClipExtractorError):
+    """Raised when yt-dlp fails to produce the requested media"""
+
+
+class ExtractionError(ClipExtractorError):
+    """Raised when ffmpeg/ffprobe fail to produce the output clip"""
+
+
+class QueueFullError(ClipExtractorError):
+    """Raised when the job queue has no room for another job"""
+
+
+class TranscriptError(ClipExtractorError):
+    """Raised when no transcript can be fetched for a video"""
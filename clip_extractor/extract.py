@@ -0,0 +1,168 @@
+"""
+Clip extraction pipeline
+In-process equivalent of the original extract_clip.sh
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from . import config, metrics, progress
+from .audio import audio_format, cut_audio, source_codec
+from .cutting import check_mode, cut
+from .diskutil import scratch_dir
+from .errors import ExtractionError
+from .formats import check_quality, resolve_format
+from .intervals import coverage
+from .media import probe
+from .renditions import parse_renditions, render, rendition_path
+from .source_cache import get_source_cache
+from .sources import fetch_sources
+from .streaming import stream_clip
+from .timeframe import check_range, seconds_to_time, to_seconds
+from .video_id import parse_video_id
+
+TOTAL_STAGES = 5
+
+# Slack (seconds) allowed before a section download is re-cut with ffmpeg
+SECTION_SLACK = 5
+# ...as long as the section starts within this many seconds of the clip
+OFFSET_SLACK = 0.5
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+def extract_clip(url, start, end, opts=None):
+    """Extract [start, end] of a YouTube video to a local clip
+
+    start/end may be seconds or MM:SS / HH:MM:SS strings.
+
+    opts (all optional):
+        output    -- output file path (default 'clip.mp4'); a .m4a, .mp3 or
+                     .opus path extracts only the audio (see clip_extractor.audio)
+        mode      -- cut mode: 'copy', 'smart', 'exact' or 'parallel' (default from
+                     CLIP_EXTRACTOR_CUT_MODE, 'exact' if unset)
+        renditions -- list of rendition specs (e.g. ['1080p', '720p', 'gif']);
+                     instead of one clip, write every rendition next to output
+                     (clip_720p.mp4, clip_gif.gif, ...) from a single decode,
+                     see clip_extractor.renditions
+        quality   -- quality policy spec, e.g. '720p' or 'audio' (default from
+                     CLIP_EXTRACTOR_QUALITY; see clip_extractor.formats)
+        cache     -- consult/populate the local source cache (default True)
+        stream    -- pipe the download straight into ffmpeg instead of going
+                     through a source file (default from CLIP_EXTRACTOR_STREAM);
+                     ranges already in the source cache are still cut from it
+        on_stage  -- callable(step, total, message) called as each stage starts
+        on_progress -- callable(event) receiving live yt-dlp/ffmpeg progress
+                     events (see clip_extractor.progress)
+        log       -- callable(message) for informational messages
+
+    Returns a dict with video_id, output_path, start, end, duration and size,
+    plus a 'renditions' list (name, output_path, size) when renditions were
+    requested; output_path and size then describe the first of them.
+    """
+    opts = opts or {}
+    output_path = Path(opts.get('output') or 'clip.mp4')
+    mode = check_mode(opts.get('mode') or config.CUT_MODE)
+    quality = check_quality(opts.get('quality'))
+    on_stage = opts.get('on_stage') or _noop
+    log = opts.get('log') or _noop
+    renditions = [
+        (rendition, rendition_path(output_path, rendition))
+        for rendition in parse_renditions(opts.get('renditions') or [])
+    ]
+    audio = None if renditions else audio_format(output_path)
+
+    on_stage(1, TOTAL_STAGES, "Parsing video URL...")
+    # One observation per job for the whole parse stage, as in batch and reel
+    with metrics.timed('parse'):
+        video_id = parse_video_id(url)
+        log(f"Video ID: {video_id}")
+
+        on_stage(2, TOTAL_STAGES, "Validating timeframe...")
+        start_sec, end_sec = check_range(to_seconds(start), to_seconds(end))
+
+    on_stage(3, TOTAL_STAGES, "Parsing timestamps...")
+    duration = end_sec - start_sec
+    log(f"Start: {seconds_to_time(start_sec)}")
+    log(f"End: {seconds_to_time(end_sec)}")
+
+    on_stage(4, TOTAL_STAGES, "Downloading audio segment..." if audio else "Downloading video segment...")
+    fmt = resolve_format(video_id, quality, audio and source_codec(audio))
+    log(f"Format: {fmt}")
+    report = opts.get('on_progress')
+    if report is not None:
+        report = progress.with_fraction(report, duration)
+    stream = opts.get('stream')
+    if stream is None:
+        stream = config.STREAM
+    use_cache = opts.get('cache', True)
+    # Audio sections are small enough that piping them buys nothing, and
+    # whether they can be stream copied is only known once probed
+    if stream and not audio and not renditions and not (use_cache and _cached(video_id, fmt, start_sec, end_sec)):
+        on_stage(5, TOTAL_STAGES, "Streaming clip through ffmpeg...")
+        fmt = resolve_format(video_id, quality, mp4=True)
+        log(f"Streaming download into ffmpeg ({mode} mode)")
+        with progress.reporting(report):
+            stream_clip(video_id, start_sec, end_sec, output_path, mode, fmt)
+    else:
+        with progress.reporting(report), scratch_dir(f"{video_id}_", config.SCRATCH_DIR) as scratch:
+            [(section_start, _, source)] = fetch_sources(
+                video_id, [(start_sec, end_sec)], scratch, use_cache, log, fmt
+            )
+
+            on_stage(5, TOTAL_STAGES, "Extracting clip...")
+            if renditions:
+                log(f"Rendering {', '.join(r['name'] for r, _ in renditions)} from one decode")
+                render(source, renditions, start_sec - section_start, duration)
+            elif audio:
+                cut_audio(source, output_path, start_sec - section_start, duration, log)
+            else:
+                _cut(source, output_path, start_sec - section_start, duration, mode, log)
+
+    outputs = [path for _, path in renditions] or [output_path]
+    for path in outputs:
+        if not path.exists():
+            raise ExtractionError(f"Failed to create clip {path}")
+
+    result = {
+        'video_id': video_id,
+        'output_path': str(output_path),
+        'start': start_sec,
+        'end': end_sec,
+        'duration': duration,
+        'mode': mode,
+        'audio': audio,
+    }
+    if renditions:
+        result['renditions'] = [
+            {'name': rendition['name'], 'output_path': str(path), 'size': os.path.getsize(path)}
+            for rendition, path in renditions
+        ]
+        result['output_path'] = result['renditions'][0]['output_path']
+    result['size'] = os.path.getsize(result['output_path'])
+    return result
+
+
+def _cached(video_id, fmt, start_sec, end_sec):
+    """Whether the source cache holds all of [start_sec, end_sec]"""
+    plan = get_source_cache().index(video_id, fmt).cover(start_sec, end_sec)
+    return coverage(plan) >= 1.0
+
+
+def _cut(source, output_path, start_sec, duration, mode, log):
+    """Produce output_path from a downloaded source file"""
+    source_duration = probe(source)['duration']
+
+    # A cached section can start before the clip, so the length alone says
+    # nothing: the source must also start at the clip's start
+    if start_sec < OFFSET_SLACK and int(source_duration) <= duration + SECTION_SLACK:
+        # Already roughly the right range (yt-dlp section download worked)
+        log("Using downloaded segment directly")
+        shutil.move(str(source), str(output_path))
+        return
+
+    log(f"Extracting timeframe with ffmpeg ({mode} mode)")
+    cut(source, output_path, start_sec, duration, mode, log)
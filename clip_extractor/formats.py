@@ -0,0 +1,202 @@
+"""
+Quality policies: which yt-dlp format to download
+
+A policy caps what a clip needs (max height, max total bitrate in kbit/s),
+states a codec preference, or asks for audio only. It is resolved against the
+format list of the cached --dump-json metadata to the cheapest stream (or
+video+audio pair) that satisfies it, so a 720p clip of a 4K video downloads
+720p bytes. Policies are given as a spec string, per request or per
+deployment (CLIP_EXTRACTOR_QUALITY):
+
+    best                         no policy (DEFAULT_FORMAT, as before)
+    720p                         max height 720
+    audio                        audio only
+    height=720,bitrate=2500,codec=vp9
+                                 any combination of height, bitrate, codec
+                                 (h264, vp9, av1, aac, opus) and audio
+"""
+
+import re
+
+from . import config
+from .download import DEFAULT_FORMAT
+from .errors import ClipExtractorError, InvalidQualityError
+from .metadata import get_metadata
+
+# vcodec/acodec prefixes yt-dlp reports for each codec name
+CODECS = {
+    'h264': ('avc1', 'h264'),
+    'vp9': ('vp09', 'vp9'),
+    'av1': ('av01',),
+    'aac': ('mp4a', 'aac'),
+    'opus': ('opus',),
+}
+
+# Clips are H.264/AAC MP4, so without a preference those stream copy cleanly
+DEFAULT_VIDEO_CODEC = 'h264'
+DEFAULT_AUDIO_CODEC = 'aac'
+
+PRESET_RE = re.compile(r'^(\d+)p$')
+
+
+def parse_quality(spec):
+    """Parse a quality spec string into a policy dict
+
+    Returns {'max_height', 'max_bitrate', 'codec', 'audio_only'}, or {} for
+    no policy. Raises InvalidQualityError for anything it can't read.
+    """
+    spec = (spec or '').strip().lower()
+    if spec in ('', 'best'):
+        return {}
+    policy = {'max_height': None, 'max_bitrate': None, 'codec': None, 'audio_only': False}
+    for part in spec.split(','):
+        key, _, value = part.strip().partition('=')
+        preset = PRESET_RE.match(key)
+        try:
+            if preset and not value:
+                policy['max_height'] = int(preset.group(1))
+            elif key == 'audio' and not value:
+                policy['audio_only'] = True
+            elif key == 'height':
+                policy['max_height'] = int(value)
+            elif key == 'bitrate':
+                policy['max_bitrate'] = int(value)
+            elif key == 'codec' and value in CODECS:
+                policy['codec'] = value
+            else:
+                raise ValueError(part)
+        except ValueError:
+            raise InvalidQualityError(f"Invalid quality: {part.strip()!r}")
+    return policy
+
+
+def check_quality(spec):
+    """Validate a quality spec, returning it unchanged"""
+    parse_quality(spec)
+    return spec
+
+
+def _bitrate(fmt, duration=None):
+    """Total kbit/s of a format, estimated from its size if not reported"""
+    for key in ('tbr', 'vbr', 'abr'):
+        if fmt.get(key):
+            return float(fmt[key])
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size and duration:
+        return size * 8 / 1000 / duration
+    return None
+
+
+def _has(fmt, kind):
+    codec = fmt.get(kind)
+    return bool(codec) and codec != 'none'
+
+
+def _matches(fmt, kind, codec):
+    return (fmt.get(kind) or '').lower().startswith(CODECS[codec])
+
+
+def select_format(formats, policy, duration=None):
+    """Cheapest format id ('18') or pair ('136+140') satisfying policy, or None
+
+    Video: the tallest height within the caps; among those, streams in the
+    preferred codec first, then the lowest bitrate. Audio only: the highest
+    bitrate within the cap, preferred codec first. A policy with 'mp4' set
+    only considers H.264 video and AAC audio.
+    """
+    audio = [f for f in formats if _has(f, 'acodec') and not _has(f, 'vcodec')]
+    max_bitrate = policy.get('max_bitrate')
+    mp4 = policy.get('mp4')
+    if mp4:
+        audio = [f for f in audio if _matches(f, 'acodec', 'aac')]
+
+    def within(bitrate):
+        return max_bitrate is None or (bitrate is not None and bitrate <= max_bitrate)
+
+    if policy.get('audio_only'):
+        codec = policy.get('codec') if policy.get('codec') in ('aac', 'opus') else DEFAULT_AUDIO_CODEC
+        candidates = [(f, _bitrate(f, duration)) for f in audio]
+        candidates = [(f, b) for f, b in candidates if within(b)]
+        if not candidates:
+            return None
+        best, _ = min(candidates, key=lambda c: (
+            not _matches(c[0], 'acodec', codec), -(c[1] or 0)
+        ))
+        return str(best['format_id'])
+
+    codec = policy.get('codec') if policy.get('codec') in ('h264', 'vp9', 'av1') else DEFAULT_VIDEO_CODEC
+    max_height = policy.get('max_height')
+    candidates = []
+    for f in formats:
+        if not _has(f, 'vcodec') or not f.get('height'):
+            continue
+        if mp4 and not (_matches(f, 'vcodec', 'h264')
+                        and (not _has(f, 'acodec') or _matches(f, 'acodec', 'aac'))):
+            continue
+        if max_height is not None and f['height'] > max_height:
+            continue
+        if _has(f, 'acodec'):
+            candidates.append((f, str(f['format_id']), _bitrate(f, duration)))
+            continue
+        # Video only: pair with the best audio that muxes with it
+        pairing = DEFAULT_AUDIO_CODEC if _matches(f, 'vcodec', 'h264') else 'opus'
+        audio_for = sorted(audio, key=lambda a: (
+            not _matches(a, 'acodec', pairing), -(_bitrate(a, duration) or 0)
+        ))
+        if not audio_for:
+            continue
+        video_rate, audio_rate = _bitrate(f, duration), _bitrate(audio_for[0], duration)
+        rate = None if video_rate is None or audio_rate is None else video_rate + audio_rate
+        candidates.append((f, f"{f['format_id']}+{audio_for[0]['format_id']}", rate))
+
+    candidates = [c for c in candidates if within(c[2])]
+    if not candidates:
+        return None
+    _, chosen, _ = min(candidates, key=lambda c: (
+        -c[0]['height'], not _matches(c[0], 'vcodec', codec), c[2] if c[2] is not None else float('inf')
+    ))
+    return chosen
+
+
+def policy_selector(policy):
+    """Plain yt-dlp selector for a policy, used when no format list is at hand"""
+    caps = ""
+    if policy.get('max_bitrate'):
+        caps += f"[tbr<={policy['max_bitrate']}]"
+    if policy.get('audio_only'):
+        alternatives = [f"ba{caps}", "ba", "b"]
+    else:
+        if policy.get('max_height'):
+            caps = f"[height<={policy['max_height']}]" + caps
+        if policy.get('mp4'):
+            alternatives = [f"bv*[vcodec^=avc1]{caps}+ba[acodec^=mp4a]", f"b[ext=mp4]{caps}", DEFAULT_FORMAT]
+        else:
+            alternatives = [f"bv*{caps}+ba", f"b{caps}", "b"]
+    return "/".join(dict.fromkeys(alternatives))
+
+
+def resolve_format(video_id, quality=None, audio_codec=None, mp4=False):
+    """yt-dlp --format value for a video under a quality spec
+
+    quality defaults to CLIP_EXTRACTOR_QUALITY. audio_codec ('aac' or
+    'opus') turns the policy into an audio-only one preferring that codec,
+    keeping its bitrate cap. mp4 limits video selections to H.264/AAC, for
+    outputs that can't be remuxed from WebM codecs (streamed MPEG-TS). The
+    chosen format id is followed by the generic selector as a fallback, in
+    case the cached format list has gone stale.
+    """
+    policy = parse_quality(config.QUALITY if quality is None else quality)
+    if audio_codec:
+        policy = {'max_height': None, 'max_bitrate': policy.get('max_bitrate'),
+                  'codec': audio_codec, 'audio_only': True}
+    if not policy:
+        return DEFAULT_FORMAT
+    if mp4:
+        policy = dict(policy, mp4=True)
+    selector = policy_selector(policy)
+    try:
+        info = get_metadata(video_id)
+    except ClipExtractorError:
+        return selector
+    chosen = select_format(info.get('formats') or [], policy, info.get('duration'))
+    return f"{chosen}/{selector}" if chosen else selector
@@ -0,0 +1,77 @@
+"""
+Interval index over the cached sections of one video
+
+Each entry is a file covering [start, end) of the video (end None for a
+full download). cover() plans how to assemble a requested range from
+cached entries plus the gaps that still need fetching.
+"""
+
+import math
+
+from .timeframe import merge_ranges
+
+
+class Entry:
+    """One cached file and the video interval it holds"""
+
+    def __init__(self, start, end, path):
+        self.start = start
+        self.end = math.inf if end is None else end
+        self.path = path
+
+    @property
+    def is_full(self):
+        return self.end == math.inf
+
+    def __repr__(self):
+        return f"Entry({self.start}, {self.end}, {self.path})"
+
+
+class IntervalIndex:
+    """Which intervals of a video are available locally"""
+
+    def __init__(self, entries=()):
+        self.entries = sorted(entries, key=lambda e: (e.start, -e.end))
+
+    def add(self, start, end, path):
+        self.entries.append(Entry(start, end, path))
+        self.entries.sort(key=lambda e: (e.start, -e.end))
+
+    def covered(self):
+        """Merged list of (start, end) intervals available locally"""
+        return merge_ranges([(e.start, e.end) for e in self.entries])
+
+    def cover(self, start, end):
+        """Plan [start, end) as a list of (piece_start, piece_end, entry)
+
+        Pieces are contiguous and in order; entry is None for gaps that are
+        not cached. Among overlapping entries the one reaching furthest is
+        used, so the plan has as few pieces as possible.
+        """
+        plan = []
+        cur = start
+        while cur < end:
+            best = None
+            for entry in self.entries:
+                if entry.start <= cur < entry.end and (best is None or entry.end > best.end):
+                    best = entry
+            if best is not None:
+                piece_end = min(best.end, end)
+                plan.append((cur, piece_end, best))
+            else:
+                later = [e.start for e in self.entries if e.start > cur]
+                piece_end = min(later + [end])
+                plan.append((cur, piece_end, None))
+            cur = piece_end
+        return plan
+
+    def gaps(self, start, end):
+        """Sub-ranges of [start, end) that are not cached"""
+        return [(s, e) for s, e, entry in self.cover(start, end) if entry is None]
+
+
+def coverage(plan):
+    """Fraction of a cover() plan served from cached entries"""
+    total = sum(e - s for s, e, _ in plan)
+    cached = sum(e - s for s, e, entry in plan if entry is not None)
+    return cached / total if total else 0.0
@@ -0,0 +1,269 @@
+"""
+Background job queue
+Runs long extractions on a bounded worker pool and tracks their state so
+HTTP handlers can return a job ID immediately and be polled for status.
+
+With a shared store (see clip_extractor.shared_state) every job's status is
+also written there, so when the web GUI runs as several processes any of
+them can answer for a job another one is running.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config, metrics
+from .errors import QueueFullError
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+FINISHED_STATES = (DONE, FAILED)
+
+# Seconds between status writes to the shared store for a changing job,
+# and between reads when following another process's job
+STORE_INTERVAL = 0.25
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """State of one queued unit of work"""
+
+    def __init__(self, kind, params=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.state = QUEUED
+        self.progress = 0.0
+        self.stage = "Queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.transfer = None
+        self.timings = None
+        self.version = 0
+        self._step = (0, 1)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def _touch(self):
+        """Wake wait() callers; call with _lock held"""
+        self.version += 1
+        self._changed.notify_all()
+
+    def update(self, progress=None, stage=None):
+        """Report progress (0.0-1.0) and/or a human readable stage"""
+        with self._lock:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            if stage is not None:
+                self.stage = stage
+            self._touch()
+
+    def on_stage(self, step, total, message):
+        """extract_clip on_stage callback"""
+        with self._lock:
+            self._step = (step, total)
+            self.transfer = None
+        self.update(progress=(step - 1) / total, stage=message)
+
+    def on_progress(self, event):
+        """extract_clip on_progress callback
+
+        Keeps the latest yt-dlp/ffmpeg event and advances progress within
+        the current stage by the event's fraction.
+        """
+        with self._lock:
+            self.transfer = event
+            step, total = self._step
+            if event.get('fraction') is not None and step:
+                self.progress = max(self.progress, (step - 1 + event['fraction']) / total)
+            self._touch()
+
+    def wait(self, version, timeout=None):
+        """Block until the job changes past version (or timeout); returns
+        the current version"""
+        with self._lock:
+            if self.version == version and self.state not in FINISHED_STATES:
+                self._changed.wait(timeout)
+            return self.version
+
+    def to_dict(self):
+        with self._lock:
+            result = self.result or {}
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'state': self.state,
+                'progress': round(self.progress, 3),
+                'stage': self.stage,
+                'transfer': self.transfer,
+                'timings': self.timings,
+                'output_path': result.get('output_path'),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'version': self.version,
+            }
+
+
+class JobQueue:
+    """Bounded worker pool with job status tracking"""
+
+    def __init__(self, workers=None, max_queued=None, retention=None, store=None):
+        self.workers = workers or config.JOB_WORKERS
+        self.max_queued = config.JOB_MAX_QUEUED if max_queued is None else max_queued
+        self.retention = config.JOB_RETENTION if retention is None else retention
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="clip-job"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.store = store
+        self._stopped = threading.Event()
+        if store is not None:
+            threading.Thread(target=self._save_changes, name="clip-job-store", daemon=True).start()
+
+    def submit(self, kind, target, params=None):
+        """Queue target(job) for execution and return the Job
+
+        target receives the Job so it can call job.update()/job.on_stage;
+        its return value (a dict) becomes job.result.
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._prune()
+            if self.store is not None:
+                # The limit covers the jobs of every process sharing the store
+                full = not self.store.add_job(job.to_dict(), self.max_queued)
+            else:
+                full = sum(1 for j in self._jobs.values() if j.state not in FINISHED_STATES) >= self.max_queued
+            if full:
+                raise QueueFullError("Too many jobs in progress, try again later")
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, target)
+        return job
+
+    def get(self, job_id):
+        """The Job if this process runs it, else None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Job.to_dict() of a job run by this or (with a store) any other
+        process sharing the store; None for an unknown job"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get_job(job_id) if self.store is not None else None
+
+    def wait(self, job_id, version, timeout=None):
+        """status() once the job changes past version, it finishes or
+        timeout passes
+
+        Jobs of other processes are followed by polling the store.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            job.wait(version, timeout)
+            return job.to_dict()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if (status is None or status['version'] != version
+                    or status['state'] in FINISHED_STATES
+                    or (deadline is not None and time.monotonic() >= deadline)):
+                return status
+            time.sleep(STORE_INTERVAL)
+
+    def _run(self, job, target):
+        with job._lock:
+            job.state = RUNNING
+            job.started_at = time.time()
+            job._touch()
+        error = None
+        with metrics.collecting() as collected:
+            try:
+                result = target(job)
+            except Exception as e:
+                error = e
+
+        with job._lock:
+            job.timings = collected
+            job.finished_at = time.time()
+            if error is not None:
+                job.state = FAILED
+                job.error = str(error)
+            else:
+                job.result = result
+                job.state = DONE
+                job.progress = 1.0
+                job.stage = "Complete"
+            job._touch()
+        if self.store is not None:
+            self._save(job)
+        self._record(job)
+
+    def _save(self, job):
+        try:
+            self.store.save_job(job.to_dict())
+        except Exception:
+            logger.exception("Could not save job %s to the shared store", job.id)
+
+    def _save_changes(self):
+        """Write changed unfinished jobs to the store, at most every
+        STORE_INTERVAL (progress events can arrive many times a second)"""
+        saved = {}
+        while not self._stopped.wait(STORE_INTERVAL):
+            with self._lock:
+                active = [j for j in self._jobs.values() if j.state not in FINISHED_STATES]
+            for job in active:
+                if saved.get(job.id) != job.version:
+                    saved[job.id] = job.version
+                    self._save(job)
+            live = {job.id for job in active}
+            saved = {job_id: v for job_id, v in saved.items() if job_id in live}
+
+    def _record(self, job):
+        """Job duration histogram plus one JSON summary log line"""
+        duration = job.finished_at - job.started_at
+        metrics.registry.observe(metrics.JOB_SECONDS, duration, kind=job.kind, state=job.state)
+        logger.info(json.dumps({
+            'event': 'job_finished',
+            'id': job.id,
+            'kind': job.kind,
+            'state': job.state,
+            'queued_seconds': round(job.started_at - job.created_at, 3),
+            'run_seconds': round(duration, 3),
+            'stages': {stage: round(sec, 3) for stage, sec in job.timings['stages'].items()},
+            'cache': job.timings['cache'],
+            'error': job.error,
+        }))
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.state in FINISHED_STATES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self.store is not None:
+            self.store.prune(cutoff)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._stopped.set()
@@ -0,0 +1,149 @@
+"""
+ffprobe/ffmpeg helpers
+"""
+
+import json
+import subprocess
+
+from . import metrics, progress
+from .errors import ExtractionError
+
+FFMPEG_TIMEOUT = 300
+
+STREAM_ENTRIES = (
+    "format=duration,size,bit_rate:"
+    "stream=index,codec_type,codec_name,profile,pix_fmt,width,height,"
+    "r_frame_rate,time_base,sample_rate,channels"
+)
+
+
+def probe(path):
+    """Return ffprobe format/stream info for a media file
+
+    The result is ffprobe's JSON with a convenience 'duration' key (float
+    seconds, 0.0 if unknown).
+    """
+    try:
+        with metrics.timed('probe'):
+            result = subprocess.run(
+                [
+                    "ffprobe", "-v", "error",
+                    "-show_entries", STREAM_ENTRIES,
+                    "-of", "json",
+                    str(path)
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=60
+            )
+    except FileNotFoundError:
+        raise ExtractionError("ffprobe not found")
+    except subprocess.CalledProcessError as e:
+        raise ExtractionError(f"ffprobe failed: {e.stderr.strip()}")
+    except subprocess.TimeoutExpired:
+        raise ExtractionError("ffprobe timed out")
+
+    info = json.loads(result.stdout or '{}')
+    info.setdefault('streams', [])
+    try:
+        info['duration'] = float(info.get('format', {}).get('duration', 0))
+    except ValueError:
+        info['duration'] = 0.0
+    return info
+
+
+def video_stream(info):
+    """First video stream of a probe() result, or None"""
+    for stream in info['streams']:
+        if stream.get('codec_type') == 'video':
+            return stream
+    return None
+
+
+def audio_stream(info):
+    """First audio stream of a probe() result, or None"""
+    for stream in info['streams']:
+        if stream.get('codec_type') == 'audio':
+            return stream
+    return None
+
+
+def run_ffmpeg(args, timeout=FFMPEG_TIMEOUT):
+    """Run ffmpeg with the given arguments, raising ExtractionError on failure
+
+    With a progress reporter installed, ffmpeg's -progress stream is parsed
+    and reported while it runs.
+    """
+    with metrics.timed('encode'):
+        _run_ffmpeg(args, timeout)
+
+
+def _run_ffmpeg(args, timeout):
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    report = progress.current()
+    try:
+        if report is None:
+            subprocess.run(
+                cmd + [str(a) for a in args],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=timeout
+            )
+            return
+
+        parser = progress.FfmpegProgressParser()
+
+        def on_line(line):
+            event = parser.feed(line)
+            if event is not None:
+                report(event)
+
+        returncode, stderr = progress.run_streaming(
+            cmd + progress.FFMPEG_ARGS + [str(a) for a in args], on_line, timeout
+        )
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+    except FileNotFoundError:
+        raise ExtractionError("ffmpeg not found")
+    except subprocess.CalledProcessError as e:
+        raise ExtractionError(f"ffmpeg failed: {e.stderr.strip()}")
+    except subprocess.TimeoutExpired:
+        raise ExtractionError("ffmpeg timed out")
+
+
+def keyframes(path, start=None, end=None):
+    """Return sorted keyframe timestamps (seconds) of the first video stream
+
+    Reads packet flags only (no decoding). start/end restrict the scan to
+    an interval of the file.
+    """
+    args = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0"]
+    if start is not None or end is not None:
+        interval = f"{start or 0}%{end}" if end is not None else f"{start}"
+        args += ["-read_intervals", interval]
+
+    try:
+        with metrics.timed('probe'):
+            result = subprocess.run(
+                args + [str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=60
+            )
+    except FileNotFoundError:
+        raise ExtractionError("ffprobe not found")
+    except subprocess.CalledProcessError as e:
+        raise ExtractionError(f"ffprobe failed: {e.stderr.strip()}")
+    except subprocess.TimeoutExpired:
+        raise ExtractionError("ffprobe timed out")
+
+    times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            times.append(float(pts_time))
+    return sorted(times)
@@ -0,0 +1,138 @@
+"""
+yt-dlp --dump-json metadata with a persistent cache
+
+Entries are stored as one JSON file per video ID. Reads refresh the file's
+mtime so eviction (oldest mtime first, once the directory exceeds its byte
+budget) is LRU. Concurrent lookups of the same video share one yt-dlp run,
+across processes too when state is shared (see clip_extractor.shared_state).
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from . import config, metrics
+from .diskutil import evict_lru, touch
+from .errors import DownloadError
+from .shared_state import shared_lock
+from .singleflight import SingleFlight
+from .video_id import watch_url
+
+DUMP_JSON_TIMEOUT = 30
+
+
+def fetch_metadata(video_id):
+    """Run yt-dlp --dump-json for a video (uncached)"""
+    try:
+        result = subprocess.run(
+            ["yt-dlp", "--dump-json", "--no-warnings", watch_url(video_id)],
+            capture_output=True,
+            text=True,
+            timeout=DUMP_JSON_TIMEOUT
+        )
+    except FileNotFoundError:
+        raise DownloadError("yt-dlp not found")
+    except subprocess.TimeoutExpired:
+        raise DownloadError("Request timed out fetching video information")
+
+    if result.returncode != 0:
+        error = result.stderr.strip() or "Video unavailable"
+        raise DownloadError(f"Failed to fetch video information: {error}")
+    return json.loads(result.stdout)
+
+
+class MetadataCache:
+    """Disk-backed TTL + LRU cache in front of fetch_metadata"""
+
+    def __init__(self, directory=None, ttl=None, max_bytes=None, fetch=fetch_metadata):
+        self.directory = directory or config.CACHE_DIR / "metadata"
+        self.ttl = config.METADATA_TTL if ttl is None else ttl
+        self.max_bytes = config.METADATA_MAX_BYTES if max_bytes is None else max_bytes
+        self.fetch = fetch
+        self._flight = SingleFlight()
+        self._evict_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, video_id):
+        return self.directory / f"{video_id}.json"
+
+    def get(self, video_id):
+        """Return metadata for video_id, fetching it at most once concurrently"""
+        info = self.lookup(video_id)
+        metrics.cache_result('metadata', info is not None)
+        if info is not None:
+            return info
+        return self._flight.do(video_id, self._fill, video_id)
+
+    def lookup(self, video_id):
+        """Return cached metadata or None if missing/expired"""
+        path = self._path(video_id)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if time.time() - entry.get('fetched_at', 0) > self.ttl:
+            return None
+
+        touch(path)
+        return entry['info']
+
+    def _fill(self, video_id):
+        with shared_lock(f"metadata:{video_id}", DUMP_JSON_TIMEOUT * 2):
+            # Another leader (here or in another process) may have filled it
+            # between our lookup and the flight
+            info = self.lookup(video_id)
+            if info is not None:
+                return info
+
+            with metrics.timed('metadata'):
+                info = self.fetch(video_id)
+            self.put(video_id, info)
+            return info
+
+    def put(self, video_id, info):
+        """Atomically write an entry and enforce the byte budget"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time(), 'info': info}, f)
+            os.replace(tmp, self._path(video_id))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def invalidate(self, video_id):
+        try:
+            self._path(video_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes"""
+        with self._evict_lock:
+            evict_lru(self.directory, "*.json", self.max_bytes)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide default MetadataCache"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache()
+        return _default_cache
+
+
+def get_metadata(video_id):
+    """Cached yt-dlp --dump-json for a video"""
+    return get_cache().get(video_id)
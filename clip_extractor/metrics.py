@@ -0,0 +1,152 @@
+"""
+Per-stage timing histograms and counters
+
+Stages (parse, metadata, download, probe, encode, stream, transcript) are
+timed with timed(stage) and land in process-wide histograms rendered in the
+Prometheus text exposition format by render(). Code running inside
+collecting() also gets its own per-stage totals, which the job queue logs as
+one JSON line per job.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; spans cache hits (ms) to long downloads/encodes (minutes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = 'clip_extractor_stage_seconds'
+JOB_SECONDS = 'clip_extractor_job_seconds'
+CACHE_REQUESTS = 'clip_extractor_cache_requests_total'
+
+HELP = {
+    STAGE_SECONDS: "Time spent per pipeline stage",
+    JOB_SECONDS: "End-to-end job run time",
+    CACHE_REQUESTS: "Cache lookups by cache and result (hit/miss)",
+}
+
+_collector = ContextVar('clip_extractor_metrics', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """(le, cumulative count) pairs including +Inf"""
+        total = 0
+        for le, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield le, total
+
+
+class Registry:
+    """Labelled histograms and counters, safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind, series in (('histogram', self._histograms), ('counter', self._counters)):
+                seen = set()
+                for name, labels in sorted(series):
+                    if name not in seen:
+                        seen.add(name)
+                        if name in HELP:
+                            lines.append(f"# HELP {name} {HELP[name]}")
+                        lines.append(f"# TYPE {name} {kind}")
+                    value = series[(name, labels)]
+                    if kind == 'counter':
+                        lines.append(f"{name}{_labels(labels)} {value}")
+                        continue
+                    for le, count in value.samples():
+                        bound = '+Inf' if le == float('inf') else repr(float(le))
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {value.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+registry = Registry()
+
+
+@contextmanager
+def timed(stage):
+    """Record the block's wall time under clip_extractor_stage_seconds{stage}"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.observe(STAGE_SECONDS, elapsed, stage=stage)
+        collected = _collector.get()
+        if collected is not None:
+            stages = collected['stages']
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+
+def cache_result(cache, hit):
+    """Count a cache lookup as a hit or miss"""
+    registry.inc(CACHE_REQUESTS, cache=cache, result='hit' if hit else 'miss')
+    collected = _collector.get()
+    if collected is not None:
+        counts = collected['cache'].setdefault(cache, {'hit': 0, 'miss': 0})
+        counts['hit' if hit else 'miss'] += 1
+
+
+@contextmanager
+def collecting():
+    """Collect this thread's per-stage seconds and cache hit/miss counts
+
+    Yields {'stages': {stage: seconds}, 'cache': {cache: {'hit': n, 'miss': n}}}
+    """
+    collected = {'stages': {}, 'cache': {}}
+    token = _collector.set(collected)
+    try:
+        yield collected
+    finally:
+        _collector.reset(token)
+
+
+def render():
+    return registry.render()
@@ -0,0 +1,165 @@
+"""
+Live progress from yt-dlp and ffmpeg
+
+While a reporter is installed (see reporting()), downloads run yt-dlp with a
+machine readable --progress-template and ffmpeg runs with -progress pipe:1;
+their output is parsed into event dicts and passed to the reporter as it
+arrives:
+
+    {'source': 'download', 'bytes': ..., 'total': ..., 'speed': ..., 'eta': ...}
+    {'source': 'encode', 'out_time': ..., 'fps': ..., 'speed': ..., 'bytes': ...}
+
+Values that the tool doesn't know yet are None. Without a reporter both
+tools run quietly as before.
+"""
+
+import subprocess
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_reporter = ContextVar('clip_extractor_progress', default=None)
+
+YT_DLP_PREFIX = "[progress]"
+YT_DLP_TEMPLATE = (
+    "download:" + YT_DLP_PREFIX + " %(progress.downloaded_bytes)s %(progress.total_bytes)s "
+    "%(progress.total_bytes_estimate)s %(progress.speed)s %(progress.eta)s"
+)
+YT_DLP_ARGS = ["--newline", "--progress", "--progress-template", YT_DLP_TEMPLATE]
+FFMPEG_ARGS = ["-progress", "pipe:1", "-nostats"]
+
+
+@contextmanager
+def reporting(callback):
+    """Send progress events from this thread's tool runs to callback"""
+    token = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+def with_fraction(callback, duration):
+    """Wrap callback so events carry 'fraction' (0.0-1.0, or None) of the
+    running step: bytes/total for downloads, out_time/duration for ffmpeg"""
+    def report(event):
+        fraction = None
+        if event['source'] == 'download' and event['bytes'] is not None and event['total']:
+            fraction = event['bytes'] / event['total']
+        elif event['source'] == 'encode' and event['out_time'] is not None and duration:
+            fraction = event['out_time'] / duration
+        callback(dict(event, fraction=None if fraction is None else min(1.0, fraction)))
+    return report
+
+
+def current():
+    """The installed reporter, or None"""
+    return _reporter.get()
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_yt_dlp_line(line):
+    """Event for one line of YT_DLP_TEMPLATE output, None for other lines"""
+    if not line.startswith(YT_DLP_PREFIX):
+        return None
+    fields = line[len(YT_DLP_PREFIX):].split()
+    if len(fields) != 5:
+        return None
+    downloaded, total, estimate, speed, eta = (_number(f) for f in fields)
+    return {
+        'source': 'download',
+        'bytes': int(downloaded) if downloaded is not None else None,
+        'total': int(total or estimate) if (total or estimate) else None,
+        'speed': speed,
+        'eta': eta,
+    }
+
+
+def _clock(value):
+    """'00:01:02.500000' -> 62.5"""
+    try:
+        hours, minutes, seconds = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+class FfmpegProgressParser:
+    """Accumulates ffmpeg's -progress key=value lines into events
+
+    ffmpeg writes one block per update, terminated by progress=continue
+    (or progress=end for the last one).
+    """
+
+    def __init__(self):
+        self._block = {}
+
+    def feed(self, line):
+        """Returns an event when line completes a block, else None"""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        if key != 'progress':
+            self._block[key] = value
+            return None
+
+        block, self._block = self._block, {}
+        out_time = _clock(block.get('out_time', ''))
+        if out_time is None and _number(block.get('out_time_us')) is not None:
+            out_time = _number(block['out_time_us']) / 1e6
+        speed = block.get('speed', '').rstrip('x')
+        total_size = _number(block.get('total_size'))
+        return {
+            'source': 'encode',
+            'out_time': max(out_time, 0.0) if out_time is not None else None,
+            'fps': _number(block.get('fps')),
+            'speed': _number(speed),
+            'bytes': int(total_size) if total_size is not None else None,
+            'done': value == 'end',
+        }
+
+
+def run_streaming(cmd, on_line, timeout):
+    """Run cmd, calling on_line for each stdout line as it is written
+
+    stderr is collected in the background so a chatty tool can't block on a
+    full pipe. Returns (returncode, stderr); raises subprocess.TimeoutExpired
+    after killing the process if it runs past timeout.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1
+    )
+    stderr = []
+    drain = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            on_line(line)
+        proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        drain.join()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return proc.returncode, ''.join(stderr)
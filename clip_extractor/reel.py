@@ -0,0 +1,203 @@
+"""
+Highlight reels: several (video, timeframe) clips joined into one file
+
+Each clip is cut like a single extraction (the sections of one video are
+fetched together), then every piece is probed. Pieces whose video and audio
+parameters match the reel's common format (the one covering the most
+playing time) are joined as they are with the concat demuxer; only the
+streams of the other pieces that differ are re-encoded to it, so a reel of
+clips from compatible sources costs no second encode pass at all.
+"""
+
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+
+from . import config, metrics, progress
+from .cutting import X264_PROFILES, check_mode, cut
+from .diskutil import scratch_dir
+from .errors import ExtractionError, InvalidTimeframeError
+from .formats import check_quality, resolve_format
+from .media import audio_stream, probe, run_ffmpeg, video_stream
+from .sources import fetch_sources
+from .timeframe import parse_timeframe
+from .video_id import parse_video_id
+
+TOTAL_STAGES = 5
+
+# Stream parameters that must agree for a stream copy concat to play back
+VIDEO_KEYS = ('codec_name', 'profile', 'pix_fmt', 'width', 'height', 'r_frame_rate')
+AUDIO_KEYS = ('codec_name', 'sample_rate', 'channels')
+
+# ffmpeg encoders for re-encoding pieces to the reel's codecs
+VIDEO_ENCODERS = {'h264': 'libx264', 'hevc': 'libx265', 'vp9': 'libvpx-vp9', 'av1': 'libaom-av1'}
+AUDIO_ENCODERS = {'aac': 'aac', 'opus': 'libopus', 'mp3': 'libmp3lame'}
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+def signature(info):
+    """(video params, audio params) of a probe() result; None for a missing stream"""
+    video, audio = video_stream(info), audio_stream(info)
+    return (
+        None if video is None else tuple(video.get(k) for k in VIDEO_KEYS),
+        None if audio is None else tuple(audio.get(k) for k in AUDIO_KEYS),
+    )
+
+
+def common_signature(pieces):
+    """The signature covering the most playing time among probe() results"""
+    weights = Counter()
+    for info in pieces:
+        weights[signature(info)] += info['duration']
+    return weights.most_common(1)[0][0]
+
+
+def normalize_args(piece, info, target):
+    """ffmpeg arguments rewriting piece to the target signature, or None if it
+    already matches
+
+    Only the streams that differ are re-encoded; a matching video stream is
+    copied even when the audio has to change, and vice versa.
+    """
+    video_sig, audio_sig = signature(info)
+    target_video, target_audio = target
+    if (video_sig, audio_sig) == target:
+        return None
+
+    if target_video is not None and video_sig is None:
+        raise ExtractionError(f"{piece} has no video stream to join into the reel")
+
+    args = ["-i", piece]
+    if target_audio is not None and audio_sig is None:
+        # Concat needs the same streams in every piece: pad with silence
+        _, rate, channels = target_audio
+        args += ["-f", "lavfi", "-i", f"anullsrc=r={rate}:cl={'mono' if channels == 1 else 'stereo'}"]
+    if target_video is not None:
+        args += ["-map", "0:v:0"]
+    if target_audio is not None:
+        args += ["-map", "1:a:0", "-shortest"] if audio_sig is None else ["-map", "0:a:0"]
+
+    if target_video is None:
+        args += ["-vn"]
+    elif video_sig == target_video:
+        args += ["-c:v", "copy"]
+    else:
+        codec, profile, pix_fmt, width, height, rate = target_video
+        args += ["-c:v", VIDEO_ENCODERS.get(codec, 'libx264')]
+        args += ["-vf", (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                         f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")]
+        args += ["-r", rate, "-pix_fmt", pix_fmt]
+        if codec == 'h264' and X264_PROFILES.get(profile):
+            args += ["-profile:v", X264_PROFILES[profile]]
+
+    if target_audio is None:
+        args += ["-an"]
+    elif audio_sig == target_audio:
+        args += ["-c:a", "copy"]
+    else:
+        codec, rate, channels = target_audio
+        args += ["-c:a", AUDIO_ENCODERS.get(codec, 'aac'), "-ar", rate, "-ac", channels]
+    return args
+
+
+def extract_reel(clips, opts=None):
+    """Cut (url, timeframe) clips and join them, in order, into one file
+
+    clips is a list of (url, 'START-END') pairs.
+
+    opts (all optional):
+        output     -- reel file path (default 'reel.mp4')
+        mode       -- cut mode for the pieces (default from CLIP_EXTRACTOR_CUT_MODE)
+        quality    -- quality policy spec (default from CLIP_EXTRACTOR_QUALITY)
+        cache      -- consult/populate the local source cache (default True)
+        on_stage   -- callable(step, total, message)
+        on_progress -- callable(event) for live yt-dlp/ffmpeg progress
+        log        -- callable(message)
+
+    Returns a dict with output_path, size, duration and a 'clips' list
+    (video_id, timeframe, duration, reencoded) in reel order; reencoded is
+    True for the pieces that had to be converted to the common format.
+    """
+    opts = opts or {}
+    output_path = Path(opts.get('output') or 'reel.mp4')
+    mode = check_mode(opts.get('mode') or config.CUT_MODE)
+    quality = check_quality(opts.get('quality'))
+    on_stage = opts.get('on_stage') or _noop
+    log = opts.get('log') or _noop
+
+    if not clips:
+        raise InvalidTimeframeError("No clips given")
+
+    on_stage(1, TOTAL_STAGES, "Parsing video URLs and timeframes...")
+    with metrics.timed('parse'):
+        pieces = []
+        for url, timeframe in clips:
+            start_sec, end_sec = parse_timeframe(timeframe)
+            pieces.append({
+                'video_id': parse_video_id(url),
+                'timeframe': timeframe,
+                'start': start_sec,
+                'end': end_sec,
+                'duration': end_sec - start_sec,
+            })
+    videos = list(dict.fromkeys(p['video_id'] for p in pieces))
+    log(f"{len(pieces)} clips from {len(videos)} video(s)")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = opts.get('on_progress')
+    if report is not None:
+        report = progress.with_fraction(report, max(p['duration'] for p in pieces))
+    with progress.reporting(report), scratch_dir("reel_", config.SCRATCH_DIR) as scratch:
+        on_stage(2, TOTAL_STAGES, "Downloading video sections...")
+        for video_id in videos:
+            mine = [p for p in pieces if p['video_id'] == video_id]
+            fmt = resolve_format(video_id, quality)
+            sources = fetch_sources(video_id, [(p['start'], p['end']) for p in mine],
+                                    scratch, opts.get('cache', True), log, fmt)
+            for piece, (section_start, _, path) in zip(mine, sources):
+                piece['source'], piece['offset'] = path, piece['start'] - section_start
+
+        on_stage(3, TOTAL_STAGES, "Cutting clips...")
+        for index, piece in enumerate(pieces):
+            piece['path'] = scratch / f"piece_{index:03d}.mp4"
+            cut(piece['source'], piece['path'], piece['offset'], piece['duration'], mode, log)
+            piece['info'] = probe(piece['path'])
+
+        on_stage(4, TOTAL_STAGES, "Matching clip formats...")
+        target = common_signature([p['info'] for p in pieces])
+        for index, piece in enumerate(pieces):
+            args = normalize_args(piece['path'], piece['info'], target)
+            piece['reencoded'] = args is not None
+            if args is not None:
+                normalized = scratch / f"normalized_{index:03d}.mp4"
+                run_ffmpeg(args + [normalized])
+                piece['path'] = normalized
+        reencoded = sum(p['reencoded'] for p in pieces)
+        log(f"{len(pieces) - reencoded} clip(s) joined as is, {reencoded} re-encoded")
+
+        on_stage(5, TOTAL_STAGES, "Joining clips...")
+        if len(pieces) == 1:
+            shutil.move(str(pieces[0]['path']), str(output_path))
+        else:
+            concat_list = scratch / "reel.txt"
+            concat_list.write_text("".join(f"file '{p['path']}'\n" for p in pieces))
+            run_ffmpeg(["-f", "concat", "-safe", "0", "-i", concat_list,
+                        "-c", "copy", "-movflags", "+faststart", output_path])
+
+    if not output_path.exists():
+        raise ExtractionError("Failed to create reel")
+
+    return {
+        'output_path': str(output_path),
+        'size': os.path.getsize(output_path),
+        'duration': sum(p['duration'] for p in pieces),
+        'mode': mode,
+        'clips': [
+            {k: p[k] for k in ('video_id', 'timeframe', 'duration', 'reencoded')}
+            for p in pieces
+        ],
+    }
@@ -0,0 +1,107 @@
+"""
+Several renditions of one clip from a single decode
+
+Instead of one extraction per output size, the source range is decoded once
+and fanned out with split/scale in one ffmpeg filter graph, each branch
+feeding its own output. Renditions are given as spec strings:
+
+    1080p, 720p, 480p, ...   H.264 MP4 scaled to that height (never upscaled)
+    gif, gif:320             animated GIF, palette optimized (width, default 480)
+    webp, webp:640           animated WebP (width, default 480)
+
+GIF palettes are generated from the whole clip (palettegen), so the GIF
+branch holds its scaled frames in memory until the clip has been read.
+"""
+
+import re
+from pathlib import Path
+
+from .errors import InvalidRenditionError
+from .media import FFMPEG_TIMEOUT, run_ffmpeg
+
+VIDEO_RE = re.compile(r'^(\d+)p$')
+ANIMATION_RE = re.compile(r'^(gif|webp)(?::(\d+))?$')
+
+ANIMATION_WIDTH = 480
+ANIMATION_FPS = {'gif': 12, 'webp': 15}
+
+
+def parse_rendition(spec):
+    """Parse a rendition spec into {'name', 'kind', 'size', 'ext'}
+
+    kind is 'video' (size is the height), 'gif' or 'webp' (size is the
+    width). Raises InvalidRenditionError for anything else.
+    """
+    spec = spec.strip().lower()
+    match = VIDEO_RE.match(spec)
+    if match and int(match.group(1)) > 0:
+        return {'name': spec, 'kind': 'video', 'size': int(match.group(1)), 'ext': 'mp4'}
+    match = ANIMATION_RE.match(spec)
+    if match and match.group(2) != '0':
+        kind = match.group(1)
+        width = int(match.group(2) or ANIMATION_WIDTH)
+        return {'name': spec.replace(':', ''), 'kind': kind, 'size': width, 'ext': kind}
+    raise InvalidRenditionError(f"Invalid rendition: {spec!r} (use e.g. 720p, gif or webp:320)")
+
+
+def parse_renditions(specs):
+    """Parse a list (or comma separated string) of rendition specs"""
+    if isinstance(specs, str):
+        specs = specs.split(',')
+    renditions = [parse_rendition(spec) for spec in specs if spec.strip()]
+    names = [r['name'] for r in renditions]
+    if len(set(names)) != len(names):
+        raise InvalidRenditionError("Duplicate renditions requested")
+    return renditions
+
+
+def rendition_path(output_path, rendition):
+    """clip.mp4 + 720p -> clip_720p.mp4 (in the same directory)"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}_{rendition['name']}.{rendition['ext']}")
+
+
+def filter_graph(renditions):
+    """-filter_complex graph: one split of [0:v], one [vN] output per rendition"""
+    count = len(renditions)
+    graph = ["[0:v]split=" + str(count) + "".join(f"[s{i}]" for i in range(count))]
+    for i, rendition in enumerate(renditions):
+        size = rendition['size']
+        if rendition['kind'] == 'video':
+            graph.append(f"[s{i}]scale=-2:'min({size},ih)'[v{i}]")
+            continue
+        scaled = f"fps={ANIMATION_FPS[rendition['kind']]},scale={size}:-1:flags=lanczos"
+        if rendition['kind'] == 'webp':
+            graph.append(f"[s{i}]{scaled}[v{i}]")
+        else:
+            graph.append(f"[s{i}]{scaled},split[g{i}][h{i}]")
+            graph.append(f"[g{i}]palettegen=stats_mode=diff[p{i}]")
+            graph.append(f"[h{i}][p{i}]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle[v{i}]")
+    return ";".join(graph)
+
+
+def _output_args(index, rendition):
+    args = ["-map", f"[v{index}]"]
+    if rendition['kind'] == 'video':
+        return args + ["-map", "0:a:0?", "-c:v", "libx264", "-c:a", "copy"]
+    if rendition['kind'] == 'webp':
+        return args + ["-c:v", "libwebp", "-quality", "75", "-loop", "0"]
+    return args + ["-loop", "0"]
+
+
+def render(source, outputs, start_sec, duration):
+    """Cut [start_sec, start_sec + duration] of source into every rendition
+
+    outputs is a list of (rendition, path) pairs; all of them come out of
+    a single ffmpeg run that decodes the range once.
+    """
+    renditions = [rendition for rendition, _ in outputs]
+    args = [
+        "-ss", start_sec,
+        "-t", duration,
+        "-i", source,
+        "-filter_complex", filter_graph(renditions),
+    ]
+    for i, (rendition, path) in enumerate(outputs):
+        args += _output_args(i, rendition) + [path]
+    run_ffmpeg(args, timeout=FFMPEG_TIMEOUT * len(outputs))
@@ -0,0 +1,282 @@
+"""
+Inverted index over cached transcripts for phrase search
+
+Postings (token -> transcript, cue number) live in a local SQLite database
+so queries stay in the millisecond range across thousands of videos and
+transcripts can be added incrementally as they are cached. A phrase
+matches where every query token occurs in a cue or the cue after it (so
+phrases may straddle a cue boundary); candidates are then confirmed
+against the cached transcript text.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from . import config
+from .timeframe import seconds_to_time
+from .transcript import Transcript
+
+WORD_RE = re.compile(r'\w+')
+# Scripts written without spaces are indexed as character bigrams
+CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿豈-﫿]')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    language TEXT,
+    fetched_at REAL,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    cue INTEGER NOT NULL,
+    PRIMARY KEY (token, doc, cue)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc);
+"""
+
+# Largest doc list pushed into a query as bound parameters
+MAX_DOC_FILTER = 500
+
+# Loaded transcripts kept for confirming matches
+MEMORY_ENTRIES = 64
+
+
+def tokenize(text):
+    """Lowercased word tokens; CJK runs become overlapping bigrams"""
+    tokens = []
+    for word in WORD_RE.findall(text.lower()):
+        if CJK_RE.search(word) and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+class SearchIndex:
+    """SQLite-backed inverted index of transcript cues"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or config.SEARCH_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._transcripts = OrderedDict()
+        self._transcripts_lock = threading.Lock()
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(str(self.path), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def add_transcript(self, video_id, path, transcript):
+        """Index (or re-index) one cached transcript file
+
+        Skips the work if this exact fetch is already indexed.
+        """
+        path = str(path)
+        fetched_at = transcript.meta.get('fetched_at')
+        db = self._db()
+        row = db.execute("SELECT id, fetched_at FROM docs WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[1] == fetched_at:
+            return False
+
+        postings = set()
+        for cue in range(len(transcript)):
+            for token in tokenize(transcript.cue_text(cue)):
+                postings.add((token, cue))
+
+        with self._write_lock, db:
+            if row is not None:
+                db.execute("DELETE FROM postings WHERE doc = ?", (row[0],))
+                db.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+            doc = db.execute(
+                "INSERT INTO docs (video_id, path, language, fetched_at, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, path, transcript.meta.get('language_code'), fetched_at, time.time())
+            ).lastrowid
+            db.executemany(
+                "INSERT INTO postings (token, doc, cue) VALUES (?, ?, ?)",
+                ((token, doc, cue) for token, cue in postings)
+            )
+        with self._transcripts_lock:
+            self._transcripts.pop(path, None)
+        return True
+
+    def index_directory(self, directory=None):
+        """Index every cached transcript file not yet indexed
+
+        Returns the number of files (re)indexed.
+        """
+        directory = Path(directory or config.CACHE_DIR / "transcripts")
+        count = 0
+        for path in sorted(directory.glob("*.yct")):
+            try:
+                transcript = Transcript.from_bytes(path.read_bytes())
+            except (ValueError, KeyError):
+                continue
+            video_id = transcript.meta.get('video_id') or path.name.split('.')[0]
+            if self.add_transcript(video_id, path, transcript):
+                count += 1
+        return count
+
+    def _transcript(self, path):
+        with self._transcripts_lock:
+            transcript = self._transcripts.get(path)
+            if transcript is not None:
+                self._transcripts.move_to_end(path)
+                return transcript
+        try:
+            transcript = Transcript.from_bytes(Path(path).read_bytes())
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        with self._transcripts_lock:
+            self._transcripts[path] = transcript
+            while len(self._transcripts) > MEMORY_ENTRIES:
+                self._transcripts.popitem(last=False)
+        return transcript
+
+    def _postings(self, token, docs=None):
+        query = "SELECT doc, cue FROM postings WHERE token = ?"
+        params = [token]
+        if docs is not None and len(docs) <= MAX_DOC_FILTER:
+            query += f" AND doc IN ({','.join('?' * len(docs))})"
+            params.extend(docs)
+        return set(self._db().execute(query, params))
+
+    def _count(self, token):
+        return self._db().execute(
+            "SELECT COUNT(*) FROM postings WHERE token = ?", (token,)
+        ).fetchone()[0]
+
+    def search(self, phrase, limit=20, padding=None):
+        """Candidate timeframes where phrase is spoken, across all videos
+
+        Returns a list of dicts: video_id, language, start, end, timeframe
+        (HH:MM:SS-HH:MM:SS, padded) and the matching text.
+        """
+        padding = config.SEARCH_PADDING if padding is None else padding
+        tokens = list(dict.fromkeys(tokenize(phrase)))
+        if not tokens:
+            return []
+
+        # Intersect starting from the rarest token; common tokens are only
+        # read for the transcripts the rarer ones already narrowed down to
+        tokens.sort(key=self._count)
+        sets = [self._postings(tokens[0])]
+        for token in tokens[1:]:
+            docs = sorted({doc for doc, _ in sets[-1]})
+            if not docs:
+                return []
+            sets.append(self._postings(token, docs))
+        candidates = sorted(
+            (doc, cue) for doc, cue in sets[0]
+            for start_cue in (cue - 1, cue)
+            if all((doc, start_cue) in s or (doc, start_cue + 1) in s for s in sets)
+        )
+
+        docs = {}
+        target = normalize(phrase)
+        results = []
+        seen = set()
+        for doc, cue in candidates:
+            for first in (cue - 1, cue):
+                if (doc, first) in seen or first < 0:
+                    continue
+                hit = self._confirm(doc, first, target, docs)
+                if hit is None:
+                    continue
+                seen.add((doc, first))
+                seen.add((doc, first + 1))
+                results.append(hit)
+                break
+            if len(results) >= limit:
+                break
+
+        for hit in results:
+            start = max(0, int(hit['start']) - padding)
+            end = int(hit['end'] + 0.999) + padding
+            hit['timeframe'] = f"{seconds_to_time(start)}-{seconds_to_time(end)}"
+        return results
+
+    def _confirm(self, doc, first, target, docs):
+        """Check the phrase really occurs in cue `first` (or it + next)"""
+        if doc not in docs:
+            docs[doc] = self._db().execute(
+                "SELECT video_id, path, language FROM docs WHERE id = ?", (doc,)
+            ).fetchone()
+        if docs[doc] is None:
+            return None
+        video_id, path, language = docs[doc]
+        transcript = self._transcript(path)
+        if transcript is None or first >= len(transcript):
+            return None
+
+        for last in (first, first + 1):
+            if last >= len(transcript):
+                break
+            text = ' '.join(transcript.cue_text(i) for i in range(first, last + 1))
+            if target in normalize(text) or (CJK_RE.search(target) and
+                                             target.replace(' ', '') in normalize(text).replace(' ', '')):
+                return {
+                    'video_id': video_id,
+                    'language': language,
+                    'start': transcript.starts[first],
+                    'end': transcript.starts[last] + transcript.durations[last],
+                    'text': text,
+                }
+        return None
+
+    def stats(self):
+        db = self._db()
+        return {
+            'transcripts': db.execute("SELECT COUNT(*) FROM docs").fetchone()[0],
+            'videos': db.execute("SELECT COUNT(DISTINCT video_id) FROM docs").fetchone()[0],
+        }
+
+
+_default_index = None
+_default_lock = threading.Lock()
+_caught_up = False
+
+
+def get_search_index():
+    """Process-wide default SearchIndex"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SearchIndex()
+        return _default_index
+
+
+def search_transcripts(phrase, limit=20):
+    """Search every cached transcript for a phrase
+
+    The first search in a process indexes whatever the transcript cache
+    holds that the index doesn't (e.g. transcripts cached before the index
+    existed); later ones are indexed as they are cached.
+    """
+    global _caught_up
+    index = get_search_index()
+    with _default_lock:
+        if not _caught_up:
+            index.index_directory()
+            _caught_up = True
+    return index.search(phrase, limit)
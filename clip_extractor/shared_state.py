@@ -0,0 +1,234 @@
+"""
+State shared between server worker processes, in one SQLite database
+
+When the web GUI runs as several processes (serve.py), each one has its own
+job queue, so a status request can land on a worker that never saw the job.
+Workers therefore write their jobs' status here, where any of them can read
+it. The database also holds small shared values (e.g. the thumbnail URL
+/api/load_video found for a video) and named leases that stop two processes
+from filling the same cache entry at once; the caches themselves are already
+shared files under CACHE_DIR.
+
+Enabled with CLIP_EXTRACTOR_SHARED_STATE=1 (serve.py sets it). Otherwise
+get_shared_state() returns None and everything stays in-process.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from . import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+CREATE TABLE IF NOT EXISTS locks (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+UNFINISHED = ('queued', 'running')
+
+# Seconds between attempts to take a lease someone else holds
+LOCK_POLL = 0.1
+
+# Shared values not written for this long are dropped by prune()
+VALUE_TTL = config.METADATA_TTL
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedState:
+    """SQLite (WAL) store for job status, shared values and leases"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or config.STATE_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    def _db(self):
+        # Connections must not cross a fork: reopen in each worker process
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(str(self.path), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def add_job(self, status, max_pending):
+        """Record a new job unless max_pending jobs are already unfinished
+        across all processes; returns False when the queue is full"""
+        db = self._db()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            pending = db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", UNFINISHED
+            ).fetchone()[0]
+            if pending >= max_pending:
+                return False
+            self._write_job(db, status)
+        return True
+
+    def save_job(self, status):
+        """Write a job's latest Job.to_dict()"""
+        db = self._db()
+        with db:
+            self._write_job(db, status)
+
+    def _write_job(self, db, status):
+        # Never let a slower writer replace a newer status with an older one
+        db.execute(
+            "INSERT INTO jobs (id, owner, state, version, finished_at, status) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET owner = excluded.owner, state = excluded.state, "
+            "version = excluded.version, finished_at = excluded.finished_at, "
+            "status = excluded.status WHERE excluded.version > jobs.version",
+            (status['id'], os.getpid(), status['state'], status['version'],
+             status['finished_at'], json.dumps(status))
+        )
+
+    def get_job(self, job_id):
+        """Last saved status of a job, or None
+
+        An unfinished job whose worker process has gone away is marked
+        failed, so pollers don't wait on it forever.
+        """
+        row = self._db().execute(
+            "SELECT owner, state, status FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        owner, state, status = row
+        status = json.loads(status)
+        if state in UNFINISHED and owner != os.getpid() and not pid_alive(owner):
+            status.update(state='failed', error="Worker process exited before the job finished",
+                          finished_at=time.time(), version=status['version'] + 1)
+            self.save_job(status)
+        return status
+
+    def fail_unfinished(self, error):
+        """Mark every queued or running job failed (e.g. at server start,
+        when no worker can still be running them); returns how many"""
+        db = self._db()
+        rows = db.execute(
+            "SELECT status FROM jobs WHERE state IN (?, ?)", UNFINISHED
+        ).fetchall()
+        now = time.time()
+        with db:
+            for (status,) in rows:
+                status = json.loads(status)
+                status.update(state='failed', error=error, finished_at=now,
+                              version=status['version'] + 1)
+                self._write_job(db, status)
+        return len(rows)
+
+    def put(self, namespace, key, value):
+        """Store a JSON-serializable value"""
+        db = self._db()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time())
+            )
+
+    def get(self, namespace, key, default=None):
+        row = self._db().execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    @contextmanager
+    def lock(self, name, ttl):
+        """Hold the named lease for the with block, waiting while another
+        holder has it
+
+        The lease lapses after ttl seconds, so a holder that crashed can't
+        block the name for longer than that; pick a ttl above the longest
+        time the block can take.
+        """
+        owner = uuid.uuid4().hex
+        db = self._db()
+        while True:
+            now = time.time()
+            with db:
+                db.execute("DELETE FROM locks WHERE name = ? AND expires_at < ?", (name, now))
+                taken = db.execute(
+                    "INSERT OR IGNORE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)",
+                    (name, owner, now + ttl)
+                ).rowcount
+            if taken:
+                break
+            time.sleep(LOCK_POLL)
+        try:
+            yield
+        finally:
+            with db:
+                db.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def prune(self, finished_before):
+        """Drop jobs finished before the cutoff, lapsed leases and stale values"""
+        now = time.time()
+        db = self._db()
+        with db:
+            db.execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,))
+            db.execute("DELETE FROM locks WHERE expires_at < ?", (now,))
+            db.execute("DELETE FROM kv WHERE updated_at < ?", (now - VALUE_TTL,))
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None and self._local.pid == os.getpid():
+            db.close()
+        self._local.db = None
+
+
+_default_state = None
+_default_lock = threading.Lock()
+
+
+def get_shared_state():
+    """Process-wide SharedState, or None unless CLIP_EXTRACTOR_SHARED_STATE is set"""
+    global _default_state
+    if not config.SHARED_STATE:
+        return None
+    with _default_lock:
+        if _default_state is None:
+            _default_state = SharedState()
+        return _default_state
+
+
+def shared_lock(name, ttl):
+    """SharedState.lock() when state is shared, else a no-op context"""
+    state = get_shared_state()
+    return nullcontext() if state is None else state.lock(name, ttl)
@@ -0,0 +1,82 @@
+"""
+Single-flight call coalescing
+Concurrent callers asking for the same key share one execution of the work
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.users = 1
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.users += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _lead(self, key, call, func, args, kwargs):
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do(self, key, func, *args, **kwargs):
+        call, leader = self._join(key)
+        if leader:
+            self._lead(key, call, func, args, kwargs)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def share(self, key, func, use, cleanup):
+        """Run func once per key and pass its result through use() in every
+        caller; cleanup(result) runs after the last caller's use() returns
+
+        For results that need tearing down (e.g. a shared download directory
+        that waiters copy out of) once nobody can still be reading them.
+        """
+        call, leader = self._join(key)
+        if leader:
+            self._lead(key, call, func, (), {})
+        else:
+            call.done.wait()
+        try:
+            if call.error is not None:
+                raise call.error
+            return use(call.result)
+        finally:
+            with self._lock:
+                call.users -= 1
+                last = call.users == 0
+            if last and call.error is None:
+                cleanup(call.result)
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,108 @@
+"""
+Local cache of downloaded source media
+
+Entries are addressed by (video ID, yt-dlp format, downloaded time range);
+a full-video download is stored with the range 'full' and satisfies any
+range request. index() exposes a video's cached sections as an
+IntervalIndex so a range can be assembled from several entries. Files are moved in atomically, reads refresh mtime, and the
+least recently used entries are evicted once the cache exceeds its byte
+budget. Callers take a hardlink of an entry (checkout) before using it so
+eviction can never delete a file out from under a running ffmpeg; job
+scratch directories live next to the cache (config.SCRATCH_DIR) so those
+links are free.
+"""
+
+import hashlib
+import threading
+import uuid
+
+from . import config
+from .diskutil import atomic_move, evict_lru, link_or_copy, touch
+from .intervals import Entry, IntervalIndex
+
+FULL = 'full'
+
+
+def range_key(start_sec, end_sec):
+    """'373-390' for a section, 'full' for the whole video"""
+    if start_sec is None and end_sec is None:
+        return FULL
+    return f"{start_sec}-{end_sec}"
+
+
+class SourceCache:
+    """Byte-budgeted LRU cache of downloaded source files"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or config.CACHE_DIR / "sources"
+        self.max_bytes = config.SOURCE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._evict_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, video_id, fmt, start_sec=None, end_sec=None):
+        rng = range_key(start_sec, end_sec)
+        digest = hashlib.sha256(f"{video_id}\0{fmt}\0{rng}".encode()).hexdigest()[:16]
+        return self.directory / f"{video_id}_{rng}_{digest}.media"
+
+    def index(self, video_id, fmt):
+        """IntervalIndex of every cached section of a video in this format
+
+        Built from file names (and verified against path_for), so it is
+        always consistent with eviction.
+        """
+        prefix = f"{video_id}_"
+        entries = []
+        for path in self.directory.glob(f"{prefix}*.media"):
+            rng = path.stem[len(prefix):].rpartition('_')[0]
+            if rng == FULL:
+                start_sec = end_sec = None
+            else:
+                start, _, end = rng.partition('-')
+                try:
+                    start_sec, end_sec = int(start), int(end)
+                except ValueError:
+                    continue
+            if path != self.path_for(video_id, fmt, start_sec, end_sec):
+                continue  # other format, or another video sharing the prefix
+            entries.append(Entry(start_sec or 0, end_sec, path))
+        return IntervalIndex(entries)
+
+    def put(self, video_id, fmt, start_sec, end_sec, src):
+        """Add a finished download to the cache, leaving src in place
+
+        The entry is hardlinked to src when both live on one filesystem
+        (otherwise copied) and renamed into place atomically.
+        """
+        dest = self.path_for(video_id, fmt, start_sec, end_sec)
+        tmp = self.directory / f".incoming-{uuid.uuid4().hex}"
+        try:
+            link_or_copy(src, tmp)
+            atomic_move(tmp, dest)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self.evict()
+        return dest
+
+    def checkout(self, path, dest):
+        """Hardlink (or copy) an entry to dest for exclusive use"""
+        touch(path)
+        link_or_copy(path, dest)
+        return dest
+
+    def evict(self):
+        with self._evict_lock:
+            evict_lru(self.directory, "*.media", self.max_bytes)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_source_cache():
+    """Process-wide default SourceCache"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SourceCache()
+        return _default_cache
@@ -0,0 +1,184 @@
+"""
+Getting local source files for requested ranges
+
+For each requested range the source cache's interval index is consulted:
+ranges inside cached sections are served without touching the network,
+ranges mostly inside them only fetch the missing gaps (all gaps of all
+ranges in one yt-dlp run) and the pieces are stitched with the concat
+demuxer, and anything else is downloaded as a whole section.
+
+Concurrent jobs that need the same sections share one in-flight download:
+the first job downloads into a shared directory and every job (leader and
+waiters) hardlinks the result into its own scratch directory. With shared
+state, jobs in other processes wait for it too and then take the sections
+from the source cache.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from . import config, metrics
+from .diskutil import link_or_copy
+from .download import DEFAULT_FORMAT, DOWNLOAD_TIMEOUT, download_sections
+from .intervals import IntervalIndex, coverage
+from .media import run_ffmpeg
+from .shared_state import shared_lock
+from .singleflight import SingleFlight
+from .source_cache import get_source_cache
+
+_downloads = SingleFlight()
+
+
+def fetch_sources(video_id, ranges, scratch, use_cache=True, log=None, fmt=DEFAULT_FORMAT):
+    """Return a (section_start, section_end, path) source for every range
+
+    Paths live in scratch (hardlinked from the cache where possible);
+    section_end is None when the file is the full video.
+    """
+    log = log or (lambda message: None)
+    cache = get_source_cache() if use_cache else None
+    index = cache.index(video_id, fmt) if cache is not None else IntervalIndex()
+
+    plans = []
+    for start_sec, end_sec in ranges:
+        plan = index.cover(start_sec, end_sec)
+        if coverage(plan) < config.INTERVAL_MIN_COVERAGE:
+            plan = [(start_sec, end_sec, None)]
+        plans.append(_checkout(plan, cache, scratch))
+
+    gaps = sorted({(s, e) for plan in plans for s, e, entry in plan if entry is None})
+    if cache is not None:
+        metrics.cache_result('source', not gaps)
+    if not gaps:
+        log("Served entirely from the source cache")
+    else:
+        cached = sum(1 for plan in plans for *_, entry in plan if entry is not None)
+        log(f"Downloading {len(gaps)} section(s), {cached} piece(s) cached")
+        fetched = download_shared(video_id, gaps, scratch, fmt, cache, log)
+
+        if fetched[0][1] is None:
+            # Section download failed and yt-dlp fell back to the full video
+            _, _, path = fetched[0]
+            return [(0, None, path) for _ in ranges]
+
+        for start_sec, end_sec, path in fetched:
+            index.add(start_sec, end_sec, path)
+
+        # Re-plan the gaps against the freshly downloaded sections
+        plans = [
+            [(s, e, entry) if entry is not None else (s, e, _fetched_entry(index, s, e))
+             for s, e, entry in plan]
+            for plan in plans
+        ]
+
+    return [_assemble(plan, scratch) for plan in plans]
+
+
+def download_shared(video_id, gaps, scratch, fmt=DEFAULT_FORMAT, cache=None, log=None):
+    """download_sections() coalesced across concurrent callers
+
+    Callers asking for the same (video, format, sections) while a download
+    is running wait for it instead of starting their own. Returns the same
+    (start, end, path) list as download_sections() with paths in scratch.
+    """
+    log = log or (lambda message: None)
+    key = (video_id, fmt, tuple(gaps))
+    if _downloads.in_flight(key):
+        log("Joining an in-flight download of the same sections")
+
+    def download():
+        config.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+        shared = Path(tempfile.mkdtemp(prefix=f"{video_id}_download_", dir=config.SCRATCH_DIR))
+        try:
+            with shared_lock(f"download:{video_id}:{fmt}:{gaps}", DOWNLOAD_TIMEOUT * 2):
+                fetched = _cached_sections(cache, video_id, fmt, gaps, shared)
+                if fetched is None:
+                    fetched = download_sections(video_id, gaps, shared, fmt)
+                    if cache is not None:
+                        for start_sec, end_sec, path in fetched:
+                            if end_sec is None:
+                                cache.put(video_id, fmt, None, None, path)
+                            else:
+                                cache.put(video_id, fmt, start_sec, end_sec, path)
+        except BaseException:
+            shutil.rmtree(shared, ignore_errors=True)
+            raise
+        return shared, fetched
+
+    def checkout(result):
+        _, fetched = result
+        checked_out = []
+        for start_sec, end_sec, path in fetched:
+            dest = scratch / path.name
+            link_or_copy(path, dest)
+            checked_out.append((start_sec, end_sec, dest))
+        return checked_out
+
+    def cleanup(result):
+        shutil.rmtree(result[0], ignore_errors=True)
+
+    return _downloads.share(key, download, checkout, cleanup)
+
+
+def _cached_sections(cache, video_id, fmt, gaps, dest_dir):
+    """Check out gaps another process has cached meanwhile, or None unless
+    every one of them is there"""
+    if cache is None:
+        return None
+    fetched = []
+    for start_sec, end_sec in gaps:
+        path = cache.path_for(video_id, fmt, start_sec, end_sec)
+        try:
+            fetched.append((start_sec, end_sec, cache.checkout(path, dest_dir / path.name)))
+        except FileNotFoundError:
+            return None
+    return fetched
+
+
+def _fetched_entry(index, start_sec, end_sec):
+    for entry in index.entries:
+        if entry.start == start_sec and entry.end == end_sec:
+            return entry
+    raise KeyError((start_sec, end_sec))
+
+
+def _checkout(plan, cache, scratch):
+    """Hardlink the cached entries a plan uses into scratch
+
+    Entries evicted since the index was built turn into gaps.
+    """
+    checked_out = []
+    for start_sec, end_sec, entry in plan:
+        if entry is not None and not str(entry.path).startswith(str(scratch)):
+            dest = scratch / f"cached_{entry.path.name}"
+            try:
+                if not dest.exists():
+                    cache.checkout(entry.path, dest)
+                entry.path = dest
+            except FileNotFoundError:
+                entry = None
+        checked_out.append((start_sec, end_sec, entry))
+    return checked_out
+
+
+def _assemble(plan, scratch):
+    """Turn a fully satisfied plan into one (section_start, section_end, path)"""
+    if len(plan) == 1:
+        _, _, entry = plan[0]
+        return entry.start, None if entry.is_full else entry.end, entry.path
+
+    # Stitch pieces without re-encoding: each piece is the [inpoint,
+    # outpoint] window of its section file
+    start_sec, end_sec = plan[0][0], plan[-1][1]
+    concat_list = scratch / f"stitch_{start_sec}-{end_sec}.txt"
+    lines = []
+    for piece_start, piece_end, entry in plan:
+        lines.append(f"file '{entry.path}'")
+        lines.append(f"inpoint {piece_start - entry.start}")
+        lines.append(f"outpoint {piece_end - entry.start}")
+    concat_list.write_text("\n".join(lines) + "\n")
+
+    stitched = scratch / f"stitched_{start_sec}-{end_sec}.mp4"
+    run_ffmpeg(["-f", "concat", "-safe", "0", "-i", concat_list, "-c", "copy", stitched])
+    return start_sec, end_sec, stitched
@@ -0,0 +1,114 @@
+"""
+Piped download-to-cut: yt-dlp writes the section to stdout, ffmpeg reads it
+from stdin and writes the clip while the download is still running
+
+Nothing but the output clip touches the disk: no scratch directory, no
+source file to probe and re-read, no source cache entry. yt-dlp sends the
+section as MPEG-TS (a streamable container) and ffmpeg remuxes it into the
+output file. The piped input can't be seeked, so the cut happens on the
+yt-dlp side: copy mode takes the section as is (starting at the keyframe
+before the start time), the frame accurate modes ask yt-dlp to
+--force-keyframes-at-cuts, which re-encodes the section edges. MPEG-TS
+can't carry VP9 or AV1, so fmt should only select H.264/AAC
+(resolve_format(..., mp4=True)).
+"""
+
+import signal
+import subprocess
+import threading
+
+from . import metrics, progress
+from .download import DEFAULT_FORMAT, DOWNLOAD_TIMEOUT, MERGE_ARGS
+from .errors import DownloadError, ExtractionError
+from .timeframe import seconds_to_time
+from .video_id import watch_url
+
+
+def stream_clip(video_id, start_sec, end_sec, output_path, mode='exact',
+                fmt=DEFAULT_FORMAT, timeout=DOWNLOAD_TIMEOUT):
+    """Download [start_sec, end_sec] straight into output_path through a pipe"""
+    with metrics.timed('stream'):
+        _stream_clip(video_id, start_sec, end_sec, output_path, mode, fmt, timeout)
+
+
+def _stream_clip(video_id, start_sec, end_sec, output_path, mode, fmt, timeout):
+    download = [
+        "yt-dlp", "--quiet", "--no-warnings",
+        "--format", fmt, *MERGE_ARGS,
+        "--download-sections", f"*{seconds_to_time(start_sec)}-{seconds_to_time(end_sec)}",
+        "--output", "-",
+    ]
+    if mode != 'copy':
+        download.append("--force-keyframes-at-cuts")
+    download.append(watch_url(video_id))
+
+    report = progress.current()
+    remux = ["ffmpeg", "-y", "-loglevel", "error"]
+    if report is not None:
+        remux += progress.FFMPEG_ARGS
+    remux += ["-i", "pipe:0", "-t", str(end_sec - start_sec), "-c", "copy", str(output_path)]
+
+    try:
+        downloader = subprocess.Popen(download, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise DownloadError("yt-dlp not found")
+    try:
+        encoder = subprocess.Popen(
+            remux,
+            stdin=downloader.stdout,
+            stdout=subprocess.PIPE if report is not None else subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        downloader.kill()
+        downloader.wait()
+        raise ExtractionError("ffmpeg not found")
+    finally:
+        # ffmpeg holds the read end now; yt-dlp must see EPIPE if it exits
+        downloader.stdout.close()
+
+    stderr = {}
+    drains = [
+        threading.Thread(target=lambda p=p: stderr.__setitem__(p, p.stderr.read()), daemon=True)
+        for p in (downloader, encoder)
+    ]
+    for drain in drains:
+        drain.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        downloader.kill()
+        encoder.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        if report is not None:
+            parser = progress.FfmpegProgressParser()
+            for line in encoder.stdout:
+                event = parser.feed(line.decode(errors='replace'))
+                if event is not None:
+                    report(event)
+        encoder.wait()
+        downloader.wait()
+    finally:
+        timer.cancel()
+        for proc in (downloader, encoder):
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        for drain in drains:
+            drain.join()
+
+    if timed_out.is_set():
+        raise DownloadError("Download timed out")
+    download_error = stderr[downloader].decode(errors='replace').strip()
+    encode_error = stderr[encoder].decode(errors='replace').strip()
+    # yt-dlp fails on a broken pipe when ffmpeg gives up first; blame ffmpeg then
+    pipe_closed = downloader.returncode == -signal.SIGPIPE or "Broken pipe" in download_error
+    if downloader.returncode != 0 and not (encoder.returncode != 0 and pipe_closed):
+        raise DownloadError(f"Failed to download video: {download_error}")
+    if encoder.returncode != 0:
+        raise ExtractionError(f"ffmpeg failed: {encode_error}")
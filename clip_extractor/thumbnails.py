@@ -0,0 +1,166 @@
+"""
+Thumbnail fetching and a disk cache of resized thumbnails
+
+Thumbnails are downloaded through one pooled requests.Session (keep-alive
+connections are reused across loads), resized once with LANCZOS and stored
+as JPEG keyed by video ID and target size, so repeat loads are a file read.
+Entries are LRU-evicted to a byte budget like the other caches; concurrent
+loads of the same thumbnail share one download.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+from . import config, metrics
+from .diskutil import evict_lru, touch
+from .errors import ClipExtractorError, DownloadError
+from .shared_state import shared_lock
+from .singleflight import SingleFlight
+
+FETCH_TIMEOUT = 10
+JPEG_QUALITY = 85
+
+# Largest size served, so arbitrary requests can't fill the cache
+MAX_SIZE = (1280, 720)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Process-wide requests.Session with a connection pool per host"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            try:
+                import requests
+                from requests.adapters import HTTPAdapter
+            except ImportError:
+                raise ClipExtractorError("requests is not installed")
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def default_url(video_id):
+    """YouTube's static thumbnail URL (no metadata lookup needed)"""
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+
+def fetch_image(url):
+    """Download image bytes through the shared session"""
+    try:
+        response = http_session().get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+    except ClipExtractorError:
+        raise
+    except Exception as e:
+        raise DownloadError(f"Failed to fetch thumbnail: {e}")
+    return response.content
+
+
+def resize(data, size):
+    """JPEG bytes of the image scaled (LANCZOS) to fit within size"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ClipExtractorError("Pillow is not installed")
+
+    image = Image.open(BytesIO(data))
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    out = BytesIO()
+    image.save(out, format='JPEG', quality=JPEG_QUALITY)
+    return out.getvalue()
+
+
+def clamp_size(width, height):
+    return (max(1, min(int(width), MAX_SIZE[0])), max(1, min(int(height), MAX_SIZE[1])))
+
+
+class ThumbnailCache:
+    """Disk cache of resized thumbnails keyed by video ID and size"""
+
+    def __init__(self, directory=None, max_bytes=None, fetch=fetch_image):
+        self.directory = directory or config.CACHE_DIR / "thumbnails"
+        self.max_bytes = config.THUMBNAIL_MAX_BYTES if max_bytes is None else max_bytes
+        self.fetch = fetch
+        self._flight = SingleFlight()
+        self._evict_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, video_id, size):
+        width, height = size
+        return self.directory / f"{video_id}_{width}x{height}.jpg"
+
+    def get(self, video_id, size, url=None):
+        """Path of the cached thumbnail, downloading and resizing on a miss
+
+        url defaults to YouTube's static thumbnail for the video.
+        """
+        size = clamp_size(*size)
+        path = self.path_for(video_id, size)
+        hit = touch(path)
+        metrics.cache_result('thumbnail', hit)
+        if hit:
+            return path
+        return self._flight.do((video_id, size), self._fill, video_id, size, url)
+
+    def _fill(self, video_id, size, url):
+        with shared_lock(f"thumbnail:{video_id}:{size[0]}x{size[1]}", FETCH_TIMEOUT * 3):
+            return self._resize(video_id, size, url)
+
+    def _resize(self, video_id, size, url):
+        path = self.path_for(video_id, size)
+        if path.exists():
+            return path
+
+        with metrics.timed('thumbnail'):
+            data = resize(self.fetch(url or default_url(video_id)), size)
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        with self._evict_lock:
+            evict_lru(self.directory, "*.jpg", self.max_bytes)
+
+
+def etag(path):
+    """Content hash validator for a cached thumbnail (mtime is unusable:
+    reads refresh it for LRU)"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Process-wide default ThumbnailCache"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ThumbnailCache()
+        return _default_cache
+
+
+def get_thumbnail(video_id, size=(480, 360), url=None):
+    """Path of a resized thumbnail for a video (cached on disk)"""
+    return get_thumbnail_cache().get(video_id, size, url)
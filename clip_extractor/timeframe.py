@@ -0,0 +1,98 @@
+"""
+Time and timeframe parsing
+Mirrors the behaviour of parse_time.sh and validate_timeframe.sh without forking
+"""
+
+import re
+
+from .errors import InvalidTimeframeError
+
+TIME_RE = re.compile(r'^[0-9]+:[0-9]+(:[0-9]+)?$')
+
+
+def validate_time(time_str):
+    """Return True if time_str is MM:SS or HH:MM:SS"""
+    return bool(TIME_RE.match(time_str.strip()))
+
+
+def time_to_seconds(time_str):
+    """Convert HH:MM:SS or MM:SS to seconds"""
+    time_str = time_str.strip()
+    if not validate_time(time_str):
+        raise InvalidTimeframeError(f"Invalid time format: {time_str}")
+
+    parts = time_str.split(':')
+    if len(parts) == 3:
+        h, m, s = parts
+    else:
+        h = '0'
+        m, s = parts
+
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def seconds_to_time(seconds):
+    """Convert seconds to HH:MM:SS format"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_time(time_str):
+    """Convert MM:SS or HH:MM:SS to HH:MM:SS"""
+    return seconds_to_time(time_to_seconds(time_str))
+
+
+def to_seconds(value):
+    """Accept seconds (int/float) or a time string and return seconds"""
+    if isinstance(value, (int, float)):
+        return value
+    return time_to_seconds(str(value))
+
+
+def validate_timeframe(timeframe):
+    """Check START-END syntax only, returning (start, end) strings"""
+    if '-' not in timeframe:
+        raise InvalidTimeframeError(
+            f"Invalid timeframe format: {timeframe} "
+            "(expected START-END, e.g., 06:13-06:30)"
+        )
+
+    start_time, _, end_time = timeframe.partition('-')
+    if not validate_time(start_time):
+        raise InvalidTimeframeError(f"Invalid start time: {start_time}")
+    if not validate_time(end_time):
+        raise InvalidTimeframeError(f"Invalid end time: {end_time}")
+
+    return start_time.strip(), end_time.strip()
+
+
+def parse_timeframe(timeframe):
+    """Parse START-END into (start_seconds, end_seconds)
+
+    Raises InvalidTimeframeError if the syntax is wrong or end <= start.
+    """
+    start_time, end_time = validate_timeframe(timeframe)
+    return check_range(time_to_seconds(start_time), time_to_seconds(end_time))
+
+
+def check_range(start_sec, end_sec):
+    """Return (start, end) if the range is non-empty, else raise"""
+    if end_sec <= start_sec:
+        raise InvalidTimeframeError(
+            "Invalid timeframe: end time must be after start time"
+        )
+    return start_sec, end_sec
+
+
+def merge_ranges(ranges, gap=0):
+    """Merge overlapping (or within `gap` seconds) (start, end) ranges
+
+    Returns a sorted list of non-overlapping (start, end) tuples.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
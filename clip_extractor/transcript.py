@@ -0,0 +1,326 @@
+"""
+Transcripts with a persistent columnar cache
+
+A fetched transcript is stored per video/track as:
+
+    b'YCT1' | uint32 header length | JSON header
+    | float64 starts[n] | float64 durations[n] | uint32 offsets[n + 1]
+    | UTF-8 text
+
+(all little-endian). Cue i's text is text[offsets[i]:offsets[i + 1]].
+The list of tracks a video offers is cached alongside, so the track to use
+is known without a network call.
+Windows are answered by binary search over the sorted start times, so
+nudging the timeframe costs a file read at most, never a network fetch.
+"""
+
+import bisect
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from . import config, metrics
+from .errors import TranscriptError
+from .timeframe import to_seconds
+
+MAGIC = b'YCT1'
+
+# Loaded transcripts kept in memory per process
+MEMORY_ENTRIES = 64
+
+
+def _le(arr):
+    """Convert an array to/from little-endian in place"""
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def format_mmss(seconds):
+    """Convert seconds to MM:SS format"""
+    m = int(seconds // 60)
+    s = int(seconds % 60)
+    return f"{m:02d}:{s:02d}"
+
+
+class Transcript:
+    """Columnar transcript: parallel start/duration arrays + text offsets"""
+
+    def __init__(self, starts, durations, offsets, text, meta=None):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.text = text
+        self.meta = meta or {}
+        self.max_duration = max(durations) if len(durations) else 0.0
+
+    @classmethod
+    def from_entries(cls, entries, meta=None):
+        """Build from (start, duration, text) tuples"""
+        entries = sorted(entries, key=lambda e: e[0])
+        starts = array('d')
+        durations = array('d')
+        offsets = array('I', [0])
+        chunks = []
+        size = 0
+        for start, duration, text in entries:
+            data = text.strip().encode('utf-8')
+            starts.append(start)
+            durations.append(duration)
+            chunks.append(data)
+            size += len(data)
+            offsets.append(size)
+        return cls(starts, durations, offsets, b''.join(chunks), meta)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def cue_text(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    def window(self, start_sec, end_sec):
+        """Cues overlapping [start_sec, end_sec], in order
+
+        Returns a list of dicts with start, duration, time (MM:SS) and text.
+        """
+        # No cue starting before start_sec - max_duration can reach start_sec
+        lo = bisect.bisect_left(self.starts, start_sec - self.max_duration)
+        hi = bisect.bisect_right(self.starts, end_sec)
+        segments = []
+        for i in range(lo, hi):
+            if self.starts[i] + self.durations[i] < start_sec:
+                continue
+            segments.append({
+                'start': self.starts[i],
+                'duration': self.durations[i],
+                'time': format_mmss(self.starts[i]),
+                'text': self.cue_text(i),
+            })
+        return segments
+
+    def to_bytes(self):
+        header = json.dumps(dict(self.meta, count=len(self))).encode('utf-8')
+        parts = [MAGIC, struct.pack('<I', len(header)), header]
+        for arr in (self.starts, self.durations, self.offsets):
+            copy = array(arr.typecode, arr)
+            parts.append(_le(copy).tobytes())
+        parts.append(self.text)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("Not a transcript cache file")
+        (header_len,) = struct.unpack_from('<I', data, 4)
+        pos = 8 + header_len
+        meta = json.loads(data[8:pos].decode('utf-8'))
+        count = meta.pop('count')
+
+        arrays = []
+        for typecode, n in (('d', count), ('d', count), ('I', count + 1)):
+            arr = array(typecode)
+            size = arr.itemsize * n
+            arr.frombytes(data[pos:pos + size])
+            arrays.append(_le(arr))
+            pos += size
+        starts, durations, offsets = arrays
+        return cls(starts, durations, offsets, data[pos:], meta)
+
+
+def track_info(track):
+    """Plain-dict description of a youtube_transcript_api Transcript"""
+    return {
+        'language': track.language,
+        'language_code': track.language_code,
+        'is_generated': bool(track.is_generated),
+    }
+
+
+def choose_track(tracks, languages=None):
+    """Pick a track from a listing by language priority
+
+    Languages are tried in order; within a language a manually created
+    track beats an auto-generated one. If none of the languages exist, the
+    first manual track (else the first generated one) is used. Returns
+    None only for an empty listing.
+    """
+    languages = languages or config.TRANSCRIPT_LANGUAGES
+    for lang in languages:
+        for generated in (False, True):
+            for track in tracks:
+                if track['language_code'] == lang and track['is_generated'] == generated:
+                    return track
+    for generated in (False, True):
+        for track in tracks:
+            if track['is_generated'] == generated:
+                return track
+    return None
+
+
+def fetch_transcript(video_id, languages=None):
+    """Fetch a transcript from YouTube (uncached)
+
+    One listing call discovers every available track, the best one is
+    chosen with choose_track(), and only that track is fetched. The
+    listing is returned in meta['available'] so it can be cached.
+    """
+    try:
+        from youtube_transcript_api import YouTubeTranscriptApi
+    except ImportError:
+        raise TranscriptError("youtube-transcript-api is not installed")
+
+    try:
+        listing = list(YouTubeTranscriptApi().list(video_id))
+    except Exception as e:
+        raise TranscriptError(f"No transcript available: {e}")
+
+    tracks = [track_info(track) for track in listing]
+    chosen = choose_track(tracks, languages)
+    if chosen is None:
+        raise TranscriptError("No transcript available")
+
+    try:
+        fetched = listing[tracks.index(chosen)].fetch()
+    except Exception as e:
+        raise TranscriptError(f"Failed to fetch transcript: {e}")
+
+    meta = dict(chosen, video_id=video_id, available=tracks, fetched_at=time.time())
+    return Transcript.from_entries(
+        ((entry.start, entry.duration, entry.text) for entry in fetched),
+        meta
+    )
+
+
+class TranscriptCache:
+    """Per video/track transcript files, per video track listings, and a
+    small in-memory LRU of loaded transcripts"""
+
+    def __init__(self, directory=None, ttl=None, fetch=fetch_transcript, on_save=None):
+        self.directory = directory or config.CACHE_DIR / "transcripts"
+        self.ttl = config.TRANSCRIPT_TTL if ttl is None else ttl
+        self.fetch = fetch
+        self.on_save = on_save  # callable(video_id, path, transcript)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, video_id, track):
+        suffix = ".auto" if track.get('is_generated') else ""
+        return self.directory / f"{video_id}.{track['language_code']}{suffix}.yct"
+
+    def _tracks_path(self, video_id):
+        return self.directory / f"{video_id}.tracks.json"
+
+    def _fresh(self, fetched_at):
+        return time.time() - fetched_at <= self.ttl
+
+    def _remember(self, key, transcript):
+        with self._lock:
+            self._memory[key] = transcript
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _write(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def load_tracks(self, video_id):
+        """Cached track listing for a video, or None"""
+        try:
+            with open(self._tracks_path(video_id), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry['tracks'] if self._fresh(entry.get('fetched_at', 0)) else None
+
+    def save_tracks(self, video_id, tracks):
+        data = json.dumps({'fetched_at': time.time(), 'tracks': tracks})
+        self._write(self._tracks_path(video_id), data.encode('utf-8'))
+
+    def load(self, video_id, track):
+        """Cached transcript for one track, or None"""
+        path = self._path(video_id, track)
+        with self._lock:
+            transcript = self._memory.get(path)
+            if transcript is not None:
+                self._memory.move_to_end(path)
+        if transcript is None:
+            try:
+                with open(path, 'rb') as f:
+                    transcript = Transcript.from_bytes(f.read())
+            except (FileNotFoundError, ValueError, KeyError, struct.error):
+                return None
+            self._remember(path, transcript)
+        return transcript if self._fresh(transcript.meta.get('fetched_at', 0)) else None
+
+    def save(self, video_id, transcript):
+        path = self._path(video_id, transcript.meta)
+        self._write(path, transcript.to_bytes())
+        self._remember(path, transcript)
+        if self.on_save is not None:
+            self.on_save(video_id, path, transcript)
+
+    def get(self, video_id, languages=None):
+        """Best transcript for the language priority list
+
+        With a cached listing the chosen track is known up front, so a
+        cached transcript is served without any network call.
+        """
+        tracks = self.load_tracks(video_id)
+        if tracks is not None:
+            track = choose_track(tracks, languages)
+            if track is None:
+                raise TranscriptError("No transcript available")
+            transcript = self.load(video_id, track)
+            if transcript is not None:
+                metrics.cache_result('transcript', True)
+                return transcript
+
+        metrics.cache_result('transcript', False)
+        with metrics.timed('transcript'):
+            transcript = self.fetch(video_id, languages)
+        if transcript.meta.get('available') is not None:
+            self.save_tracks(video_id, transcript.meta['available'])
+        self.save(video_id, transcript)
+        return transcript
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """Process-wide default TranscriptCache"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            from .search import get_search_index
+
+            # New transcripts are added to the phrase search index as cached
+            _default_cache = TranscriptCache(on_save=get_search_index().add_transcript)
+        return _default_cache
+
+
+def get_transcript(video_id, languages=None):
+    """Cached Transcript for a video; meta says which track was chosen"""
+    return get_transcript_cache().get(video_id, languages)
+
+
+def get_transcript_segment(video_id, start, end, languages=None):
+    """Transcript cues overlapping [start, end] (seconds or time strings)"""
+    transcript = get_transcript(video_id, languages)
+    return transcript.window(to_seconds(start), to_seconds(end))
@@ -0,0 +1,42 @@
+"""
+YouTube URL parsing
+Mirrors the URL patterns accepted by parse_video_id.sh
+"""
+
+import re
+
+from .errors import InvalidURLError
+
+# (marker, pattern) pairs tried in order, same as parse_video_id.sh
+URL_PATTERNS = [
+    (re.compile(r'youtube\.com/watch\?v='), re.compile(r'.*[?&]v=([^&]*)')),
+    (re.compile(r'youtu\.be/'), re.compile(r'.*youtu\.be/([^?]*)')),
+    (re.compile(r'youtube\.com/embed/'), re.compile(r'.*youtube\.com/embed/([^?]*)')),
+    (re.compile(r'youtube\.com/v/'), re.compile(r'.*youtube\.com/v/([^?]*)')),
+]
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def parse_video_id(url):
+    """Extract video ID from YouTube URL"""
+    for marker, pattern in URL_PATTERNS:
+        if not marker.search(url):
+            continue
+        match = pattern.match(url)
+        if match and match.group(1):
+            return match.group(1)
+
+    raise InvalidURLError(f"Could not extract video ID from URL: {url}")
+
+
+def check_video_id(video_id):
+    """Validate a bare video ID (not a URL), returning it unchanged"""
+    if not VIDEO_ID_RE.match(video_id):
+        raise InvalidURLError(f"Invalid video ID: {video_id}")
+    return video_id
+
+
+def watch_url(video_id):
+    """Canonical watch URL for a video ID"""
+    return f"https://www.youtube.com/watch?v={video_id}"
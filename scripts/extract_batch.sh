@@ -0,0 +1,23 @@
+#!/bin/bash
+# Extract several clips from one YouTube video with a single download
+# Usage: ./extract_batch.sh <youtube_url> <timeframe> [timeframe...] [--output-dir DIR] [--prefix NAME] [--quality 720p]
+# Example: ./extract_batch.sh "https://youtube.com/watch?v=ABC" "00:30-01:00" "02:15-02:45"
+# Thin wrapper around clip_extractor.extract_batch
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+if [ -z "$1" ] || [ -z "$2" ]; then
+    echo -e "${RED}Usage:${NC} $0 <youtube_url> <timeframe> [timeframe...] [--output-dir DIR] [--prefix NAME] [--quality 720p]"
+    echo ""
+    echo "Example:"
+    echo "  $0 'https://youtube.com/watch?v=ABC' '00:30-01:00' '02:15-02:45' '05:00-05:30'"
+    exit 1
+fi
+
+export PYTHONPATH="$SCRIPT_DIR/..${PYTHONPATH:+:$PYTHONPATH}"
+exec python3 -m clip_extractor batch "$@"
@@ -0,0 +1,26 @@
+#!/bin/bash
+# Join clips from one or more YouTube videos into a highlight reel
+# Usage: ./extract_reel.sh <output_file> <youtube_url> <timeframe> [<youtube_url> <timeframe>...] [--mode MODE] [--quality 720p]
+# Example: ./extract_reel.sh reel.mp4 "https://youtube.com/watch?v=ABC" "00:30-01:00" "https://youtu.be/XYZ" "02:15-02:45"
+# Thin wrapper around clip_extractor.extract_reel
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+if [ -z "$1" ] || [ -z "$2" ] || [ -z "$3" ]; then
+    echo -e "${RED}Usage:${NC} $0 <output_file> <youtube_url> <timeframe> [<youtube_url> <timeframe>...] [--mode MODE] [--quality 720p]"
+    echo ""
+    echo "Example:"
+    echo "  $0 reel.mp4 'https://youtube.com/watch?v=ABC' '00:30-01:00' 'https://youtu.be/XYZ' '02:15-02:45'"
+    echo ""
+    echo "Clips with matching formats are joined without re-encoding; only the"
+    echo "odd ones out are converted to the reel's common format."
+    exit 1
+fi
+
+export PYTHONPATH="$SCRIPT_DIR/..${PYTHONPATH:+:$PYTHONPATH}"
+exec python3 -m clip_extractor reel "$@"
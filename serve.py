@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+YouTube Clip Extractor - production server
+Usage: python3 serve.py [--host 127.0.0.1] [--port 5001] [--workers N] [--threads N]
+
+Serves the web GUI from several gunicorn worker processes instead of
+Flask's single-process development server. Each worker runs its own job
+queue; job status, thumbnail URLs and cache leases go through the shared
+SQLite state database (CLIP_EXTRACTOR_STATE_DB), so any worker can answer
+for any job. Requires gunicorn (pip install gunicorn).
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Before clip_extractor is imported here or in any worker
+os.environ['CLIP_EXTRACTOR_SHARED_STATE'] = '1'
+
+from clip_extractor import config  # noqa: E402
+from clip_extractor.shared_state import SharedState  # noqa: E402
+
+# Seconds a worker may go silent before the master restarts it
+WORKER_TIMEOUT = 120
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument('--threads', type=int, default=config.SERVER_THREADS,
+                        help="Request threads per worker; job event streams hold one each")
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn is not installed (pip install gunicorn)")
+
+    # One JSON summary line per finished job
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    # No worker survives a restart, so nothing can still be running these
+    state = SharedState()
+    orphaned = state.fail_unfinished("Server restarted before the job finished")
+    state.close()
+    if orphaned:
+        print(f"Marked {orphaned} unfinished job(s) from the last run as failed")
+
+    class Server(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Imported in each worker, after the fork, so every process opens
+            # its own database connections and job queue
+            from web_gui import app
+            return app
+
+    print(f"Serving on http://{args.host}:{args.port} "
+          f"({args.workers} workers x {args.threads} threads)")
+    Server({
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'timeout': WORKER_TIMEOUT,
+        'preload_app': False,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -135,7 +135,559 @@ test_timeframe_hhmmss() {
     assert_equals "0" "$exit_code" "Valid HH:MM:SS timeframe"
 }
 
-# Test 4: Check dependencies
+# Test 4: In-process core library
+echo ""
+echo "Test Suite: Core Library"
+echo "------------------------"
+
+run_py() {
+    PYTHONPATH="$SCRIPT_DIR" python3 -c "$1" 2>/dev/null
+}
+
+test_core_video_id() {
+    local actual=$(run_py "from clip_extractor import parse_video_id; print(parse_video_id('https://youtu.be/AqEN8qOcAcA?t=5'))")
+    assert_equals "AqEN8qOcAcA" "$actual" "Core: parse_video_id (short URL with query)"
+}
+
+test_core_timeframe() {
+    local actual=$(run_py "from clip_extractor import parse_timeframe; print(parse_timeframe('06:13-1:06:30'))")
+    assert_equals "(373, 3990)" "$actual" "Core: parse_timeframe to seconds"
+}
+
+test_core_timeframe_backwards() {
+    local actual=$(run_py "
+from clip_extractor import parse_timeframe, InvalidTimeframeError
+try:
+    parse_timeframe('06:30-06:13')
+except InvalidTimeframeError:
+    print('rejected')")
+    assert_equals "rejected" "$actual" "Core: backwards timeframe rejected"
+}
+
+test_core_metadata_cache() {
+    local actual=$(run_py "
+import tempfile, threading, time
+from pathlib import Path
+from clip_extractor import MetadataCache
+calls = []
+def fetch(video_id):
+    calls.append(video_id)
+    time.sleep(0.2)
+    return {'id': video_id, 'title': 'T'}
+cache = MetadataCache(Path(tempfile.mkdtemp()), ttl=60, fetch=fetch)
+threads = [threading.Thread(target=cache.get, args=('abc',)) for _ in range(8)]
+[t.start() for t in threads]
+[t.join() for t in threads]
+cache.get('abc')
+print(len(calls), cache.get('abc')['title'])")
+    assert_equals "1 T" "$actual" "Core: metadata cache coalesces concurrent loads"
+}
+
+test_core_job_queue() {
+    local actual=$(run_py "
+import time
+from clip_extractor import JobQueue, QueueFullError
+queue = JobQueue(workers=1, max_queued=2)
+def work(job):
+    job.update(progress=0.5, stage='half')
+    time.sleep(0.1)
+    return {'output_path': '/tmp/x.mp4'}
+first = queue.submit('test', work)
+queue.submit('test', work)
+try:
+    queue.submit('test', work)
+except QueueFullError:
+    print('full', end=' ')
+queue.shutdown()
+job = queue.get(first.id).to_dict()
+print(job['state'], job['output_path'])")
+    assert_equals "full done /tmp/x.mp4" "$actual" "Core: job queue bounds and completes jobs"
+}
+
+test_core_merge_ranges() {
+    local actual=$(run_py "from clip_extractor import merge_ranges; print(merge_ranges([(300, 330), (30, 60), (55, 90), (93, 100)], gap=5))")
+    assert_equals "[(30, 100), (300, 330)]" "$actual" "Core: batch ranges merged"
+}
+
+test_core_source_cache() {
+    local actual=$(run_py "
+import tempfile
+from pathlib import Path
+from clip_extractor.source_cache import SourceCache
+tmp = Path(tempfile.mkdtemp())
+cache = SourceCache(tmp / 'cache', max_bytes=25)
+for i in range(3):
+    src = tmp / f'src{i}'
+    src.write_bytes(b'x' * 10)
+    cache.put('vid', 'best', i * 10, i * 10 + 5, src)
+print(cache.index('vid', 'best').covered())")
+    assert_equals "[(10, 15), (20, 25)]" "$actual" "Core: source cache evicts least recently used"
+}
+
+test_core_interval_cover() {
+    local actual=$(run_py "
+from clip_extractor.intervals import IntervalIndex
+index = IntervalIndex()
+index.add(60, 300, 'a')
+index.add(400, 500, 'b')
+print(index.gaps(120, 180), index.gaps(200, 450))")
+    assert_equals "[] [(300, 400)]" "$actual" "Core: interval index finds uncached gaps"
+}
+
+test_core_transcript_window() {
+    local actual=$(run_py "
+import tempfile
+from pathlib import Path
+from clip_extractor import Transcript, TranscriptCache
+calls = []
+def fetch(video_id, languages):
+    calls.append(video_id)
+    cues = [(i * 4.0, 5.0, f'line {i} 한국어') for i in range(1000)]
+    track = {'language': 'Korean', 'language_code': 'ko', 'is_generated': True}
+    return Transcript.from_entries(cues, dict(track, available=[track], fetched_at=1e12))
+cache = TranscriptCache(Path(tempfile.mkdtemp()), fetch=fetch)
+cache.get('vid', ['en', 'ko'])
+cache._memory.clear()
+window = cache.get('vid', ['en', 'ko']).window(373, 381)
+print(len(calls), [seg['time'] for seg in window], window[0]['text'])")
+    assert_equals "1 ['06:08', '06:12', '06:16', '06:20'] line 92 한국어" "$actual" "Core: cached transcript window lookup"
+}
+
+test_core_choose_track() {
+    local actual=$(run_py "
+from clip_extractor import choose_track
+tracks = [
+    {'language': 'German (auto)', 'language_code': 'de', 'is_generated': True},
+    {'language': 'German', 'language_code': 'de', 'is_generated': False},
+    {'language': 'Italian', 'language_code': 'it', 'is_generated': False},
+]
+print(choose_track(tracks, ['en', 'de'])['language'], choose_track(tracks, ['it', 'de'])['language'])")
+    assert_equals "German Italian" "$actual" "Core: transcript track chosen by priority, manual first"
+}
+
+test_core_caption_parser() {
+    local actual=$(run_py "
+from clip_extractor import parse_cues
+vtt = '''WEBVTT
+
+00:06:12.500 --> 00:06:14.310 align:start position:0%
+ 
+hello<00:06:13.000><c> world</c>
+
+00:06:14.310 --> 00:06:14.320 align:start position:0%
+hello world
+ 
+
+00:06:14.320 --> 00:06:16.000 align:start position:0%
+hello world
+next<c> line</c>
+'''
+print([(c.start, c.text) for c in parse_cues(vtt.splitlines())])")
+    assert_equals "[(372.5, 'hello world'), (374.32, 'next line')]" "$actual" "Core: VTT parser keeps ms and dedupes rolling captions"
+}
+
+test_core_transcript_search() {
+    local actual=$(run_py "
+import tempfile
+from pathlib import Path
+from clip_extractor import SearchIndex, Transcript, TranscriptCache
+tmp = Path(tempfile.mkdtemp())
+index = SearchIndex(tmp / 'search.sqlite3')
+def fetch(video_id, languages):
+    cues = [(i * 4.0, 4.0, f'filler {video_id} {i}') for i in range(500)]
+    cues[150] = (600.0, 4.0, 'and that is why the quick brown')
+    cues[151] = (604.0, 4.0, 'fox jumps over everything')
+    track = {'language': 'English', 'language_code': 'en', 'is_generated': False}
+    return Transcript.from_entries(cues, dict(track, available=[track], fetched_at=1e12))
+cache = TranscriptCache(tmp / 'transcripts', fetch=fetch, on_save=index.add_transcript)
+for vid in ('vid1', 'vid2'):
+    cache.get(vid, ['en'])
+hits = index.search('Quick brown fox!')
+print(len(hits), hits[0]['timeframe'], index.search('brown filler'), index.index_directory(tmp / 'transcripts'))")
+    assert_equals "2 00:09:58-00:10:10 [] 0" "$actual" "Core: phrase search across cached transcripts"
+}
+
+test_core_shared_download() {
+    local actual=$(run_py "
+import tempfile, threading, time
+from pathlib import Path
+from clip_extractor import config, sources
+tmp = Path(tempfile.mkdtemp())
+config.SCRATCH_DIR = tmp / 'scratch'
+calls = []
+def fake_download(video_id, ranges, directory, fmt):
+    calls.append(directory)
+    time.sleep(0.3)
+    path = directory / 'section_10.mp4'
+    path.write_bytes(b'media')
+    return [(10, 20, path)]
+sources.download_sections = fake_download
+scratches = [tmp / f'job{i}' for i in range(4)]
+results = []
+def job(scratch):
+    scratch.mkdir()
+    results.append(sources.download_shared('vid', [(10, 20)], scratch))
+threads = [threading.Thread(target=job, args=(s,)) for s in scratches]
+for t in threads: t.start()
+for t in threads: t.join()
+print(len(calls), len({str(r[0][2]) for r in results}), calls[0].exists())")
+    assert_equals "1 4 False" "$actual" "Core: concurrent jobs share one download, each in its own scratch"
+}
+
+test_core_progress_events() {
+    local actual=$(run_py "
+from clip_extractor import Job
+from clip_extractor.progress import FfmpegProgressParser, parse_yt_dlp_line, with_fraction
+job = Job('extract_clip')
+report = with_fraction(job.on_progress, 20.0)
+job.on_stage(4, 5, 'Downloading')
+report(parse_yt_dlp_line('[progress] 524288 NA 1048576 2097152.5 3'))
+download = round(job.progress, 2)
+job.on_stage(5, 5, 'Extracting')
+parser = FfmpegProgressParser()
+for line in ['frame=300', 'fps=150.0', 'total_size=2048', 'out_time=00:00:10.000000', 'speed=5.1x', 'progress=continue']:
+    event = parser.feed(line)
+    if event:
+        report(event)
+print(download, round(job.progress, 2), job.transfer['fps'], job.transfer['bytes'], job.transfer['speed'])")
+    assert_equals "0.7 0.9 150.0 2048 5.1" "$actual" "Core: yt-dlp/ffmpeg progress events drive job progress"
+}
+
+test_core_stage_metrics() {
+    local actual=$(run_py "
+import io, json, logging
+from clip_extractor import JobQueue, metrics
+stream = io.StringIO()
+logging.getLogger('clip_extractor.jobs').addHandler(logging.StreamHandler(stream))
+logging.getLogger('clip_extractor.jobs').setLevel(logging.INFO)
+def target(job):
+    with metrics.timed('download'):
+        metrics.cache_result('source', False)
+    with metrics.timed('encode'):
+        pass
+    return {'output_path': 'clip.mp4'}
+queue = JobQueue(workers=1)
+job = queue.submit('extract_clip', target)
+queue.shutdown()
+line = json.loads(stream.getvalue())
+text = metrics.render()
+print(line['state'], sorted(line['stages']), line['cache'],
+      'clip_extractor_stage_seconds_bucket{stage=\"download\",le=\"+Inf\"} 1' in text,
+      'clip_extractor_cache_requests_total{cache=\"source\",result=\"miss\"} 1' in text)")
+    assert_equals "done ['download', 'encode'] {'source': {'hit': 0, 'miss': 1}} True True" "$actual" "Core: stage timings exported as histograms and logged per job"
+}
+
+test_core_thumbnail_cache() {
+    local actual=$(run_py "
+import tempfile
+from pathlib import Path
+from clip_extractor import thumbnails
+from clip_extractor.thumbnails import ThumbnailCache, etag
+thumbnails.resize = lambda data, size: data + f' {size[0]}x{size[1]}'.encode()
+urls = []
+def fetch(url):
+    urls.append(url)
+    return b'jpeg'
+cache = ThumbnailCache(Path(tempfile.mkdtemp()), fetch=fetch)
+first = cache.get('AqEN8qOcAcA', (480, 360))
+tag = etag(first)
+again = cache.get('AqEN8qOcAcA', (480, 360))
+small = cache.get('AqEN8qOcAcA', (120, 90))
+print(len(urls), urls[0], again.read_bytes().decode(), small.name, etag(again) == tag)")
+    assert_equals "2 https://i.ytimg.com/vi/AqEN8qOcAcA/hqdefault.jpg jpeg 480x360 AqEN8qOcAcA_120x90.jpg True" "$actual" "Core: resized thumbnails cached per video and size"
+}
+
+test_core_chunk_bounds() {
+    local actual=$(run_py "
+from clip_extractor.cutting import chunk_bounds
+print(chunk_bounds(100, 400, 4, [98, 110, 172, 178, 251, 330, 399]))
+print(chunk_bounds(0, 90, 3))")
+    assert_equals "[(100, 172), (172, 251), (251, 330), (330, 400)]
+[(0, 30.0), (30.0, 60.0), (60.0, 90)]" "$actual" "Core: parallel chunks split at the nearest keyframes"
+}
+
+test_core_stream_clip() {
+    local bin_dir=$(mktemp -d)
+    printf '#!/bin/sh\necho "$*" >&2\n[ -n "$FAIL" ] && exit 1\nprintf tsdata\n' > "$bin_dir/yt-dlp"
+    printf '#!/bin/sh\nfor a; do out="$a"; done\ncat > "$out"\n' > "$bin_dir/ffmpeg"
+    chmod +x "$bin_dir/yt-dlp" "$bin_dir/ffmpeg"
+    local actual=$(PATH="$bin_dir:$PATH" run_py "
+import os
+from pathlib import Path
+from clip_extractor.errors import DownloadError
+from clip_extractor.streaming import stream_clip
+out = Path('$bin_dir') / 'clip.mp4'
+stream_clip('AqEN8qOcAcA', 10, 20, out, 'copy')
+print(out.read_text())
+os.environ['FAIL'] = '1'
+try:
+    stream_clip('AqEN8qOcAcA', 10, 20, out, 'exact')
+except DownloadError as e:
+    print('--force-keyframes-at-cuts' in str(e), '--output -' in str(e))")
+    rm -rf "$bin_dir"
+    assert_equals "tsdata
+True True" "$actual" "Core: stream_clip pipes yt-dlp stdout into ffmpeg"
+}
+
+test_core_select_format() {
+    local actual=$(run_py "
+from clip_extractor import InvalidQualityError, parse_quality, select_format
+formats = [
+    {'format_id': '18', 'vcodec': 'avc1.42001E', 'acodec': 'mp4a.40.2', 'height': 360, 'tbr': 600},
+    {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 129},
+    {'format_id': '251', 'vcodec': 'none', 'acodec': 'opus', 'abr': 140},
+    {'format_id': '136', 'vcodec': 'avc1.4d401f', 'acodec': 'none', 'height': 720, 'tbr': 1500},
+    {'format_id': '247', 'vcodec': 'vp9', 'acodec': 'none', 'height': 720, 'tbr': 1100},
+    {'format_id': '401', 'vcodec': 'av01.0.12M.08', 'acodec': 'none', 'height': 2160, 'tbr': 18000},
+]
+pick = lambda spec: select_format(formats, parse_quality(spec))
+print(pick('720p'), pick('height=720,codec=vp9'), pick('720p,bitrate=1000'), pick('audio'),
+      pick('audio,codec=opus'), pick('height=240'), parse_quality('best'),
+      select_format(formats, dict(parse_quality('codec=av1'), mp4=True)))
+try:
+    parse_quality('height=big')
+except InvalidQualityError as e:
+    print(e)")
+    assert_equals "136+140 247+251 18 140 251 None {} 136+140
+Invalid quality: 'height=big'" "$actual" "Core: quality policy picks the cheapest satisfying format"
+}
+
+test_core_audio_format() {
+    local actual=$(run_py "
+from clip_extractor import formats
+from clip_extractor.audio import audio_format, source_codec
+formats.get_metadata = lambda video_id: {'duration': 60, 'formats': [
+    {'format_id': '18', 'vcodec': 'avc1', 'acodec': 'mp4a.40.2', 'height': 360, 'tbr': 600},
+    {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 129},
+    {'format_id': '251', 'vcodec': 'none', 'acodec': 'opus', 'abr': 140},
+]}
+print(audio_format('out/Quote.MP3'), audio_format('clip.mp4'),
+      formats.resolve_format('AqEN8qOcAcA', '720p', source_codec('opus')),
+      formats.resolve_format('AqEN8qOcAcA', 'bitrate=135', source_codec('m4a')))")
+    assert_equals "mp3 None 251/ba/b 140/ba[tbr<=135]/ba/b" "$actual" "Core: audio outputs select an audio-only stream"
+}
+
+test_core_renditions() {
+    local actual=$(run_py "
+from clip_extractor import InvalidRenditionError, parse_renditions
+from clip_extractor.renditions import filter_graph, rendition_path
+renditions = parse_renditions('720p,gif:320')
+print([str(rendition_path('out/clip.mp4', r)) for r in renditions])
+print(filter_graph(renditions))
+try:
+    parse_renditions(['720p', '4k'])
+except InvalidRenditionError as e:
+    print(e)")
+    assert_equals "['out/clip_720p.mp4', 'out/clip_gif320.gif']
+[0:v]split=2[s0][s1];[s0]scale=-2:'min(720,ih)'[v0];[s1]fps=12,scale=320:-1:flags=lanczos,split[g1][h1];[g1]palettegen=stats_mode=diff[p1];[h1][p1]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle[v1]
+Invalid rendition: '4k' (use e.g. 720p, gif or webp:320)" "$actual" "Core: renditions fan out of one filter graph"
+}
+
+test_core_reel_normalize() {
+    local actual=$(run_py "
+from clip_extractor.reel import common_signature, normalize_args
+def info(width, audio='aac', duration=10):
+    streams = [{'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High', 'pix_fmt': 'yuv420p',
+                'width': width, 'height': 720, 'r_frame_rate': '30/1'}]
+    if audio:
+        streams.append({'codec_type': 'audio', 'codec_name': audio, 'sample_rate': '44100', 'channels': 2})
+    return {'streams': streams, 'duration': duration}
+pieces = [info(1280), info(1280, duration=5), info(960, duration=12), info(1280, audio='opus'), info(1280, audio=None)]
+target = common_signature(pieces)
+for piece in pieces:
+    args = normalize_args('p.mp4', piece, target)
+    print('as-is' if args is None else ' '.join(a for a in args if a in ('copy', 'libx264', 'aac', 'anullsrc=r=44100:cl=stereo')))")
+    assert_equals "as-is
+as-is
+libx264 copy
+copy aac
+anullsrc=r=44100:cl=stereo copy aac" "$actual" "Core: reel re-encodes only the streams that differ"
+}
+
+test_core_shared_job_store() {
+    local actual=$(run_py "
+import tempfile, threading, time
+from pathlib import Path
+from clip_extractor import JobQueue, QueueFullError
+from clip_extractor.shared_state import SharedState
+store = SharedState(Path(tempfile.mkdtemp()) / 'state.sqlite3')
+a, b = JobQueue(max_queued=1, store=store), JobQueue(max_queued=1, store=store)
+release = threading.Event()
+job = a.submit('test', lambda job: release.wait(5) and {'output_path': 'x.mp4'})
+try:
+    b.submit('test', lambda job: {})
+except QueueFullError:
+    print('full')
+release.set()
+status = b.wait(job.id, -1, timeout=5)
+while status['state'] != 'done':
+    status = b.wait(job.id, status['version'], timeout=5)
+print(b.get(job.id), status['output_path'])")
+    assert_equals "full
+None x.mp4" "$actual" "Core: job status and queue limit shared through the store"
+}
+
+test_core_cut_passthrough() {
+    local actual=$(run_py "
+from clip_extractor import extract
+extract.probe = lambda path: {'duration': 30.0}
+extract.cut = lambda source, output, start, duration, mode, log: print('cut', start, duration)
+extract.shutil.move = lambda source, output: print('move')
+extract._cut('s.mp4', 'o.mp4', 0, 30, 'exact', print)
+extract._cut('s.mp4', 'o.mp4', 3, 27, 'exact', lambda message: None)")
+    assert_equals "Using downloaded segment directly
+move
+cut 3 27" "$actual" "Core: only a section starting at the clip is used as is"
+}
+
+test_core_probe_timeout() {
+    local actual=$(run_py "
+import subprocess
+from clip_extractor import ExtractionError, media
+def stalled(cmd, **kwargs):
+    raise subprocess.TimeoutExpired(cmd, kwargs['timeout'])
+media.subprocess.run = stalled
+for call in (media.probe, media.keyframes):
+    try:
+        call('s.mp4')
+    except ExtractionError as e:
+        print(e)")
+    assert_equals "ffprobe timed out
+ffprobe timed out" "$actual" "Core: stalled ffprobe raises ExtractionError"
+}
+
+test_core_cut_mode_args() {
+    local actual=$(run_py "
+import os
+from clip_extractor import cutting
+cutting.run_ffmpeg = lambda args: print(' '.join(os.path.basename(str(a)) for a in args))
+cutting.cut('s.mp4', 'o.mp4', 10, 20, 'copy')
+cutting.cut('s.mp4', 'o.mp4', 10, 20, 'exact')")
+    assert_equals "-ss 10 -i s.mp4 -t 20 -map 0:v:0? -map 0:a:0? -c copy -avoid_negative_ts make_zero o.mp4
+-i s.mp4 -ss 10 -t 20 -c:v libx264 -c:a copy -avoid_negative_ts make_zero -fflags +genpts o.mp4" "$actual" "Core: copy and exact cut ffmpeg arguments"
+}
+
+test_core_smart_cut() {
+    local actual=$(run_py "
+import os
+from clip_extractor import cutting
+def run_ffmpeg(args):
+    print(' '.join(os.path.basename(str(a)) for a in args))
+    if 'pieces.txt' in map(os.path.basename, map(str, args)):
+        print(open(args[args.index('-i') + 1]).read().replace(os.path.dirname(str(args[-1])) + '/', ''), end='')
+cutting.run_ffmpeg = run_ffmpeg
+h264 = {'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High', 'pix_fmt': 'yuv420p'}
+cutting.probe = lambda path: {'streams': [h264], 'duration': 120}
+cutting.keyframes = lambda source, start, end: [8, 12, 20, 28, 32]
+print(cutting.cut_smart('s.mp4', 'o.mp4', 10, 20, lambda message: None))
+cutting.keyframes = lambda source, start, end: [8, 20, 32]
+print(cutting.cut_smart('s.mp4', 'o.mp4', 10, 20, print))
+cutting.cut('s.mp4', 'o.mp4', 10, 20, 'smart')
+cutting.keyframes = lambda source, start, end: [8, 12, 20, 28, 32]
+cutting.probe = lambda path: {'streams': [dict(h264, codec_name='vp9')], 'duration': 120}
+print(cutting.cut_smart('s.mp4', 'o.mp4', 10, 20, print))")
+    assert_equals "-ss 10 -i s.mp4 -t 2 -an -c:v libx264 -pix_fmt yuv420p -profile:v high head.mp4
+-ss 12 -i s.mp4 -t 16 -an -c:v copy -avoid_negative_ts make_zero middle.mp4
+-ss 28 -i s.mp4 -t 2 -an -c:v libx264 -pix_fmt yuv420p -profile:v high tail.mp4
+-f concat -safe 0 -i pieces.txt -c copy video.mp4
+file 'head.mp4'
+file 'middle.mp4'
+file 'tail.mp4'
+-i video.mp4 -ss 10 -t 20 -i s.mp4 -map 0:v:0 -map 1:a:0? -c:v copy -c:a aac -shortest o.mp4
+True
+Range spans fewer than two keyframes, re-encoding instead
+False
+-i s.mp4 -ss 10 -t 20 -c:v libx264 -c:a copy -avoid_negative_ts make_zero -fflags +genpts o.mp4
+Smart cut needs an H.264 source, re-encoding instead
+False" "$actual" "Core: smart cut splits at keyframes and falls back to exact"
+}
+
+test_core_parallel_no_audio() {
+    local actual=$(run_py "
+from clip_extractor import cutting
+video = {'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High', 'pix_fmt': 'yuv420p'}
+cutting.probe = lambda path: {'streams': [video], 'duration': 120}
+cutting.keyframes = lambda source, start, end: []
+cutting._run_ffmpeg = lambda args, timeout: print('encode', 'audio' if '-vn' in args else 'video')
+cutting.run_ffmpeg = lambda args: print('join', '-i' in args[6:], '-map' in args)
+cutting.cut_parallel('s.mp4', 'o.mp4', 0, 60, lambda message: None, workers=2)")
+    assert_equals "encode video
+encode video
+join False False" "$actual" "Core: parallel cut of a source without audio skips the audio job"
+}
+
+test_core_parallel_progress() {
+    local actual=$(run_py "
+from clip_extractor import cutting, progress
+video = {'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High', 'pix_fmt': 'yuv420p'}
+cutting.probe = lambda path: {'streams': [video, {'codec_type': 'audio'}], 'duration': 120}
+cutting.keyframes = lambda source, start, end: []
+cutting.run_ffmpeg = lambda args: None
+def encode(args, timeout):
+    report = progress.current()
+    if '-vn' in args:
+        print('audio reporter', report)
+        return
+    for out_time in (10.0, 30.0):
+        report({'source': 'encode', 'out_time': out_time, 'fps': 50.0, 'speed': 2.0,
+                'bytes': 1000, 'done': out_time == 30.0})
+cutting._run_ffmpeg = encode
+events = []
+with progress.reporting(progress.with_fraction(events.append, 60)):
+    cutting.cut_parallel('s.mp4', 'o.mp4', 0, 60, lambda message: None, workers=2)
+last = events[-1]
+print(len(events), last['out_time'], last['fraction'], last['bytes'], last['done'],
+      [e['done'] for e in events].count(True))")
+    assert_equals "audio reporter None
+4 60.0 1.0 2000 True 1" "$actual" "Core: parallel chunks report combined encode progress"
+}
+
+test_core_parse_timed_once() {
+    local actual=$(run_py "
+from clip_extractor import InvalidTimeframeError, extract_clip, metrics
+try:
+    extract_clip('https://youtu.be/AqEN8qOcAcA', '01:00', '00:30')
+except InvalidTimeframeError:
+    pass
+print('clip_extractor_stage_seconds_count{stage=\"parse\"} 1' in metrics.render())")
+    assert_equals "True" "$actual" "Core: extract_clip records one parse observation per job"
+}
+
+test_core_search_catch_up() {
+    local actual=$(run_py "
+import os, tempfile
+from pathlib import Path
+tmp = Path(tempfile.mkdtemp())
+os.environ['CLIP_EXTRACTOR_CACHE_DIR'] = str(tmp)
+from clip_extractor import Transcript, TranscriptCache, search_transcripts
+def fetch(video_id, languages):
+    track = {'language': 'English', 'language_code': 'en', 'is_generated': False}
+    return Transcript.from_entries([(0.0, 4.0, 'cached before the index')], dict(track, available=[track]))
+# Cached without an index hook, like transcripts from before search existed
+TranscriptCache(tmp / 'transcripts', fetch=fetch).get('vid1', ['en'])
+print([hit['video_id'] for hit in search_transcripts('before the index')])")
+    assert_equals "['vid1']" "$actual" "Core: first search indexes transcripts cached earlier"
+}
+
+# Test 5: Web API routes (need Flask)
+test_web_thumbnail_route() {
+    local actual=$(run_py "
+import os, tempfile
+tmp = tempfile.mkdtemp()
+os.environ.update(HOME=tmp, CLIP_EXTRACTOR_CACHE_DIR=os.path.join(tmp, 'cache'))
+os.makedirs(os.path.join(tmp, 'Downloads'))
+from clip_extractor.thumbnails import get_thumbnail_cache
+get_thumbnail_cache().path_for('dQw4w9WgXcQ', (480, 360)).write_bytes(b'jpeg')
+from web_gui import app
+client = app.test_client()
+response = client.get('/api/thumbnail/dQw4w9WgXcQ')
+print(response.status_code, bool(response.headers.get('ETag')), response.headers.get('Cache-Control'))
+print(client.get('/api/thumbnail/not-an-id').status_code)")
+    assert_equals "200 True public, max-age=604800
+400" "$actual" "Web: /api/thumbnail serves a bare video ID with cache headers"
+}
+
+# Test 6: Check dependencies
 echo ""
 echo "Test Suite: Dependencies"
 echo "------------------------"
@@ -176,6 +728,48 @@ else
     echo -e "${YELLOW}⊘${NC} Skipping timeframe validation tests (script not yet implemented)"
 fi
 
+if [ -d "$SCRIPT_DIR/clip_extractor" ]; then
+    test_core_video_id
+    test_core_timeframe
+    test_core_timeframe_backwards
+    test_core_metadata_cache
+    test_core_job_queue
+    test_core_merge_ranges
+    test_core_source_cache
+    test_core_interval_cover
+    test_core_transcript_window
+    test_core_choose_track
+    test_core_caption_parser
+    test_core_transcript_search
+    test_core_shared_download
+    test_core_progress_events
+    test_core_stage_metrics
+    test_core_thumbnail_cache
+    test_core_chunk_bounds
+    test_core_stream_clip
+    test_core_select_format
+    test_core_audio_format
+    test_core_renditions
+    test_core_reel_normalize
+    test_core_shared_job_store
+    test_core_cut_passthrough
+    test_core_probe_timeout
+    test_core_cut_mode_args
+    test_core_smart_cut
+    test_core_parallel_no_audio
+    test_core_parallel_progress
+    test_core_parse_timed_once
+    test_core_search_catch_up
+else
+    echo -e "${YELLOW}⊘${NC} Skipping core library tests (package not yet implemented)"
+fi
+
+if PYTHONPATH="$SCRIPT_DIR" python3 -c "import flask" 2>/dev/null; then
+    test_web_thumbnail_route
+else
+    echo -e "${YELLOW}⊘${NC} Skipping web API tests (Flask not installed)"
+fi
+
 test_yt_dlp_installed
 test_ffmpeg_installed
 
@@ -4,19 +4,62 @@ YouTube Clip Extractor - Web GUI
 Simple web interface for extracting YouTube clips
 """
 
-from flask import Flask, render_template_string, request, jsonify, send_file
-import subprocess
+from flask import Flask, Response, render_template_string, request, jsonify, send_file, stream_with_context
 import os
 import json
+import logging
 from pathlib import Path
 import threading
 import time
 
+from clip_extractor import (
+    ClipExtractorError,
+    JobQueue,
+    QueueFullError,
+    check_mode,
+    extract_batch,
+    extract_clip as run_extraction,
+    extract_reel,
+    get_metadata,
+    get_thumbnail,
+    get_transcript as load_transcript,
+    metrics,
+    parse_quality,
+    parse_renditions,
+    parse_timeframe,
+    parse_video_id,
+    search_transcripts,
+    time_to_seconds,
+)
+from clip_extractor.audio import AUDIO_FORMATS
+from clip_extractor.shared_state import get_shared_state
+from clip_extractor.thumbnails import etag as thumbnail_etag
+from clip_extractor.video_id import check_video_id
+
 app = Flask(__name__)
 
-SCRIPT_DIR = Path(__file__).parent / "scripts"
 DOWNLOAD_DIR = Path.home() / "Downloads" / "youtube_clips"
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Default /api/thumbnail size and how long browsers may reuse it
+THUMBNAIL_SIZE = (480, 360)
+THUMBNAIL_MAX_AGE = 7 * 24 * 3600
+
+# Job status, thumbnail URLs and cache leases shared with the other worker
+# processes when served by serve.py; None for a single process
+shared_state = get_shared_state()
+
+# Original thumbnail URL per video, from /api/load_video
+thumbnail_sources = {}
+
+# Clip file types /api/extract_clip writes; anything else gets .mp4 appended
+OUTPUT_SUFFIXES = ('.mp4',) + tuple(f'.{fmt}' for fmt in AUDIO_FORMATS)
+
+# Seconds between keepalive comments on idle job event streams
+SSE_KEEPALIVE = 15
+
+# Extractions run here so request threads return immediately
+jobs = JobQueue(store=shared_state)
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -63,7 +106,7 @@ HTML_TEMPLATE = """
             font-weight: 600;
             font-size: 14px;
         }
-        input[type="text"], input[type="url"] {
+        input[type="text"], input[type="url"], select {
             width: 100%;
             padding: 12px 15px;
             border: 2px solid #e0e0e0;
@@ -164,6 +207,10 @@ HTML_TEMPLATE = """
             background: linear-gradient(90deg, #667eea, #764ba2);
             animation: progress 2s ease-in-out infinite;
         }
+        .progress-bar-fill.determinate {
+            animation: none;
+            transition: width 0.3s;
+        }
         @keyframes progress {
             0% { width: 0%; }
             50% { width: 100%; }
@@ -223,6 +270,40 @@ HTML_TEMPLATE = """
                 <p class="hint">File will be saved to: ~/Downloads/youtube_clips/</p>
             </div>
 
+            <div class="form-group">
+                <label for="outputFormat">Output</label>
+                <select id="outputFormat">
+                    <option value="mp4">Video (MP4)</option>
+                    <option value="m4a">Audio only (M4A)</option>
+                    <option value="mp3">Audio only (MP3)</option>
+                    <option value="opus">Audio only (Opus)</option>
+                </select>
+                <p class="hint">Audio-only clips download just the audio stream</p>
+            </div>
+
+            <div class="form-group">
+                <label for="cutMode">Cut Mode</label>
+                <select id="cutMode">
+                    <option value="exact">Exact - re-encode whole clip (slowest, frame accurate)</option>
+                    <option value="smart">Smart - re-encode only the edges (fast, frame accurate)</option>
+                    <option value="parallel">Parallel - re-encode in chunks on every core (long clips, frame accurate)</option>
+                    <option value="copy">Copy - stream copy (instant, starts at nearest keyframe)</option>
+                </select>
+            </div>
+
+            <div class="form-group">
+                <label for="quality">Quality</label>
+                <select id="quality">
+                    <option value="">Server default</option>
+                    <option value="best">Best available</option>
+                    <option value="1080p">Up to 1080p</option>
+                    <option value="720p">Up to 720p</option>
+                    <option value="480p">Up to 480p</option>
+                    <option value="audio">Audio only</option>
+                </select>
+                <p class="hint">Downloads the cheapest stream that meets the limit</p>
+            </div>
+
             <div class="progress-bar" id="progressBar">
                 <div class="progress-bar-fill"></div>
             </div>
@@ -317,7 +398,8 @@ HTML_TEMPLATE = """
                     });
 
                     document.getElementById('transcriptPreview').style.display = 'block';
-                    showStatus('Transcript loaded - Click timestamps to jump!', 'success');
+                    const track = data.language ? ` (${data.language}${data.isGenerated ? ', auto-generated' : ''})` : '';
+                    showStatus('Transcript loaded' + track + ' - Click timestamps to jump!', 'success');
                 } else {
                     document.getElementById('transcriptText').textContent = 'Transcript not available: ' + (data.error || 'Unknown error');
                     document.getElementById('transcriptPreview').style.display = 'block';
@@ -364,6 +446,7 @@ HTML_TEMPLATE = """
 
                     // Set filename suggestion
                     document.getElementById('filename').value = data.filename;
+                    applyOutputFormat();
 
                     showStatus('Video loaded successfully!', 'success');
                 } else {
@@ -381,6 +464,8 @@ HTML_TEMPLATE = """
             const startTime = document.getElementById('startTime').value;
             const endTime = document.getElementById('endTime').value;
             const filename = document.getElementById('filename').value;
+            const mode = document.getElementById('cutMode').value;
+            const quality = document.getElementById('quality').value;
 
             document.getElementById('downloadBtn').disabled = true;
             document.getElementById('progressBar').classList.add('active');
@@ -390,15 +475,21 @@ HTML_TEMPLATE = """
                 const response = await fetch('/api/extract_clip', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ url, startTime, endTime, filename })
+                    body: JSON.stringify({ url, startTime, endTime, filename, mode, quality })
                 });
 
                 const data = await response.json();
 
-                if (data.success) {
-                    showStatus(`✅ Success! Clip saved to: ${data.output_path}`, 'success');
-                } else {
+                if (!data.success) {
                     showStatus('Error: ' + data.error, 'error');
+                    return;
+                }
+
+                const job = await waitForJob(data.jobId);
+                if (job.state === 'done') {
+                    showStatus(`✅ Success! Clip saved to: ${job.output_path}`, 'success');
+                } else {
+                    showStatus('Error: ' + job.error, 'error');
                 }
             } catch (error) {
                 showStatus('Error: ' + error, 'error');
@@ -408,6 +499,84 @@ HTML_TEMPLATE = """
             }
         });
 
+        function formatTransfer(transfer) {
+            if (!transfer) return '';
+            const parts = [];
+            if (transfer.source === 'download') {
+                if (transfer.bytes != null) parts.push((transfer.bytes / 1048576).toFixed(1) + ' MB');
+                if (transfer.total) parts.push('of ' + (transfer.total / 1048576).toFixed(1) + ' MB');
+                if (transfer.speed) parts.push('@ ' + (transfer.speed / 1048576).toFixed(1) + ' MB/s');
+            } else {
+                if (transfer.out_time != null) parts.push(transfer.out_time.toFixed(1) + 's');
+                if (transfer.fps) parts.push(transfer.fps.toFixed(0) + ' fps');
+                if (transfer.speed) parts.push(transfer.speed.toFixed(1) + 'x');
+            }
+            return parts.length ? ' (' + parts.join(' ') + ')' : '';
+        }
+
+        function showJobProgress(job) {
+            const fill = document.querySelector('#progressBar .progress-bar-fill');
+            fill.classList.add('determinate');
+            fill.style.width = Math.round(job.progress * 100) + '%';
+            showStatus(`Downloading and extracting clip... ${job.stage}${formatTransfer(job.transfer)}`, 'loading');
+        }
+
+        function resetProgress() {
+            const fill = document.querySelector('#progressBar .progress-bar-fill');
+            fill.classList.remove('determinate');
+            fill.style.width = '';
+        }
+
+        function waitForJob(jobId) {
+            // Live updates over Server-Sent Events, polling if unavailable
+            if (!window.EventSource) return pollJob(jobId);
+            return new Promise(resolve => {
+                const events = new EventSource('/api/jobs/' + jobId + '/events');
+                events.onmessage = event => {
+                    const job = JSON.parse(event.data);
+                    if (job.state === 'done' || job.state === 'failed') {
+                        events.close();
+                        resetProgress();
+                        resolve(job);
+                    } else {
+                        showJobProgress(job);
+                    }
+                };
+                events.onerror = () => {
+                    events.close();
+                    resolve(pollJob(jobId));
+                };
+            });
+        }
+
+        async function pollJob(jobId) {
+            // Poll job status until it finishes
+            while (true) {
+                const response = await fetch('/api/jobs/' + jobId);
+                const job = await response.json();
+                if (!job.success) {
+                    resetProgress();
+                    return { state: 'failed', error: job.error };
+                }
+                if (job.state === 'done' || job.state === 'failed') {
+                    resetProgress();
+                    return job;
+                }
+                showJobProgress(job);
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        }
+
+        // Keep the filename's extension in line with the output format
+        function applyOutputFormat() {
+            const input = document.getElementById('filename');
+            const ext = document.getElementById('outputFormat').value;
+            const base = input.value.replace(/\.(mp4|m4a|mp3|opus)$/i, '');
+            input.value = (base || 'clip') + '.' + ext;
+        }
+
+        document.getElementById('outputFormat').addEventListener('change', applyOutputFormat);
+
         function showStatus(message, type) {
             const status = document.getElementById('status');
             status.textContent = message;
@@ -429,28 +598,18 @@ def load_video():
 
     try:
         # Extract video ID
-        result = subprocess.run(
-            [str(SCRIPT_DIR / "parse_video_id.sh"), url],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        video_id = result.stdout.strip()
-
-        # Fetch video info
-        result = subprocess.run(
-            ["yt-dlp", "--dump-json", "--no-warnings", f"https://www.youtube.com/watch?v={video_id}"],
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=30
-        )
-
-        video_info = json.loads(result.stdout)
+        video_id = parse_video_id(url)
+
+        # Fetch video info (cached, shared between concurrent loads)
+        video_info = get_metadata(video_id)
 
         # Extract info
         title = video_info.get('title', 'Unknown')
         thumbnail = video_info.get('thumbnail', '')
+        # Remembered so /api/thumbnail can resize this exact image
+        thumbnail_sources[video_id] = thumbnail
+        if shared_state is not None:
+            shared_state.put('thumbnail_source', video_id, thumbnail)
         duration = video_info.get('duration', 0)
         uploader = video_info.get('uploader', 'Unknown')
 
@@ -462,7 +621,8 @@ def load_video():
             'success': True,
             'videoId': video_id,
             'title': title,
-            'thumbnail': thumbnail,
+            'thumbnail': f'/api/thumbnail/{video_id}',
+            'thumbnailSource': thumbnail,
             'duration': duration_str,
             'uploader': uploader,
             'filename': filename
@@ -474,12 +634,43 @@ def load_video():
             'error': str(e)
         })
 
+@app.route('/api/thumbnail/<video_id>')
+def thumbnail(video_id):
+    try:
+        # The path holds a bare ID, not a URL
+        video_id = check_video_id(video_id)
+        width = int(request.args.get('w', THUMBNAIL_SIZE[0]))
+        height = int(request.args.get('h', THUMBNAIL_SIZE[1]))
+    except (ClipExtractorError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    try:
+        # Resized once, then served from the local disk cache
+        source = thumbnail_sources.get(video_id)
+        if source is None and shared_state is not None:
+            source = shared_state.get('thumbnail_source', video_id)
+        path = get_thumbnail(video_id, (width, height), source)
+    except ClipExtractorError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 502
+
+    response = send_file(path, mimetype='image/jpeg', conditional=True,
+                         etag=thumbnail_etag(path), max_age=THUMBNAIL_MAX_AGE)
+    response.cache_control.public = True
+    return response
+
 @app.route('/api/get_transcript', methods=['POST'])
 def get_transcript():
     data = request.json
     video_id = data.get('videoId', '')
     start_time = data.get('startTime', '')
     end_time = data.get('endTime', '')
+    languages = data.get('languages') or None
 
     if not video_id or not start_time or not end_time:
         return jsonify({
@@ -488,32 +679,17 @@ def get_transcript():
         })
 
     try:
-        # Run transcript extraction
-        result = subprocess.run(
-            [
-                "python3",
-                str(SCRIPT_DIR / "get_transcript_segment.py"),
-                video_id,
-                start_time,
-                end_time
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode == 0:
-            transcript = result.stdout.strip()
-            return jsonify({
-                'success': True,
-                'transcript': transcript if transcript else 'No transcript available in this timeframe'
-            })
-        else:
-            error_msg = result.stderr.strip() if result.stderr else 'No transcript available'
-            return jsonify({
-                'success': False,
-                'error': error_msg
-            })
+        # Cached transcript, windowed by binary search
+        fetched = load_transcript(video_id, languages)
+        segments = fetched.window(time_to_seconds(start_time), time_to_seconds(end_time))
+        transcript = '\n'.join(f"[{seg['time']}] {seg['text']}" for seg in segments)
+        return jsonify({
+            'success': True,
+            'transcript': transcript if transcript else 'No transcript available in this timeframe',
+            'language': fetched.meta.get('language'),
+            'languageCode': fetched.meta.get('language_code'),
+            'isGenerated': fetched.meta.get('is_generated')
+        })
 
     except Exception as e:
         return jsonify({
@@ -521,6 +697,38 @@ def get_transcript():
             'error': str(e)
         })
 
+@app.route('/api/search')
+def search():
+    phrase = request.args.get('q', '').strip()
+    if not phrase:
+        return jsonify({
+            'success': False,
+            'error': 'Missing search phrase'
+        }), 400
+
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+    except ValueError:
+        limit = 20
+
+    # Candidate timeframes from the inverted index over cached transcripts
+    results = search_transcripts(phrase, limit)
+    return jsonify({
+        'success': True,
+        'query': phrase,
+        'results': [
+            {
+                'videoId': hit['video_id'],
+                'language': hit['language'],
+                'start': hit['start'],
+                'end': hit['end'],
+                'timeframe': hit['timeframe'],
+                'text': hit['text']
+            }
+            for hit in results
+        ]
+    })
+
 @app.route('/api/extract_clip', methods=['POST'])
 def extract_clip():
     data = request.json
@@ -528,45 +736,234 @@ def extract_clip():
     start_time = data.get('startTime', '')
     end_time = data.get('endTime', '')
     filename = data.get('filename', 'clip.mp4')
+    mode = data.get('mode') or None
+    quality = data.get('quality') or None
+    renditions = data.get('renditions') or None
+    stream = data.get('stream')
 
-    if not filename.endswith('.mp4'):
+    if Path(filename).suffix.lower() not in OUTPUT_SUFFIXES:
         filename += '.mp4'
 
     output_path = DOWNLOAD_DIR / filename
-    timeframe = f"{start_time}-{end_time}"
 
     try:
-        # Run extraction
-        result = subprocess.run(
-            [
-                str(SCRIPT_DIR / "extract_clip.sh"),
-                url,
-                timeframe,
-                str(output_path)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=300,
-            check=True
-        )
-
+        # Reject bad input synchronously, before queueing
+        parse_video_id(url)
+        parse_timeframe(f"{start_time}-{end_time}")
+        if mode:
+            check_mode(mode)
+        parse_quality(quality)
+        if renditions:
+            parse_renditions(renditions)
+    except ClipExtractorError as e:
         return jsonify({
-            'success': True,
+            'success': False,
+            'error': str(e)
+        })
+
+    def run(job):
+        return run_extraction(url, start_time, end_time, {
+            'output': output_path,
+            'mode': mode,
+            'quality': quality,
+            'renditions': renditions,
+            'stream': stream,
+            'on_stage': job.on_stage,
+            'on_progress': job.on_progress
+        })
+
+    try:
+        job = jobs.submit('extract_clip', run, {
+            'url': url,
+            'startTime': start_time,
+            'endTime': end_time,
+            'mode': mode,
+            'quality': quality,
+            'renditions': renditions,
+            'stream': stream,
             'output_path': str(output_path)
         })
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
 
-    except subprocess.CalledProcessError as e:
+    return jsonify({
+        'success': True,
+        'jobId': job.id,
+        'statusUrl': f'/api/jobs/{job.id}',
+        'output_path': str(output_path)
+    }), 202
+
+@app.route('/api/extract_batch', methods=['POST'])
+def extract_batch_clips():
+    data = request.json
+    url = data.get('url', '')
+    timeframes = data.get('timeframes', [])
+    prefix = data.get('prefix', 'clip')
+    mode = data.get('mode') or None
+    quality = data.get('quality') or None
+
+    # Accept ["06:13-06:30", ...] or [{"startTime": ..., "endTime": ...}, ...]
+    timeframes = [
+        tf if isinstance(tf, str) else f"{tf.get('startTime', '')}-{tf.get('endTime', '')}"
+        for tf in timeframes
+    ]
+
+    try:
+        parse_video_id(url)
+        if not timeframes:
+            raise ClipExtractorError('No timeframes given')
+        for timeframe in timeframes:
+            parse_timeframe(timeframe)
+        if mode:
+            check_mode(mode)
+        parse_quality(quality)
+    except ClipExtractorError as e:
         return jsonify({
             'success': False,
-            'error': e.stderr or str(e)
+            'error': str(e)
         })
-    except Exception as e:
+
+    def run(job):
+        return extract_batch(url, timeframes, {
+            'output_dir': DOWNLOAD_DIR,
+            'prefix': prefix,
+            'mode': mode,
+            'quality': quality,
+            'on_stage': job.on_stage,
+            'on_progress': job.on_progress
+        })
+
+    try:
+        job = jobs.submit('extract_batch', run, {
+            'url': url,
+            'timeframes': timeframes
+        })
+    except QueueFullError as e:
         return jsonify({
             'success': False,
             'error': str(e)
+        }), 503
+
+    return jsonify({
+        'success': True,
+        'jobId': job.id,
+        'statusUrl': f'/api/jobs/{job.id}'
+    }), 202
+
+@app.route('/api/extract_reel', methods=['POST'])
+def extract_reel_clips():
+    data = request.json
+    clips = data.get('clips', [])
+    filename = data.get('filename', 'reel.mp4')
+    mode = data.get('mode') or None
+    quality = data.get('quality') or None
+
+    if not filename.endswith('.mp4'):
+        filename += '.mp4'
+
+    output_path = DOWNLOAD_DIR / filename
+
+    # Accept [{url, timeframe}, ...] or [{url, startTime, endTime}, ...]
+    clips = [
+        (clip.get('url', ''),
+         clip.get('timeframe') or f"{clip.get('startTime', '')}-{clip.get('endTime', '')}")
+        for clip in clips
+    ]
+
+    try:
+        if not clips:
+            raise ClipExtractorError('No clips given')
+        for url, timeframe in clips:
+            parse_video_id(url)
+            parse_timeframe(timeframe)
+        if mode:
+            check_mode(mode)
+        parse_quality(quality)
+    except ClipExtractorError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+    def run(job):
+        return extract_reel(clips, {
+            'output': output_path,
+            'mode': mode,
+            'quality': quality,
+            'on_stage': job.on_stage,
+            'on_progress': job.on_progress
         })
 
+    try:
+        job = jobs.submit('extract_reel', run, {
+            'clips': [{'url': url, 'timeframe': timeframe} for url, timeframe in clips],
+            'output_path': str(output_path)
+        })
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+
+    return jsonify({
+        'success': True,
+        'jobId': job.id,
+        'statusUrl': f'/api/jobs/{job.id}',
+        'output_path': str(output_path)
+    }), 202
+
+@app.route('/metrics')
+def prometheus_metrics():
+    # Per-stage timing histograms and cache hit/miss counters
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    # Any worker process can answer: jobs of the others come from the shared store
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job ID'
+        }), 404
+
+    return jsonify({'success': True, **status})
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    if jobs.status(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job ID'
+        }), 404
+
+    def stream():
+        # One event per change (stage, yt-dlp/ffmpeg progress, state) until
+        # the job finishes; comments keep idle connections open
+        version = -1
+        while True:
+            status = jobs.wait(job_id, version, timeout=SSE_KEEPALIVE)
+            if status is None:
+                return
+            if status['version'] == version:
+                yield ": keepalive\n\n"
+                continue
+            version = status['version']
+            yield f"data: {json.dumps({'success': True, **status})}\n\n"
+            if status['state'] in ('done', 'failed'):
+                return
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 if __name__ == '__main__':
+    # One JSON summary line per finished job
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("\n" + "="*50)
     print("🎬 YouTube Clip Extractor - Web GUI")
     print("="*50)
@@ -9,18 +9,37 @@ from tkinter import ttk, filedialog, messagebox
 import subprocess
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
 from urllib.parse import urlparse, parse_qs
 from PIL import Image, ImageTk
-import requests
-from io import BytesIO
+
+from clip_extractor import (
+    ClipExtractorError,
+    DownloadError,
+    Job,
+    extract_clip,
+    get_metadata,
+    get_thumbnail,
+    parse_timeframe,
+    parse_video_id,
+)
+from clip_extractor.audio import AUDIO_FORMATS
+
+# Wait this long after the last keystroke/paste before loading a URL
+URL_DEBOUNCE_MS = 400
+
+THUMBNAIL_SIZE = (600, 340)
+
+# Output file types; the audio ones extract only the audio stream
+OUTPUT_FORMATS = ('mp4',) + tuple(AUDIO_FORMATS)
+
 
 class YouTubeClipExtractorGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("YouTube Clip Extractor")
-        self.root.geometry("700x650")
+        self.root.geometry("700x720")
         self.root.resizable(False, False)
 
         # Set app icon if available
@@ -36,7 +55,25 @@ class YouTubeClipExtractorGUI:
         self.video_id = None
         self.video_info = {}
 
+        # Job whose progress the bar is showing
+        self.job = None
+
+        # Metadata/thumbnail loads run off the Tk thread; only the newest
+        # load (by generation) may touch the UI
+        self._loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gui-load")
+        self._load_generation = 0
+        self._load_future = None
+        self._loading_video_id = None
+        self._debounce_id = None
+
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Drop pending loads so closing the window never waits on them"""
+        self._load_generation += 1
+        self._loader.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
     def setup_ui(self):
         """Setup the user interface"""
@@ -60,8 +97,10 @@ class YouTubeClipExtractorGUI:
 
         self.url_entry = ttk.Entry(url_frame, width=60, font=("Helvetica", 11))
         self.url_entry.grid(row=0, column=0, padx=(0, 10), sticky=(tk.W, tk.E))
-        self.url_entry.bind("<FocusOut>", lambda e: self.fetch_thumbnail())
+        self.url_entry.bind("<FocusOut>", lambda e: self.fetch_thumbnail(quiet=True))
         self.url_entry.bind("<Return>", lambda e: self.fetch_thumbnail())
+        self.url_entry.bind("<KeyRelease>", self._schedule_fetch)
+        self.url_entry.bind("<<Paste>>", self._schedule_fetch)
 
         self.load_btn = ttk.Button(
             url_frame,
@@ -146,13 +185,23 @@ class YouTubeClipExtractorGUI:
         self.filename_entry.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
         self.filename_entry.insert(0, "clip.mp4")
 
+        # Output format
+        format_label = ttk.Label(dir_frame, text="Output (m4a/mp3/opus = audio only):")
+        format_label.grid(row=3, column=0, sticky=tk.W, pady=(10, 0))
+
+        self.format_combo = ttk.Combobox(dir_frame, values=OUTPUT_FORMATS, state='readonly', width=8)
+        self.format_combo.grid(row=4, column=0, sticky=tk.W, pady=(5, 0))
+        self.format_combo.set(OUTPUT_FORMATS[0])
+        self.format_combo.bind("<<ComboboxSelected>>", lambda event: self._apply_output_format())
+
         # Progress Section
         progress_frame = ttk.Frame(main_frame)
         progress_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
 
         self.progress = ttk.Progressbar(
             progress_frame,
-            mode='indeterminate',
+            mode='determinate',
+            maximum=1.0,
             length=600
         )
         self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
@@ -189,91 +238,137 @@ class YouTubeClipExtractorGUI:
     def extract_video_id(self, url):
         """Extract video ID from YouTube URL"""
         try:
-            result = subprocess.run(
-                [str(self.script_dir / "parse_video_id.sh"), url],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError:
+            return parse_video_id(url)
+        except ClipExtractorError:
             return None
 
-    def fetch_thumbnail(self):
-        """Fetch video thumbnail and metadata"""
+    def _schedule_fetch(self, event=None):
+        """Debounce URL edits: load once typing/pasting pauses"""
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+        self._debounce_id = self.root.after(URL_DEBOUNCE_MS, self._debounced_fetch)
+
+    def _debounced_fetch(self):
+        self._debounce_id = None
+        self.fetch_thumbnail(quiet=True)
+
+    def fetch_thumbnail(self, quiet=False):
+        """Start loading video metadata and thumbnail in the background
+
+        quiet loads (debounced typing, focus changes) ignore incomplete
+        URLs and report errors in the status line instead of a dialog.
+        """
         url = self.url_entry.get().strip()
 
         if not url:
             return
 
-        self.status_label.config(text="Loading video information...")
-        self.root.update()
-
         # Extract video ID
         video_id = self.extract_video_id(url)
 
         if not video_id:
-            messagebox.showerror("Error", "Invalid YouTube URL")
-            self.status_label.config(text="Error: Invalid URL")
+            if not quiet:
+                messagebox.showerror("Error", "Invalid YouTube URL")
+                self.status_label.config(text="Error: Invalid URL")
             return
 
-        self.video_id = video_id
+        if quiet and video_id in (self._loading_video_id, self.video_id):
+            return
+
+        # Supersede any load still queued or running for an older URL
+        self._load_generation += 1
+        generation = self._load_generation
+        if self._load_future is not None:
+            self._load_future.cancel()
+        self._loading_video_id = video_id
+        self.status_label.config(text="Loading video information...")
+
+        self._load_future = self._loader.submit(self._load_video, generation, video_id, quiet)
+
+    def _is_current(self, generation):
+        return generation == self._load_generation
 
-        # Fetch video info using yt-dlp
+    def _load_video(self, generation, video_id, quiet):
+        """Worker thread: fetch metadata and a resized thumbnail"""
         try:
-            result = subprocess.run(
-                ["yt-dlp", "--dump-json", "--no-warnings", f"https://www.youtube.com/watch?v={video_id}"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30
-            )
-
-            self.video_info = json.loads(result.stdout)
-
-            # Get thumbnail URL
-            thumbnail_url = self.video_info.get('thumbnail')
-
-            if thumbnail_url:
-                # Download and display thumbnail
-                response = requests.get(thumbnail_url, timeout=10)
-                img_data = response.content
-                img = Image.open(BytesIO(img_data))
-
-                # Resize to fit
-                img.thumbnail((600, 340), Image.Resampling.LANCZOS)
-
-                # Convert to PhotoImage
-                photo = ImageTk.PhotoImage(img)
-                self.thumbnail_label.config(image=photo, text="")
-                self.thumbnail_label.image = photo  # Keep a reference
-
-            # Display video info
-            title = self.video_info.get('title', 'Unknown')
-            duration = self.video_info.get('duration', 0)
-            uploader = self.video_info.get('uploader', 'Unknown')
-
-            duration_str = f"{int(duration // 60)}:{int(duration % 60):02d}"
-
-            info_text = f"📹 {title}\n👤 {uploader}  |  ⏱ {duration_str}"
-            self.info_label.config(text=info_text)
-
-            # Update filename suggestion
-            safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_'))[:50]
-            self.filename_entry.delete(0, tk.END)
-            self.filename_entry.insert(0, f"{safe_title}.mp4")
-
-            self.status_label.config(text="✓ Video loaded successfully")
-
-        except subprocess.TimeoutExpired:
-            messagebox.showerror("Error", "Request timed out. Please try again.")
-            self.status_label.config(text="Error: Timeout")
-        except subprocess.CalledProcessError:
-            messagebox.showerror("Error", "Failed to fetch video information")
-            self.status_label.config(text="Error: Failed to fetch info")
+            # Fetch video info using yt-dlp (cached)
+            info = get_metadata(video_id)
+
+            image = None
+            thumbnail_url = info.get('thumbnail')
+            if thumbnail_url and self._is_current(generation):
+                # Pooled download, resized once and cached on disk; only
+                # the PhotoImage has to be created on the Tk thread
+                path = get_thumbnail(video_id, THUMBNAIL_SIZE, thumbnail_url)
+                image = Image.open(path)
+                image.load()
+
+            self._marshal(self._show_video, generation, video_id, info, image)
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-            self.status_label.config(text="Error")
+            self._marshal(self._show_load_error, generation, e, quiet)
+
+    def _marshal(self, callback, generation, *args):
+        """Hand a worker result to the Tk thread (unless already stale)"""
+        if not self._is_current(generation):
+            return
+        try:
+            self.root.after(0, callback, generation, *args)
+        except RuntimeError:
+            pass  # window closed while loading
+
+    def _show_video(self, generation, video_id, info, image):
+        """Tk thread: display a finished load unless a newer one started"""
+        if not self._is_current(generation):
+            return
+        self._loading_video_id = None
+        self.video_id = video_id
+        self.video_info = info
+
+        if image is not None:
+            # Convert to PhotoImage
+            photo = ImageTk.PhotoImage(image)
+            self.thumbnail_label.config(image=photo, text="")
+            self.thumbnail_label.image = photo  # Keep a reference
+
+        # Display video info
+        title = info.get('title', 'Unknown')
+        duration = info.get('duration', 0)
+        uploader = info.get('uploader', 'Unknown')
+
+        duration_str = f"{int(duration // 60)}:{int(duration % 60):02d}"
+
+        info_text = f"📹 {title}\n👤 {uploader}  |  ⏱ {duration_str}"
+        self.info_label.config(text=info_text)
+
+        # Update filename suggestion
+        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_'))[:50]
+        self.filename_entry.delete(0, tk.END)
+        self.filename_entry.insert(0, f"{safe_title}.{self.format_combo.get()}")
+
+        self.status_label.config(text="✓ Video loaded successfully")
+
+    def _show_load_error(self, generation, error, quiet):
+        if not self._is_current(generation):
+            return
+        self._loading_video_id = None
+        if isinstance(error, DownloadError):
+            message, status = str(error), "Error: Failed to fetch info"
+        else:
+            message, status = f"An error occurred: {error}", "Error"
+        if quiet:
+            self.status_label.config(text=f"{status} ({error})")
+        else:
+            messagebox.showerror("Error", message)
+            self.status_label.config(text=status)
+
+    def _apply_output_format(self):
+        """Give the filename the extension of the selected output format"""
+        filename = self.filename_entry.get().strip()
+        stem, ext = os.path.splitext(filename)
+        if ext.lower().lstrip('.') not in OUTPUT_FORMATS:
+            stem = filename
+        self.filename_entry.delete(0, tk.END)
+        self.filename_entry.insert(0, f"{stem or 'clip'}.{self.format_combo.get()}")
 
     def validate_inputs(self):
         """Validate all inputs before download"""
@@ -294,21 +389,14 @@ class YouTubeClipExtractorGUI:
             messagebox.showerror("Error", "Please enter a filename")
             return False
 
-        if not filename.endswith('.mp4'):
-            filename += '.mp4'
-            self.filename_entry.delete(0, tk.END)
-            self.filename_entry.insert(0, filename)
+        self._apply_output_format()
 
         # Validate timeframe
         timeframe = f"{start_time}-{end_time}"
         try:
-            subprocess.run(
-                [str(self.script_dir / "validate_timeframe.sh"), timeframe],
-                capture_output=True,
-                check=True
-            )
-        except subprocess.CalledProcessError:
-            messagebox.showerror("Error", "Invalid timeframe format. Use MM:SS or HH:MM:SS")
+            parse_timeframe(timeframe)
+        except ClipExtractorError as e:
+            messagebox.showerror("Error", f"Invalid timeframe format. Use MM:SS or HH:MM:SS\n\n{e}")
             return False
 
         return True
@@ -320,13 +408,49 @@ class YouTubeClipExtractorGUI:
 
         # Disable download button
         self.download_btn.config(state=tk.DISABLED)
-        self.progress.start(10)
+        self.progress['value'] = 0
         self.status_label.config(text="Downloading and extracting clip...")
 
+        # Same stage/progress feed the web GUI streams over SSE
+        self.job = Job('extract_clip')
+
         # Run download in separate thread
         thread = threading.Thread(target=self._download_thread)
         thread.daemon = True
         thread.start()
+        self._poll_progress(self.job, -1)
+
+    def _poll_progress(self, job, version):
+        """Mirror the job's progress on the Tk thread until it finishes"""
+        if job is not self.job:
+            return
+        if job.version != version:
+            version = job.version
+            status = job.to_dict()
+            self.progress['value'] = status['progress']
+            self.status_label.config(text=status['stage'] + self._format_transfer(status['transfer']))
+        self.root.after(200, self._poll_progress, job, version)
+
+    @staticmethod
+    def _format_transfer(transfer):
+        if not transfer:
+            return ""
+        parts = []
+        if transfer['source'] == 'download':
+            if transfer['bytes'] is not None:
+                parts.append(f"{transfer['bytes'] / 1048576:.1f} MB")
+            if transfer['total']:
+                parts.append(f"of {transfer['total'] / 1048576:.1f} MB")
+            if transfer['speed']:
+                parts.append(f"@ {transfer['speed'] / 1048576:.1f} MB/s")
+        else:
+            if transfer['out_time'] is not None:
+                parts.append(f"{transfer['out_time']:.1f}s")
+            if transfer['fps']:
+                parts.append(f"{transfer['fps']:.0f} fps")
+            if transfer['speed']:
+                parts.append(f"{transfer['speed']:.1f}x")
+        return f" ({' '.join(parts)})" if parts else ""
 
     def _download_thread(self):
         """Background thread for downloading"""
@@ -334,37 +458,25 @@ class YouTubeClipExtractorGUI:
             url = self.url_entry.get().strip()
             start_time = self.start_entry.get().strip()
             end_time = self.end_entry.get().strip()
-            timeframe = f"{start_time}-{end_time}"
             filename = self.filename_entry.get().strip()
             output_path = os.path.join(self.download_dir, filename)
 
-            # Run extraction script
-            result = subprocess.run(
-                [
-                    str(self.script_dir / "extract_clip.sh"),
-                    url,
-                    timeframe,
-                    output_path
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-
-            if result.returncode == 0:
-                self.root.after(0, self._download_success, output_path)
-            else:
-                error_msg = result.stderr or "Unknown error occurred"
-                self.root.after(0, self._download_error, error_msg)
-
-        except subprocess.TimeoutExpired:
-            self.root.after(0, self._download_error, "Download timed out")
+            # Run extraction in-process
+            extract_clip(url, start_time, end_time, {
+                'output': output_path,
+                'on_stage': self.job.on_stage,
+                'on_progress': self.job.on_progress,
+            })
+
+            self.root.after(0, self._download_success, output_path)
+
         except Exception as e:
             self.root.after(0, self._download_error, str(e))
 
     def _download_success(self, output_path):
         """Handle successful download"""
-        self.progress.stop()
+        self.job = None
+        self.progress['value'] = 1.0
         self.download_btn.config(state=tk.NORMAL)
         self.status_label.config(text="✓ Clip downloaded successfully!")
 
@@ -387,7 +499,8 @@ class YouTubeClipExtractorGUI:
 
     def _download_error(self, error_msg):
         """Handle download error"""
-        self.progress.stop()
+        self.job = None
+        self.progress['value'] = 0
         self.download_btn.config(state=tk.NORMAL)
         self.status_label.config(text="✗ Download failed")
 